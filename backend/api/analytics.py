@@ -1,8 +1,25 @@
 """
 Endpoints da API para analytics e projeções de viabilidade.
 """
-from fastapi import APIRouter
-from services.analytics import analytics_service
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import date
+
+from models.schemas import (
+    ParametrosGrade,
+    ParametrosMonteCarlo,
+    ParametrosSimulacaoDiaria,
+    ParametrosViabilidade,
+    PorteEmpresa,
+    RankingMunicipiosRequest,
+)
+from services.analytics import PESOS_SCORE, analytics_service
+from services.grade import grade_cenarios
+from services.monte_carlo import monte_carlo_service
+from services.municipios import registro_municipios
+from services.ranking_municipios import ranking_municipios
+from services.simulador_diario import simulador_diario
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
@@ -25,6 +42,38 @@ async def get_tendencias():
     }
 
 
+@router.get("/aberturas")
+async def get_serie_aberturas(
+    data_inicio: Optional[date] = Query(None, description="Início (mês que contém a data)"),
+    data_fim: Optional[date] = Query(None, description="Fim (mês que contém a data)"),
+    agrupar_por: Optional[str] = Query(None, pattern="^(cnae|setor|porte|bairro)$", description="Dimensão da quebra"),
+    granularidade: str = Query("mes", pattern="^(mes|trimestre|ano)$", description="mes, trimestre ou ano"),
+    setor: Optional[str] = Query(None, description="Filtrar por setor do hotel"),
+    cnae: Optional[str] = Query(None, description="Filtrar por código CNAE (prefixo)"),
+    porte: Optional[PorteEmpresa] = Query(None, description="Filtrar por porte"),
+    bairro: Optional[str] = Query(None, description="Filtrar por bairro")
+):
+    """
+    Série temporal de aberturas de empresas por mês, trimestre ou ano.
+
+    Servida pelo cubo mês x CNAE x setor x porte x bairro mantido junto
+    com os índices das empresas: roll-ups e fatias não relêem a base.
+    """
+    try:
+        return analytics_service.serie_aberturas(
+            inicio=data_inicio,
+            fim=data_fim,
+            agrupar_por=agrupar_por,
+            granularidade=granularidade,
+            setor=setor,
+            cnae=cnae,
+            porte=porte.value if porte else None,
+            bairro=bairro
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/projecoes")
 async def get_projecoes():
     """
@@ -35,6 +84,75 @@ async def get_projecoes():
     }
 
 
+@router.post("/monte-carlo")
+async def simular_monte_carlo(parametros: Optional[ParametrosMonteCarlo] = None):
+    """
+    Simulação de Monte Carlo de ocupação, diária, participação de A&B e
+    sazonalidade.
+
+    Retorna faixas P10/P50/P90 de ocupação, RevPAR e receitas (anuais e
+    por mês). Resultados ficam em cache pelo hash dos parâmetros.
+    """
+    parametros = parametros or ParametrosMonteCarlo()
+    try:
+        return monte_carlo_service.simular(parametros.model_dump(mode="json"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/viabilidade-financeira")
+async def calcular_viabilidade_financeira(parametros: Optional[ParametrosViabilidade] = None):
+    """
+    VPL, TIR e payback (simples e descontado) para os cenários de projeção
+    e para cada simulação de Monte Carlo, com premissas de CAPEX, custos,
+    rampa, financiamento e impostos.
+
+    Retorna os valores por cenário, faixas P10/P50/P90 das simulações e a
+    probabilidade de VPL positivo.
+    """
+    parametros = parametros or ParametrosViabilidade()
+    try:
+        return monte_carlo_service.viabilidade(
+            parametros.monte_carlo.model_dump(mode="json"),
+            parametros.financeiro.model_dump(mode="json")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/simulacao-diaria")
+async def simular_ocupacao_diaria(parametros: Optional[ParametrosSimulacaoDiaria] = None):
+    """
+    Simulação dia a dia da ocupação no ano, com o calendário de eventos,
+    curva de demanda por dia da semana e antecedência das reservas.
+
+    Retorna faixas P10/P50/P90 de ocupação e RevPAR por dia, semana e mês,
+    totais anuais e a curva de pickup das reservas.
+    """
+    parametros = parametros or ParametrosSimulacaoDiaria()
+    try:
+        return simulador_diario.simular(parametros.model_dump(mode="json"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/grid")
+async def calcular_grade(parametros: Optional[ParametrosGrade] = None):
+    """
+    Receita para todas as combinações de quartos, diária, ocupação e
+    participação de A&B (produto cartesiano dos eixos).
+
+    Cada métrica vem como array plano (ordem C) com os eixos de que
+    depende e a forma correspondente. Grades repetidas saem do cache.
+    """
+    parametros = parametros or ParametrosGrade()
+    try:
+        grade = grade_cenarios.calcular(parametros.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(iter(grade["json"]), media_type="application/json")
+
+
 @router.get("/sazonalidade")
 async def get_sazonalidade():
     """
@@ -83,22 +201,22 @@ async def get_score_viabilidade():
         "fatores": {
             "crescimento_empresarial": {
                 "valor": kpis["crescimento_geral"],
-                "peso": "20%",
+                "peso": f"{PESOS_SCORE['crescimento']}%",
                 "avaliacao": "Positivo" if kpis["crescimento_geral"] > 10 else "Neutro"
             },
             "volume_eventos": {
                 "valor": kpis["total_eventos_ano"],
-                "peso": "25%",
+                "peso": f"{PESOS_SCORE['eventos']}%",
                 "avaliacao": "Excelente" if kpis["total_eventos_ano"] > 100 else "Bom"
             },
             "publico_turistico": {
                 "valor": kpis["publico_total_eventos"],
-                "peso": "25%",
+                "peso": f"{PESOS_SCORE['publico']}%",
                 "avaliacao": "Excelente" if kpis["publico_total_eventos"] > 300000 else "Bom"
             },
             "gap_mercado": {
                 "valor": f"{kpis['leitos_disponiveis_cidade']} leitos para {kpis['publico_total_eventos']:,} visitantes",
-                "peso": "30%",
+                "peso": f"{PESOS_SCORE['gap']}%",
                 "avaliacao": "Crítico - alta oportunidade"
             }
         },
@@ -118,6 +236,55 @@ async def get_score_viabilidade():
     }
 
 
+@router.get("/score-viabilidade/sensibilidade")
+async def get_sensibilidade_score(
+    variacao: float = Query(0.3, gt=0, le=0.9, description="Perturbação relativa (0.3 = ±30%)"),
+    pontos: int = Query(21, ge=3, le=101, description="Valores por entrada"),
+    amostras: int = Query(500, ge=1, le=1000, description="Amostras das demais entradas por valor")
+):
+    """
+    Sensibilidade do score de viabilidade a crescimento, eventos, público,
+    leitos e pesos dos fatores.
+
+    Retorna dados de tornado (uma entrada por vez, demais na base) e de
+    dependência parcial (média do score com as demais entradas sorteadas
+    na mesma faixa).
+    """
+    return analytics_service.sensibilidade_score(variacao, pontos, amostras)
+
+
+@router.get("/municipios")
+async def listar_municipios():
+    """
+    Lista os municípios candidatos do registro e se há dados para cada um.
+    """
+    return {"municipios": registro_municipios.listar()}
+
+
+@router.post("/municipios/ranking")
+async def ranquear_municipios(request: Optional[RankingMunicipiosRequest] = None):
+    """
+    Avalia KPIs, score de viabilidade e projeção moderada de vários
+    municípios em paralelo e retorna a tabela ordenada pelo score.
+
+    Sem códigos, compara todos os municípios do registro. Resultados por
+    município ficam em cache até mudar a versão dos seus datasets.
+    Municípios sem bundle de dados (hoje, todos exceto Ribeirão Pires)
+    voltam em sem_dados com status "sem_dados".
+    """
+    codigos = (request.codigos_ibge if request else None) or [
+        m["codigo_ibge"] for m in registro_municipios.listar()
+    ]
+    bundles = {codigo: registro_municipios.obter(codigo) for codigo in dict.fromkeys(codigos)}
+    desconhecidos = [codigo for codigo, bundle in bundles.items() if bundle is None]
+    if desconhecidos:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Municípios não encontrados no registro: {', '.join(desconhecidos)}"
+        )
+    return await ranking_municipios.ranquear(list(bundles.values()))
+
+
 @router.get("/demanda-estimada")
 async def get_demanda_estimada():
     """
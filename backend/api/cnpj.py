@@ -39,17 +39,14 @@ from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
 from typing import Optional, List
 import httpx
 import asyncio
-import json
 from datetime import datetime
-from pathlib import Path
 from pydantic import BaseModel
 
 from services.cnae_classifier import classifier, classificar_empresa
+from services.empresas_store import empresas_store
 
 router = APIRouter(prefix="/cnpj", tags=["cnpj"])
 
-DATA_PATH = Path(__file__).parent.parent / "data"
-
 
 class ConfiguracaoAPI(BaseModel):
     """Configuração da API ReceitaWS."""
@@ -87,22 +84,6 @@ class ConsultaCNPJResponse(BaseModel):
 api_config = ConfiguracaoAPI()
 
 
-def _load_empresas() -> dict:
-    """Carrega empresas do arquivo JSON."""
-    filepath = DATA_PATH / "empresas_exemplo.json"
-    if filepath.exists():
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"empresas": []}
-
-
-def _save_empresas(data: dict):
-    """Salva empresas no arquivo JSON."""
-    filepath = DATA_PATH / "empresas_exemplo.json"
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
 @router.get("/info")
 async def info_api():
     """
@@ -345,20 +326,11 @@ def _classificar_porte(porte_texto: str) -> str:
 
 async def _salvar_empresa(dados: dict):
     """Salva empresa na base local se for estratégica."""
-    empresas_data = _load_empresas()
-    empresas = empresas_data.get("empresas", [])
-
     # Verificar se já existe
-    cnpj = dados["cnpj"].replace(".", "").replace("/", "").replace("-", "")
-    for emp in empresas:
-        if emp.get("cnpj", "").replace(".", "").replace("/", "").replace("-", "") == cnpj:
-            return  # Já existe
-
-    # Gerar novo ID
-    max_id = max([e.get("id", 0) for e in empresas], default=0)
+    if empresas_store.obter_por_cnpj(dados["cnpj"]) is not None:
+        return
 
-    nova_empresa = {
-        "id": max_id + 1,
+    await empresas_store.adicionar({
         "cnpj": dados["cnpj"],
         "razao_social": dados["razao_social"],
         "nome_fantasia": dados["nome_fantasia"],
@@ -371,14 +343,11 @@ async def _salvar_empresa(dados: dict):
         "telefone": dados["contato"]["telefone"],
         "email": dados["contato"]["email"],
         "porte": dados["porte"],
+        "capital_social": dados["capital_social"] or None,
         "setor_hotel": dados["setor_hotel"],
         "status_parceria": "nao_contatado",
         "notas": f"Importado via ReceitaWS em {datetime.now().strftime('%d/%m/%Y')}"
-    }
-
-    empresas.append(nova_empresa)
-    empresas_data["empresas"] = empresas
-    _save_empresas(empresas_data)
+    })
 
 
 @router.post("/consultar-lote")
@@ -23,6 +23,8 @@ from pydantic import BaseModel
 import os
 
 from services.cnae_classifier import classifier, classificar_empresa
+from services.empresas_indices import canonizar_cnpj
+from services.empresas_store import empresas_store
 
 router = APIRouter(prefix="/cnpja", tags=["cnpja"])
 
@@ -68,22 +70,6 @@ def _save_config(config: CNPJaConfig):
         json.dump(config.model_dump(), f, ensure_ascii=False, indent=2)
 
 
-def _load_empresas() -> dict:
-    """Carrega empresas do arquivo JSON."""
-    filepath = DATA_PATH / "empresas_exemplo.json"
-    if filepath.exists():
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"empresas": []}
-
-
-def _save_empresas(data: dict):
-    """Salva empresas no arquivo JSON."""
-    filepath = DATA_PATH / "empresas_exemplo.json"
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
 # Carregar configuração na inicialização
 _load_config()
 
@@ -312,9 +298,7 @@ async def importar_todos_setores(
         "erros": []
     }
 
-    empresas_data = _load_empresas()
-    empresas_existentes = {e.get("cnpj", "").replace(".", "").replace("/", "").replace("-", "")
-                          for e in empresas_data.get("empresas", [])}
+    cnpjs_vistos = set()
     novas_empresas = []
 
     async with httpx.AsyncClient(timeout=60.0) as client:
@@ -358,10 +342,11 @@ async def importar_todos_setores(
 
                         for item in all_records:
                             empresa = _processar_resposta_cnpja(item)
-                            cnpj_limpo = empresa["cnpj"].replace(".", "").replace("/", "").replace("-", "")
+                            cnpj_canonico = canonizar_cnpj(empresa["cnpj"])
 
-                            if cnpj_limpo not in empresas_existentes:
-                                empresas_existentes.add(cnpj_limpo)
+                            if (cnpj_canonico not in cnpjs_vistos
+                                    and empresas_store.obter_por_cnpj(cnpj_canonico) is None):
+                                cnpjs_vistos.add(cnpj_canonico)
                                 novas_empresas.append(_converter_para_base_local(empresa, setor))
                                 resultados["por_setor"][setor]["importados"] += 1
                                 resultados["total_importado"] += 1
@@ -378,15 +363,15 @@ async def importar_todos_setores(
     # Salvar novas empresas
     if salvar and novas_empresas:
         # Remover empresas de exemplo antigas
-        empresas_data["empresas"] = [e for e in empresas_data.get("empresas", [])
-                                      if not e.get("notas", "").startswith("Buffet tradicional")]
-
-        max_id = max([e.get("id", 0) for e in empresas_data.get("empresas", [])], default=0)
-        for i, emp in enumerate(novas_empresas):
-            emp["id"] = max_id + i + 1
-
-        empresas_data["empresas"].extend(novas_empresas)
-        _save_empresas(empresas_data)
+        await empresas_store.remover_onde(
+            lambda e: (e.get("notas") or "").startswith("Buffet tradicional")
+        )
+        # Descartar CNPJs cadastrados por outra importação durante a busca
+        novas_empresas = [
+            e for e in novas_empresas
+            if empresas_store.obter_por_cnpj(e["cnpj"]) is None
+        ]
+        await empresas_store.adicionar_varias(novas_empresas)
 
     return resultados
 
@@ -439,6 +424,7 @@ def _processar_resposta_cnpja(dados: dict) -> dict:
     company = dados.get("company", {})
     if isinstance(company, dict):
         razao_social = company.get("name", "")
+        capital_social = company.get("equity")
         size = company.get("size", {})
         if isinstance(size, dict):
             porte_texto = size.get("text", "")
@@ -446,6 +432,7 @@ def _processar_resposta_cnpja(dados: dict) -> dict:
             porte_texto = ""
     else:
         razao_social = ""
+        capital_social = None
         porte_texto = ""
 
     # Extrair status
@@ -462,6 +449,7 @@ def _processar_resposta_cnpja(dados: dict) -> dict:
         "situacao": situacao,
         "data_abertura": dados.get("founded", ""),
         "porte": _classificar_porte_cnpja(porte_texto),
+        "capital_social": capital_social,
         "cnae_principal": cnae_formatado,
         "cnae_descricao": cnae_text,
         "endereco": {
@@ -515,6 +503,7 @@ def _converter_para_base_local(empresa: dict, setor: str) -> dict:
         "telefone": empresa["contato"]["telefone"],
         "email": empresa["contato"]["email"],
         "porte": empresa["porte"],
+        "capital_social": empresa.get("capital_social"),
         "setor_hotel": setor,
         "status_parceria": "nao_contatado",
         "notas": f"Importado via CNPJá em {datetime.now().strftime('%d/%m/%Y %H:%M')}"
@@ -3,26 +3,24 @@ Endpoints da API para análise de concorrência hoteleira.
 """
 from fastapi import APIRouter, Query
 from typing import Optional
-import json
-from pathlib import Path
 
-router = APIRouter(prefix="/concorrencia", tags=["concorrencia"])
+from services.datasets import concorrencia_dataset
+from services.projecao import projetar
 
-DATA_PATH = Path(__file__).parent.parent / "data" / "concorrencia.json"
+router = APIRouter(prefix="/concorrencia", tags=["concorrencia"])
 
 
 def _load_concorrencia() -> dict:
-    """Carrega dados de concorrência do arquivo JSON."""
-    if DATA_PATH.exists():
-        with open(DATA_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"hoteis": [], "analise_mercado": {}, "hotel_proposto": {}}
+    """Dados de concorrência (mantidos em memória, relidos se o arquivo mudar)."""
+    return concorrencia_dataset.dados()
 
 
 @router.get("/hoteis")
 async def listar_hoteis(
     cidade: Optional[str] = Query(None, description="Filtrar por cidade"),
-    tipo: Optional[str] = Query(None, description="Filtrar por tipo (hotel, pousada, hotel-fazenda)")
+    tipo: Optional[str] = Query(None, description="Filtrar por tipo (hotel, pousada, hotel-fazenda)"),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula"),
+    formato: str = Query("objetos", pattern="^(objetos|colunar)$", description="objetos ou colunar ({columns, rows})")
 ):
     """
     Lista todos os hotéis concorrentes na região.
@@ -38,7 +36,7 @@ async def listar_hoteis(
 
     return {
         "total": len(hoteis),
-        "hoteis": hoteis
+        "hoteis": projetar(hoteis, fields, formato)
     }
 
 
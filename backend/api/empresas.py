@@ -1,58 +1,88 @@
 """
 Endpoints da API para gerenciamento de empresas.
 """
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, File, HTTPException, Query, Request, UploadFile
 from typing import List, Optional
 from datetime import date
-import json
+from bisect import bisect_right
 from pathlib import Path
+import base64
+import io
+import json
 
 from models.schemas import (
     Empresa, EmpresaCreate, FiltroEmpresas,
     PorteEmpresa, StatusParceria
 )
 from services.cnae_classifier import classifier, classificar_empresa
+from services.empresas_db import empresas_db
+from services.empresas_store import CNPJDuplicadoError, empresas_store
+from services.importacao import gravar_lote, importacoes
+from services.projecao import projetar
 
 router = APIRouter(prefix="/empresas", tags=["empresas"])
 
-DATA_PATH = Path(__file__).parent.parent / "data" / "empresas_exemplo.json"
-
-def _load_empresas() -> List[dict]:
-    """Carrega empresas do arquivo JSON."""
-    if DATA_PATH.exists():
-        with open(DATA_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data.get("empresas", [])
-    return []
-
-def _save_empresas(empresas: List[dict]):
-    """Salva empresas no arquivo JSON."""
-    with open(DATA_PATH, "w", encoding="utf-8") as f:
-        json.dump({
-            "empresas": empresas,
-            "estatisticas": _calcular_estatisticas(empresas)
-        }, f, ensure_ascii=False, indent=2)
-
-def _calcular_estatisticas(empresas: List[dict]) -> dict:
-    """Calcula estatísticas das empresas."""
-    por_setor = {}
-    por_porte = {}
-    por_status = {}
-
-    for emp in empresas:
-        setor = emp.get("setor_hotel", "Outros")
-        porte = emp.get("porte", "OUTROS")
-        status = emp.get("status_parceria", "nao_contatado")
-
-        por_setor[setor] = por_setor.get(setor, 0) + 1
-        por_porte[porte] = por_porte.get(porte, 0) + 1
-        por_status[status] = por_status.get(status, 0) + 1
+
+def _codificar_cursor(empresa_id: int) -> str:
+    """Gera cursor opaco a partir do último ID da página."""
+    return base64.urlsafe_b64encode(json.dumps({"id": empresa_id}).encode()).decode()
+
+
+def _decodificar_cursor(cursor: str) -> int:
+    """Extrai o último ID de um cursor gerado por _codificar_cursor."""
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+LOTE_MAXIMO_REGISTROS = 50000
+
+
+def _ler_lote(corpo: bytes, ndjson: bool) -> tuple:
+    """
+    Decodifica o corpo de /empresas/lote (lista JSON ou NDJSON).
+
+    Returns:
+        Tupla (registros, erros) — erros de parse por linha do NDJSON
+    """
+    if not ndjson:
+        try:
+            registros = json.loads(corpo)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="JSON inválido")
+        if isinstance(registros, dict):
+            registros = registros.get("empresas")
+        if not isinstance(registros, list):
+            raise HTTPException(status_code=400, detail="Envie uma lista de empresas")
+        return registros, {}
+
+    registros, erros = [], {}
+    for linha in corpo.splitlines():
+        if not linha.strip():
+            continue
+        try:
+            registros.append(json.loads(linha))
+        except ValueError:
+            erros[len(registros)] = [{"campo": None, "mensagem": "JSON inválido"}]
+            registros.append(None)
+    return registros, erros
+
+
+def _paginar(empresas: List[dict], limit: int, offset: int, apos_id: Optional[int]) -> dict:
+    """Pagina uma lista ordenada por ID, por offset ou a partir do cursor."""
+    total = len(empresas)
+    if apos_id is not None:
+        offset = bisect_right(empresas, apos_id, key=lambda e: e["id"])
+    pagina = empresas[offset:offset + limit]
+    tem_mais = offset + limit < total
 
     return {
-        "total_empresas": len(empresas),
-        "por_setor": por_setor,
-        "por_porte": por_porte,
-        "por_status": por_status
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": _codificar_cursor(pagina[-1]["id"]) if tem_mais else None,
+        "empresas": pagina
     }
 
 
@@ -65,48 +95,105 @@ async def listar_empresas(
     data_inicio: Optional[date] = Query(None, description="Data de abertura mínima"),
     data_fim: Optional[date] = Query(None, description="Data de abertura máxima"),
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor opaco (next_cursor da página anterior); ignora offset"),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula"),
+    formato: str = Query("objetos", pattern="^(objetos|colunar)$", description="objetos ou colunar ({columns, rows})")
 ):
     """
     Lista todas as empresas com filtros opcionais.
-    """
-    empresas = _load_empresas()
-
-    # Aplicar filtros
-    if setor:
-        empresas = [e for e in empresas if e.get("setor_hotel") == setor]
-
-    if cnae:
-        empresas = [e for e in empresas if e.get("cnae_principal", "").startswith(cnae)]
-
-    if porte:
-        empresas = [e for e in empresas if e.get("porte") == porte.value]
-
-    if status:
-        empresas = [e for e in empresas if e.get("status_parceria") == status.value]
 
-    if data_inicio:
-        empresas = [
-            e for e in empresas
-            if e.get("data_abertura", "1900-01-01") >= str(data_inicio)
-        ]
-
-    if data_fim:
-        empresas = [
-            e for e in empresas
-            if e.get("data_abertura", "2100-01-01") <= str(data_fim)
-        ]
-
-    # Paginação
-    total = len(empresas)
-    empresas = empresas[offset:offset + limit]
+    Paginação por offset ou por cursor (keyset sobre o ID). O cursor mantém
+    a ordem estável mesmo com inclusões e exclusões entre as páginas.
+    `fields` restringe os campos retornados e `formato=colunar` devolve
+    `empresas` como {columns, rows}.
+    """
+    apos_id = _decodificar_cursor(cursor) if cursor else None
+    if apos_id is not None:
+        offset = 0
+
+    if empresas_store.usa_sqlite:
+        total, empresas, tem_mais = await empresas_db.listar(
+            limit=limit,
+            offset=offset,
+            apos_id=apos_id,
+            setor=setor,
+            cnae=cnae,
+            porte=porte.value if porte else None,
+            status=status.value if status else None,
+            data_inicio=str(data_inicio) if data_inicio else None,
+            data_fim=str(data_fim) if data_fim else None
+        )
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": _codificar_cursor(empresas[-1]["id"]) if tem_mais else None,
+            "empresas": projetar(empresas, fields, formato)
+        }
+
+    filtros = {
+        "setor": setor,
+        "cnae": cnae,
+        "porte": porte.value if porte else None,
+        "status": status.value if status else None,
+        "data_inicio": data_inicio,
+        "data_fim": data_fim
+    }
+    if apos_id is not None:
+        # Keyset: a página é lida a partir do cursor, sem filtrar a base toda
+        total, empresas, tem_mais = empresas_store.pagina_filtrada(apos_id, limit, **filtros)
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": _codificar_cursor(empresas[-1]["id"]) if tem_mais else None,
+            "empresas": projetar(empresas, fields, formato)
+        }
+
+    resultado = _paginar(empresas_store.filtrar(**filtros), limit, offset, None)
+    resultado["empresas"] = projetar(resultado["empresas"], fields, formato)
+    return resultado
+
+
+@router.get("/facetas")
+async def listar_empresas_com_facetas(
+    setor: Optional[str] = Query(None, description="Filtrar por setor do hotel"),
+    cnae: Optional[str] = Query(None, description="Filtrar por código CNAE"),
+    porte: Optional[PorteEmpresa] = Query(None, description="Filtrar por porte"),
+    status: Optional[StatusParceria] = Query(None, description="Filtrar por status de parceria"),
+    data_inicio: Optional[date] = Query(None, description="Data de abertura mínima"),
+    data_fim: Optional[date] = Query(None, description="Data de abertura máxima"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor opaco (next_cursor da página anterior); ignora offset")
+):
+    """
+    Lista empresas (mesmos filtros de GET /empresas/) e retorna junto as
+    contagens por setor, porte, status, CNAE e bairro do conjunto filtrado.
 
-    return {
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-        "empresas": empresas
+    Substitui as chamadas separadas a /empresas/, /empresas/estatisticas e
+    /empresas/por-setor/resumo ao montar filtros e gráficos do dashboard.
+    """
+    apos_id = _decodificar_cursor(cursor) if cursor else None
+    if apos_id is not None:
+        offset = 0
+
+    filtros = {
+        "setor": setor,
+        "cnae": cnae,
+        "porte": porte.value if porte else None,
+        "status": status.value if status else None,
+        "data_inicio": data_inicio,
+        "data_fim": data_fim
     }
+    empresas = empresas_store.filtrar(**filtros)
+
+    resposta = _paginar(empresas, limit, offset, apos_id)
+    resposta["facetas"] = empresas_store.facetas(
+        None if not any(filtros.values()) else empresas
+    )
+    return resposta
 
 
 @router.get("/estatisticas")
@@ -114,8 +201,7 @@ async def get_estatisticas():
     """
     Retorna estatísticas das empresas cadastradas.
     """
-    empresas = _load_empresas()
-    return _calcular_estatisticas(empresas)
+    return empresas_store.estatisticas()
 
 
 @router.get("/setores")
@@ -137,15 +223,47 @@ async def listar_cnaes():
     }
 
 
+@router.get("/busca")
+async def buscar_empresas(
+    q: str = Query(..., min_length=1, description="Termos de busca (nome, bairro, notas)"),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """
+    Busca textual por razão social, nome fantasia, bairro e notas.
+
+    Ignora acentos, completa prefixos e tolera erros de digitação.
+    Resultados ordenados por relevância.
+    """
+    resultados = empresas_store.buscar(q, limit)
+    return {
+        "q": q,
+        "total": len(resultados),
+        "resultados": [
+            {"score": score, "empresa": emp}
+            for emp, score in resultados
+        ]
+    }
+
+
+@router.get("/cnpj/{cnpj}")
+async def get_empresa_por_cnpj(cnpj: str):
+    """
+    Retorna uma empresa pelo CNPJ (com ou sem formatação).
+    """
+    emp = empresas_store.obter_por_cnpj(cnpj)
+    if emp is not None:
+        return emp
+    raise HTTPException(status_code=404, detail="Empresa não encontrada")
+
+
 @router.get("/{empresa_id}")
 async def get_empresa(empresa_id: int):
     """
     Retorna detalhes de uma empresa específica.
     """
-    empresas = _load_empresas()
-    for emp in empresas:
-        if emp.get("id") == empresa_id:
-            return emp
+    emp = empresas_store.obter(empresa_id)
+    if emp is not None:
+        return emp
     raise HTTPException(status_code=404, detail="Empresa não encontrada")
 
 
@@ -154,33 +272,93 @@ async def criar_empresa(empresa: EmpresaCreate):
     """
     Adiciona uma nova empresa ao sistema.
     """
-    empresas = _load_empresas()
-
-    # Verificar duplicata
-    for emp in empresas:
-        if emp.get("cnpj") == empresa.cnpj:
-            raise HTTPException(status_code=400, detail="CNPJ já cadastrado")
-
-    # Gerar ID
-    max_id = max([e.get("id", 0) for e in empresas], default=0)
-    novo_id = max_id + 1
+    # Verificar duplicata (CNPJ com ou sem formatação)
+    if empresas_store.obter_por_cnpj(empresa.cnpj) is not None:
+        raise HTTPException(status_code=400, detail="CNPJ já cadastrado")
 
     # Classificar CNAE
     classificacao = classificar_empresa(empresa.cnae_principal)
 
-    nova_empresa = {
-        "id": novo_id,
-        **empresa.model_dump(),
-        "data_abertura": str(empresa.data_abertura),
-        "setor_hotel": classificacao.get("setor_hotel", "Outros"),
-        "status_parceria": "nao_contatado",
-        "notas": None
+    try:
+        nova_empresa = await empresas_store.adicionar({
+            **empresa.model_dump(),
+            "data_abertura": str(empresa.data_abertura),
+            "setor_hotel": classificacao.get("setor_hotel", "Outros"),
+            "status_parceria": "nao_contatado",
+            "notas": None
+        })
+    except CNPJDuplicadoError:
+        raise HTTPException(status_code=400, detail="CNPJ já cadastrado")
+
+    return {"message": "Empresa criada com sucesso", "empresa": nova_empresa}
+
+
+@router.post("/lote")
+async def importar_lote(request: Request):
+    """
+    Insere ou atualiza empresas em lote, pelo CNPJ.
+
+    Aceita uma lista JSON de empresas (ou {"empresas": [...]}) ou NDJSON
+    (Content-Type application/x-ndjson, uma empresa por linha). Registros
+    inválidos são reportados por linha sem abortar o lote; os válidos são
+    classificados e gravados numa única transação.
+    """
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+    registros, erros = _ler_lote(await request.body(), ndjson)
+
+    if len(registros) > LOTE_MAXIMO_REGISTROS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lote acima de {LOTE_MAXIMO_REGISTROS} empresas"
+        )
+
+    resultado = await gravar_lote(registros, erros)
+    erros = resultado["erros"]
+
+    return {
+        "recebidas": len(registros),
+        "inseridas": resultado["inseridas"],
+        "atualizadas": resultado["atualizadas"],
+        "rejeitadas": resultado["rejeitadas"],
+        "erros": [
+            {"linha": indice, "erros": erros[indice]}
+            for indice in sorted(erros)
+        ]
     }
 
-    empresas.append(nova_empresa)
-    _save_empresas(empresas)
 
-    return {"message": "Empresa criada com sucesso", "empresa": nova_empresa}
+@router.post("/importar", status_code=202)
+async def importar_planilha(arquivo: UploadFile = File(...)):
+    """
+    Importa uma planilha de empresas (CSV ou XLSX) em segundo plano.
+
+    As linhas são lidas direto do arquivo temporário do upload,
+    classificadas e gravadas em lotes (upsert por CNPJ: colunas ausentes
+    na planilha não apagam dados já cadastrados; sem coluna de município,
+    vale o do dataset). Colunas são reconhecidas pelo cabeçalho (CNPJ, Razão Social, CNAE, Data de
+    Abertura, Porte, Bairro...). Acompanhe em GET /empresas/importar/{job_id}.
+    """
+    nome = arquivo.filename or ""
+    extensao = Path(nome).suffix.lower()
+    if extensao not in (".csv", ".xlsx"):
+        raise HTTPException(status_code=400, detail="Envie um arquivo .csv ou .xlsx")
+
+    # O job lê direto o temporário do upload (sem copiar) e o fecha ao
+    # final; o UploadFile fica com um arquivo vazio para o framework fechar
+    planilha, arquivo.file = arquivo.file, io.BytesIO()
+    job = importacoes.iniciar(planilha, extensao[1:], nome)
+    return {"job_id": job["job_id"], "status": job["status"]}
+
+
+@router.get("/importar/{job_id}")
+async def status_importacao(job_id: str):
+    """
+    Andamento de uma importação de planilha (progresso, contagens e erros).
+    """
+    job = importacoes.obter(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Importação não encontrada")
+    return job
 
 
 @router.put("/{empresa_id}/status")
@@ -192,15 +370,13 @@ async def atualizar_status_parceria(
     """
     Atualiza o status de parceria de uma empresa.
     """
-    empresas = _load_empresas()
+    campos = {"status_parceria": status.value}
+    if notas:
+        campos["notas"] = notas
 
-    for emp in empresas:
-        if emp.get("id") == empresa_id:
-            emp["status_parceria"] = status.value
-            if notas:
-                emp["notas"] = notas
-            _save_empresas(empresas)
-            return {"message": "Status atualizado", "empresa": emp}
+    emp = await empresas_store.atualizar(empresa_id, campos)
+    if emp is not None:
+        return {"message": "Status atualizado", "empresa": emp}
 
     raise HTTPException(status_code=404, detail="Empresa não encontrada")
 
@@ -210,13 +386,9 @@ async def excluir_empresa(empresa_id: int):
     """
     Remove uma empresa do sistema.
     """
-    empresas = _load_empresas()
-    empresas_filtradas = [e for e in empresas if e.get("id") != empresa_id]
-
-    if len(empresas_filtradas) == len(empresas):
+    if not await empresas_store.remover(empresa_id):
         raise HTTPException(status_code=404, detail="Empresa não encontrada")
 
-    _save_empresas(empresas_filtradas)
     return {"message": "Empresa excluída com sucesso"}
 
 
@@ -225,26 +397,4 @@ async def empresas_por_setor():
     """
     Retorna contagem de empresas agrupadas por setor.
     """
-    empresas = _load_empresas()
-    por_setor = {}
-
-    for emp in empresas:
-        setor = emp.get("setor_hotel", "Outros")
-        if setor not in por_setor:
-            por_setor[setor] = {
-                "total": 0,
-                "parceiros": 0,
-                "prospectados": 0,
-                "contatados": 0
-            }
-        por_setor[setor]["total"] += 1
-
-        status = emp.get("status_parceria", "nao_contatado")
-        if status == "parceiro":
-            por_setor[setor]["parceiros"] += 1
-        elif status == "prospectado":
-            por_setor[setor]["prospectados"] += 1
-        elif status == "contatado":
-            por_setor[setor]["contatados"] += 1
-
-    return por_setor
+    return empresas_store.resumo_por_setor()
@@ -3,26 +3,24 @@ Endpoints da API para eventos turísticos de Ribeirão Pires.
 """
 from fastapi import APIRouter, Query
 from typing import Optional, List
-import json
-from pathlib import Path
 
-router = APIRouter(prefix="/eventos", tags=["eventos"])
+from services.datasets import eventos_dataset
+from services.projecao import projetar
 
-DATA_PATH = Path(__file__).parent.parent / "data" / "eventos.json"
+router = APIRouter(prefix="/eventos", tags=["eventos"])
 
 
 def _load_eventos() -> dict:
-    """Carrega dados de eventos do arquivo JSON."""
-    if DATA_PATH.exists():
-        with open(DATA_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"eventos": [], "resumo": {}}
+    """Dados de eventos (mantidos em memória, relidos se o arquivo mudar)."""
+    return eventos_dataset.dados()
 
 
 @router.get("/")
 async def listar_eventos(
     impacto: Optional[str] = Query(None, description="Filtrar por impacto (alto, medio, baixo)"),
-    mes: Optional[int] = Query(None, ge=1, le=12, description="Filtrar por mês")
+    mes: Optional[int] = Query(None, ge=1, le=12, description="Filtrar por mês"),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula"),
+    formato: str = Query("objetos", pattern="^(objetos|colunar)$", description="objetos ou colunar ({columns, rows})")
 ):
     """
     Lista todos os eventos turísticos de Ribeirão Pires.
@@ -41,7 +39,7 @@ async def listar_eventos(
 
     return {
         "total": len(eventos),
-        "eventos": eventos
+        "eventos": projetar(eventos, fields, formato)
     }
 
 
@@ -0,0 +1,56 @@
+"""
+Stream de alterações (Server-Sent Events) para o dashboard.
+"""
+import asyncio
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from services.analytics import analytics_service
+from services.empresas_store import empresas_store
+from services.feed import feed_alteracoes, formatar_sse
+
+router = APIRouter(tags=["stream"])
+
+# Intervalo do comentário de keep-alive (proxies fecham conexões ociosas)
+HEARTBEAT = 15.0
+
+
+@router.get("/eventos-stream")
+async def eventos_stream(request: Request):
+    """
+    Stream SSE de alterações das empresas e dos KPIs.
+
+    Eventos:
+    - `snapshot`: KPIs atuais e versão do dataset, ao conectar
+    - `empresas`: deltas de cada commit ({op: insert|update|delete, id, empresa})
+    - `kpis`: KPIs recalculados após commits
+    - `reset`: o cliente perdeu eventos e deve recarregar os dados
+
+    Reconexões com Last-Event-ID recebem os eventos perdidos.
+    """
+    ultimo_id = request.headers.get("last-event-id")
+    fila = feed_alteracoes.assinar(ultimo_id)
+
+    async def gerar():
+        try:
+            if not ultimo_id:
+                yield formatar_sse(None, "snapshot", {
+                    "versao": empresas_store.versao_atual(),
+                    "kpis": analytics_service.calcular_kpis()
+                })
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    yield await asyncio.wait_for(fila.get(), HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            feed_alteracoes.cancelar(fila)
+
+    return StreamingResponse(
+        gerar(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -2,15 +2,50 @@
 Dashboard de Viabilidade - Hotel Ribeirão Pires
 API Backend FastAPI
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
+import hashlib
 import sys
+from datetime import date
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from api import empresas, eventos, concorrencia, analytics, cnpj, cnpja
+from api import empresas, eventos, concorrencia, analytics, cnpj, cnpja, stream
+from services.datasets import INSTANCIA, versoes
+from services.empresas_store import empresas_store
+from services.ranking_municipios import ranking_municipios
+
+# Datasets de que cada grupo de rotas GET depende (vale o primeiro prefixo)
+DEPENDENCIAS_ROTAS = (
+    ("/empresas/importar", None),
+    ("/eventos-stream", None),
+    ("/empresas/setores", ("cnaes",)),
+    ("/empresas/cnaes", ("cnaes",)),
+    ("/empresas", ("empresas",)),
+    ("/eventos", ("eventos",)),
+    ("/concorrencia", ("concorrencia",)),
+    ("/cnpj/cnaes-estrategicos", ("cnaes",)),
+    ("/analytics/municipios", None),
+    ("/analytics", ("empresas", "eventos", "concorrencia")),
+    ("/resumo", ("empresas", "eventos", "concorrencia")),
+)
+
+# Rotas de dados de referência, que mudam raramente
+ROTAS_REFERENCIA = (
+    "/eventos", "/concorrencia", "/empresas/setores", "/empresas/cnaes",
+    "/cnpj/cnaes-estrategicos"
+)
+CACHE_REFERENCIA = "public, max-age=300"
+
+# Rotas servidas por resultados com cache_por_versao(diario=True): as
+# janelas de 12 meses andam com a data, então o ETag também muda por dia
+ROTAS_DIARIAS = (
+    "/analytics/kpis", "/analytics/tendencias", "/analytics/completo",
+    "/analytics/score-viabilidade", "/analytics/demanda-estimada", "/resumo"
+)
+CACHE_DINAMICO = "no-cache"
 
 # Criar aplicação FastAPI
 app = FastAPI(
@@ -48,6 +83,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def get_condicional(request: Request, call_next):
+    """
+    ETag por versão dos datasets + rota + query (+ dia, nas rotas
+    diárias), e GET condicional.
+
+    Um If-None-Match que casa com a versão atual é respondido com 304 antes
+    de qualquer processamento da rota.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return await call_next(request)
+
+    caminho = request.url.path
+    dependencias = next(
+        (deps for prefixo, deps in DEPENDENCIAS_ROTAS if caminho.startswith(prefixo)),
+        None
+    )
+    if not dependencias:
+        return await call_next(request)
+
+    query = sorted(request.query_params.multi_items())
+    chave = f"{INSTANCIA}|{caminho}|{query}|{sorted(versoes(dependencias).items())}"
+    if caminho.startswith(ROTAS_DIARIAS):
+        chave += f"|{date.today().toordinal()}"
+    etag = f'"{hashlib.sha1(chave.encode()).hexdigest()[:24]}"'
+    cache_control = (
+        CACHE_REFERENCIA if caminho.startswith(ROTAS_REFERENCIA) else CACHE_DINAMICO
+    )
+
+    if_none_match = request.headers.get("if-none-match", "")
+    # Só um ETag listado vale para GET: "*" é precondição de escrita e
+    # responderia 304 até para um recurso que não existe
+    if etag in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = cache_control
+    return response
+
+
 # Registrar routers
 app.include_router(empresas.router)
 app.include_router(eventos.router)
@@ -55,6 +132,14 @@ app.include_router(concorrencia.router)
 app.include_router(analytics.router)
 app.include_router(cnpj.router)
 app.include_router(cnpja.router)
+app.include_router(stream.router)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Grava as mutações de empresas ainda pendentes na fila de escrita."""
+    await empresas_store.fechar()
+    ranking_municipios.encerrar()
 
 
 @app.get("/")
@@ -72,7 +157,8 @@ async def root():
             "eventos": "/eventos",
             "concorrencia": "/concorrencia",
             "analytics": "/analytics",
-            "cnpj": "/cnpj"
+            "cnpj": "/cnpj",
+            "stream": "/eventos-stream"
         },
         "projeto": {
             "descricao": "Hotel upscale em Ribeirão Pires com centro de convenções, restaurante gastronômico e rooftop bar",
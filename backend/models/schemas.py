@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import date
 from enum import Enum
@@ -39,6 +39,7 @@ class EmpresaBase(BaseModel):
     email: Optional[str] = None
     porte: PorteEmpresa
     setor_hotel: str  # Categoria para o hotel (buffet, eventos, etc)
+    capital_social: Optional[float] = None
 
 
 class EmpresaCreate(EmpresaBase):
@@ -113,6 +114,8 @@ class ProjecaoOcupacao(BaseModel):
     revpar_estimado: float
     receita_anual_estimada: float
     payback_anos: Optional[float] = None
+    vpl: Optional[float] = None
+    tir: Optional[float] = None
 
 
 class AnalyticsResponse(BaseModel):
@@ -121,6 +124,123 @@ class AnalyticsResponse(BaseModel):
     projecoes: List[ProjecaoOcupacao]
 
 
+# Schemas de Simulação
+class TipoDistribuicao(str, Enum):
+    FIXA = "fixa"
+    UNIFORME = "uniforme"
+    TRIANGULAR = "triangular"
+    NORMAL = "normal"
+
+
+class Distribuicao(BaseModel):
+    """
+    Distribuição de um parâmetro incerto.
+
+    fixa: media | uniforme: minimo, maximo | triangular: minimo, moda, maximo |
+    normal: media, desvio (truncada em minimo/maximo, se informados)
+    """
+    tipo: TipoDistribuicao = TipoDistribuicao.TRIANGULAR
+    minimo: Optional[float] = None
+    moda: Optional[float] = None
+    maximo: Optional[float] = None
+    media: Optional[float] = None
+    desvio: Optional[float] = None
+
+
+class ParametrosMonteCarlo(BaseModel):
+    simulacoes: int = Field(20000, ge=100, le=200000)
+    semente: Optional[int] = 42
+    quartos: Optional[int] = Field(None, ge=1)  # padrão: quartos_estimados do hotel proposto
+    ocupacao: Distribuicao = Distribuicao(minimo=0.45, moda=0.60, maximo=0.75)
+    diaria: Optional[Distribuicao] = None  # padrão: diaria_projetada do hotel proposto
+    participacao_fb: Distribuicao = Distribuicao(minimo=0.30, moda=0.40, maximo=0.50)
+    elasticidade_sazonal: Distribuicao = Distribuicao(tipo=TipoDistribuicao.UNIFORME, minimo=0.2, maximo=0.6)
+    ruido_mensal: float = Field(0.05, ge=0, le=0.5)
+    ocupacao_maxima: float = Field(0.95, gt=0, le=1)
+
+
+class ParametrosFinanceiros(BaseModel):
+    """
+    Premissas do fluxo de caixa do investidor (valores em R$ constantes).
+
+    Custos operacionais são frações da receita de quartos, da receita de
+    A&B e da receita total, mais um custo fixo anual.
+    """
+    horizonte_anos: int = Field(20, ge=1, le=50)
+    capex: Optional[float] = Field(None, gt=0)  # padrão: quartos x capex_por_quarto
+    capex_por_quarto: float = Field(250000, gt=0)
+    valor_residual: float = Field(0.40, ge=0, le=2)  # fração do CAPEX recuperada no fim do horizonte
+    taxa_desconto: float = Field(0.12, gt=-1, le=1)
+    rampa: List[float] = [0.75, 0.90]  # fração da receita estabilizada nos primeiros anos
+    impostos_receita: float = Field(0.10, ge=0, lt=1)  # PIS/COFINS/ISS
+    custo_quartos: float = Field(0.22, ge=0, le=1)
+    custo_fb: float = Field(0.60, ge=0, le=1)
+    despesas_gerais: float = Field(0.15, ge=0, le=1)
+    custo_fixo_anual: float = Field(300000, ge=0)
+    aliquota_ir: float = Field(0.34, ge=0, lt=1)  # IRPJ + CSLL sobre o lucro (sem compensar prejuízos)
+    vida_util_anos: int = Field(25, ge=1)  # depreciação linear do CAPEX
+    percentual_financiado: float = Field(0.50, ge=0, le=1)
+    taxa_juros: float = Field(0.11, ge=0, le=1)
+    prazo_anos: int = Field(12, ge=1, le=50)  # amortização SAC após a carência
+    carencia_anos: int = Field(2, ge=0, le=10)  # só juros
+
+
+class ParametrosViabilidade(BaseModel):
+    financeiro: ParametrosFinanceiros = ParametrosFinanceiros()
+    monte_carlo: ParametrosMonteCarlo = ParametrosMonteCarlo()
+
+
+class RankingMunicipiosRequest(BaseModel):
+    codigos_ibge: Optional[List[str]] = None  # padrão: todos do registro
+
+
+class EventoSimulacao(BaseModel):
+    nome: str
+    data_inicio: date
+    data_fim: date
+    publico_estimado: int = Field(..., ge=0)
+    taxa_pernoite: Optional[float] = Field(None, ge=0, le=1)
+
+
+class ParametrosSimulacaoDiaria(BaseModel):
+    replicacoes: int = Field(2000, ge=10, le=20000)
+    semente: Optional[int] = 42
+    ano: Optional[int] = Field(None, ge=2000, le=2100)  # padrão: ano corrente
+    quartos: Optional[int] = Field(None, ge=1)  # padrão: quartos_estimados do hotel proposto
+    ocupacao_base: float = Field(0.50, ge=0, le=2)  # demanda sem eventos / quartos, em dia de curva 1
+    curva_semanal: List[float] = Field(
+        [0.85, 0.85, 0.90, 0.95, 1.20, 1.35, 0.70], min_length=7, max_length=7
+    )  # multiplicador da demanda de segunda a domingo
+    variabilidade_anual: float = Field(0.10, ge=0, le=1)  # desvio (log) do nível de demanda por replicação
+    taxa_pernoite: float = Field(0.02, ge=0, le=1)  # visitantes de eventos que pernoitam
+    pessoas_por_quarto: float = Field(2.0, gt=0)
+    captura_eventos: Optional[float] = Field(None, ge=0, le=1)  # padrão: leitos do hotel / leitos totais
+    antecedencia_media: float = Field(14, gt=0)  # dias entre reserva e chegada (demanda base)
+    antecedencia_media_eventos: float = Field(45, gt=0)
+    diaria: Optional[float] = Field(None, gt=0)  # padrão: diaria_media_target do hotel proposto
+    premio_fim_semana: float = Field(0.10, ge=-0.5, le=2)  # sexta e sábado
+    premio_evento: float = Field(0.20, ge=-0.5, le=2)
+    eventos: Optional[List[EventoSimulacao]] = None  # padrão: calendário de eventos (meses inteiros)
+
+
+class EixoGrade(BaseModel):
+    """
+    Valores de um eixo da grade: lista explícita ou faixa inicio..fim
+    (inclusive) com passo.
+    """
+    valores: Optional[List[float]] = None
+    inicio: Optional[float] = None
+    fim: Optional[float] = None
+    passo: Optional[float] = Field(None, gt=0)
+
+
+class ParametrosGrade(BaseModel):
+    quartos: EixoGrade = EixoGrade(inicio=40, fim=70, passo=5)
+    diaria: EixoGrade = EixoGrade(inicio=220, fim=360, passo=10)
+    ocupacao: EixoGrade = EixoGrade(inicio=0.40, fim=0.80, passo=0.05)
+    participacao_fb: EixoGrade = EixoGrade(valores=[0.40])
+
+
 # Schemas de Filtros
 class FiltroEmpresas(BaseModel):
     cnaes: Optional[List[str]] = None
@@ -1,31 +1,130 @@
 """
 Serviço de analytics e cálculos de viabilidade para o hotel.
 """
-import json
-from datetime import date, datetime, timedelta
-from pathlib import Path
+from datetime import date, timedelta
 from typing import Dict, List, Optional
-from collections import defaultdict
-
-DATA_PATH = Path(__file__).parent.parent / "data"
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from models.schemas import ParametrosFinanceiros
+from services import financeiro
+from services.cache import CacheVersionado, cache_por_versao
+from services.cubo_aberturas import CuboAberturas
+from services.empresas_indices import data_ordinal
+from services.empresas_store import empresas_store
+from services.municipios import BundleMunicipio, bundle_padrao
+
+
+def _agregar_setores(empresas: List[dict], corte: int) -> tuple:
+    """
+    Totais, aberturas após o ordinal `corte` e CNAE modal por setor, numa
+    única passada sobre uma lista explícita de empresas.
+    """
+    totais: Dict[str, int] = defaultdict(int)
+    aberturas: Dict[str, int] = defaultdict(int)
+    cnaes: Dict[str, Counter] = defaultdict(Counter)
+
+    for emp in empresas:
+        setor = emp.get("setor_hotel", "Outros")
+        totais[setor] += 1
+        cnaes[setor][emp.get("cnae_principal") or ""] += 1
+        ordinal = data_ordinal(emp.get("data_abertura"))
+        if ordinal is not None and ordinal > corte:
+            aberturas[setor] += 1
+
+    modais = {setor: contagem.most_common(1)[0][0] for setor, contagem in cnaes.items()}
+    return dict(totais), dict(aberturas), modais
+
+
+# Pontuação máxima de cada fator do score de viabilidade (soma 100)
+PESOS_SCORE = {
+    "crescimento": 20,
+    "eventos": 25,
+    "publico": 25,
+    "gap": 30
+}
+
+
+def score_viabilidade(crescimento, eventos, publico, leitos, pesos: Optional[dict] = None):
+    """
+    Score de viabilidade (0-100); aceita escalares ou arrays NumPy.
+
+    Cada fator vale até o seu peso, proporcional à entrada normalizada:
+    crescimento (15% é bom), eventos (100+ é excelente), público (300k+ é
+    excelente) e gap de mercado (menos leitos por mil visitantes = maior
+    oportunidade). Pesos diferentes de PESOS_SCORE são reescalados para
+    somar 100.
+    """
+    pesos = pesos or PESOS_SCORE
+    total_pesos = sum(pesos.values())
+    crescimento, eventos, publico, leitos = (
+        np.asarray(v, dtype=np.float64) for v in (crescimento, eventos, publico, leitos)
+    )
+
+    # 200 leitos para 315k visitantes é muito pouco
+    ratio_leitos = leitos / np.maximum(1, publico / 1000)  # leitos por mil visitantes
+
+    fatores = {
+        "crescimento": np.minimum(1, crescimento * 1.33 / 20),
+        "eventos": np.minimum(1, eventos * 0.25 / 25),
+        "publico": np.minimum(1, publico / 300000),
+        # Quanto menor o ratio, maior o score
+        "gap": np.minimum(1, 1 / np.maximum(0.1, ratio_leitos))
+    }
+    total = sum(fatores[nome] * pesos[nome] for nome in PESOS_SCORE) * 100 / total_pesos
+    return np.clip(total, 0, 100)
+
+
+# Cenários de projeção: ocupação média anual e ajuste sobre a diária alvo
+CENARIOS_PROJECAO = [
+    {
+        "nome": "conservador",
+        "ocupacao": 0.50,
+        "diaria_ajuste": 0.90  # 10% desconto
+    },
+    {
+        "nome": "moderado",
+        "ocupacao": 0.60,
+        "diaria_ajuste": 1.0
+    },
+    {
+        "nome": "otimista",
+        "ocupacao": 0.72,
+        "diaria_ajuste": 1.10  # 10% premium
+    }
+]
 
 
 class AnalyticsService:
-    """Serviço de análises e projeções para viabilidade do hotel."""
-
-    def __init__(self):
-        self.eventos = self._load_json("eventos.json")
-        self.concorrencia = self._load_json("concorrencia.json")
-        self.empresas = self._load_json("empresas_exemplo.json")
-
-    def _load_json(self, filename: str) -> dict:
-        """Carrega arquivo JSON de dados."""
-        filepath = DATA_PATH / filename
-        if filepath.exists():
-            with open(filepath, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return {}
-
+    """
+    Serviço de análises e projeções para viabilidade do hotel.
+
+    Cada instância analisa um município (BundleMunicipio); a global usa
+    Ribeirão Pires. Os resultados ficam em cache até mudar a versão dos
+    datasets de que dependem (empresas, eventos, concorrência).
+    """
+
+    def __init__(self, municipio: Optional[BundleMunicipio] = None):
+        self.municipio = municipio or bundle_padrao
+        self._cache = CacheVersionado()
+        self._cache_sensibilidade = CacheVersionado(max_entradas=16)
+
+    def versoes_datasets(self, nomes) -> Dict[str, int]:
+        """Versões atuais dos datasets usados como chave do cache."""
+        return self.municipio.versoes(nomes)
+
+    @property
+    def eventos(self) -> dict:
+        """Dados de eventos (relidos se o arquivo mudar)."""
+        return self.municipio.eventos.dados()
+
+    @property
+    def concorrencia(self) -> dict:
+        """Dados de concorrência (relidos se o arquivo mudar)."""
+        return self.municipio.concorrencia.dados()
+
+    @cache_por_versao("empresas", "eventos", "concorrencia", diario=True)
     def calcular_kpis(self, empresas: List[dict] = None) -> dict:
         """
         Calcula KPIs principais do dashboard.
@@ -33,31 +132,37 @@ class AnalyticsService:
         Returns:
             Dict com todos os KPIs calculados
         """
-        if empresas is None:
-            empresas = self.empresas.get("empresas", [])
-
-        # Total de empresas estratégicas
-        total_empresas = len(empresas)
-
-        # Empresas abertas no último ano
         um_ano_atras = date.today() - timedelta(days=365)
-        empresas_ultimo_ano = sum(
-            1 for e in empresas
-            if datetime.strptime(e.get("data_abertura", "2000-01-01"), "%Y-%m-%d").date() > um_ano_atras
-        )
 
-        # Crescimento (simulado baseado nos dados do estudo)
-        # 2024: 326 empresas, jan-set 2025: 298 = ~33/mês
-        crescimento_geral = 15.2  # % baseado nos dados do estudo
+        if empresas is None:
+            empresas = self.municipio.lista_empresas()
+
+        if empresas is None:
+            # Snapshot colunar: contagem vetorizada sobre as datas já convertidas
+            colunar = empresas_store.snapshot_colunar()
+            total_empresas = colunar.total
+            empresas_ultimo_ano = int(colunar.mascara(um_ano_atras.toordinal()).sum())
+        else:
+            total_empresas = len(empresas)
+            _, aberturas, _ = _agregar_setores(empresas, um_ano_atras.toordinal())
+            empresas_ultimo_ano = sum(aberturas.values())
+
+        # Crescimento: valor do estudo do município, se houver; senão,
+        # aberturas do último ano sobre a base existente antes delas
+        crescimento_geral = self.municipio.crescimento_empresarial
+        if crescimento_geral is None:
+            crescimento_geral = round(
+                empresas_ultimo_ano / max(1, total_empresas - empresas_ultimo_ano) * 100, 1
+            )
 
         # Eventos
         eventos_data = self.eventos.get("resumo", {})
         total_eventos = eventos_data.get("total_eventos_ano", 127)
         publico_total = eventos_data.get("publico_total_estimado", 315000)
 
-        # Concorrência
+        # Concorrência (leitos_ribeirao_pires é o nome antigo de leitos_cidade)
         conc_data = self.concorrencia.get("analise_mercado", {})
-        leitos_cidade = conc_data.get("leitos_ribeirao_pires", 200)
+        leitos_cidade = conc_data.get("leitos_cidade", conc_data.get("leitos_ribeirao_pires", 200))
 
         # Gap de mercado estimado (visitantes que poderiam pernoitar vs leitos)
         # Assumindo 2% dos visitantes pernoitariam = 6.300 diárias/ano
@@ -95,32 +200,97 @@ class AnalyticsService:
         """
         Calcula score de viabilidade de 0 a 100.
 
-        Pesos:
+        Pesos (PESOS_SCORE):
         - Crescimento empresarial: 20%
         - Volume de eventos: 25%
         - Público turístico: 25%
         - Gap de mercado (poucos leitos): 30%
         """
-        # Normalização e pontuação
+        return round(float(score_viabilidade(crescimento, eventos, publico, leitos)), 1)
 
-        # Crescimento (0-20 pontos) - 15% é bom
-        score_crescimento = min(20, crescimento * 1.33)
+    def sensibilidade_score(self, variacao: float = 0.3, pontos: int = 21, amostras: int = 500) -> dict:
+        """
+        Sensibilidade do score às entradas e aos pesos, em cache por versão
+        dos datasets (e por dia, como os KPIs).
 
-        # Eventos (0-25 pontos) - 100+ eventos é excelente
-        score_eventos = min(25, eventos * 0.25)
+        Args:
+            variacao: Perturbação relativa de cada entrada (0.3 = ±30%)
+            pontos: Valores por entrada na dependência parcial
+            amostras: Amostras das demais entradas para a média da dependência parcial
+        """
+        chave = tuple(sorted(self.versoes_datasets(("empresas", "eventos", "concorrencia")).items()))
+        chave += (date.today().toordinal(),)
+        return self._cache_sensibilidade.obter(
+            (variacao, pontos, amostras), chave,
+            lambda: self._sensibilidade_score(variacao, pontos, amostras)
+        )
 
-        # Público (0-25 pontos) - 300k+ é excelente
-        score_publico = min(25, (publico / 300000) * 25)
+    def _sensibilidade_score(self, variacao: float, pontos: int, amostras: int) -> dict:
+        kpis = self.calcular_kpis()
+        base = {
+            "crescimento": kpis["crescimento_geral"],
+            "eventos": kpis["total_eventos_ano"],
+            "publico": kpis["publico_total_eventos"],
+            "leitos": kpis["leitos_disponiveis_cidade"],
+            **{f"peso_{fator}": peso for fator, peso in PESOS_SCORE.items()}
+        }
+        nomes = list(base)
+        valores_base = np.array([base[n] for n in nomes], dtype=np.float64)
+        fatores = np.linspace(1 - variacao, 1 + variacao, pontos)
+        rng = np.random.default_rng(0)
+
+        # Lote único: um bloco por entrada, com `amostras` linhas para cada
+        # valor da grade e as demais entradas sorteadas em ±variacao; a
+        # última amostra de cada valor mantém as demais entradas na base
+        # (usada no tornado)
+        n = len(nomes)
+        entradas = valores_base * rng.uniform(1 - variacao, 1 + variacao, (n, pontos, amostras, n))
+        entradas[:, :, -1, :] = valores_base
+        indices = np.arange(n)
+        entradas[indices, :, :, indices] = valores_base[:, None, None] * fatores[None, :, None]
+
+        pesos = {fator: entradas[..., nomes.index(f"peso_{fator}")] for fator in PESOS_SCORE}
+        scores = score_viabilidade(
+            entradas[..., 0], entradas[..., 1], entradas[..., 2], entradas[..., 3], pesos
+        )
 
-        # Gap de mercado (0-30 pontos) - menos leitos = maior oportunidade
-        # 200 leitos para 315k visitantes é muito pouco
-        ratio_leitos = leitos / max(1, publico / 1000)  # leitos por mil visitantes
-        # Quanto menor o ratio, maior o score
-        score_gap = min(30, (10 / max(0.1, ratio_leitos)) * 3)
+        isolado = scores[:, :, -1]  # demais entradas na base
+        tornado = sorted(
+            (
+                {
+                    "entrada": nome,
+                    "valor_base": round(float(valores_base[i]), 2),
+                    "valor_baixo": round(float(valores_base[i] * fatores[0]), 2),
+                    "valor_alto": round(float(valores_base[i] * fatores[-1]), 2),
+                    "score_baixo": round(float(isolado[i, 0]), 1),
+                    "score_alto": round(float(isolado[i, -1]), 1),
+                    "amplitude": round(float(abs(isolado[i, -1] - isolado[i, 0])), 1)
+                }
+                for i, nome in enumerate(nomes)
+            ),
+            key=lambda item: item["amplitude"],
+            reverse=True
+        )
 
-        total = score_crescimento + score_eventos + score_publico + score_gap
-        return round(min(100, max(0, total)), 1)
+        return {
+            "score_base": round(float(score_viabilidade(
+                base["crescimento"], base["eventos"], base["publico"], base["leitos"]
+            )), 1),
+            "variacao": variacao,
+            "avaliacoes": int(scores.size),
+            "tornado": tornado,
+            "dependencia_parcial": {
+                nome: {
+                    "valores": np.round(valores_base[i] * fatores, 2).tolist(),
+                    "score": np.round(scores[i].mean(axis=1), 2).tolist(),
+                    "score_p10": np.round(np.percentile(scores[i], 10, axis=1), 2).tolist(),
+                    "score_p90": np.round(np.percentile(scores[i], 90, axis=1), 2).tolist()
+                }
+                for i, nome in enumerate(nomes)
+            }
+        }
 
+    @cache_por_versao("empresas", diario=True)
     def calcular_tendencias_setor(self, empresas: List[dict] = None) -> List[dict]:
         """
         Calcula tendências por setor.
@@ -128,26 +298,25 @@ class AnalyticsService:
         Returns:
             Lista de tendências por setor
         """
+        um_ano_atras = date.today() - timedelta(days=365)
+
         if empresas is None:
-            empresas = self.empresas.get("empresas", [])
+            empresas = self.municipio.lista_empresas()
 
-        # Agrupar por setor
-        por_setor = defaultdict(list)
-        for emp in empresas:
-            setor = emp.get("setor_hotel", "Outros")
-            por_setor[setor].append(emp)
+        if empresas is None:
+            # Group-bys vetorizados (bincount) sobre os códigos de setor e CNAE
+            colunar = empresas_store.snapshot_colunar()
+            totais = colunar.contar("setor")
+            aberturas = colunar.contar("setor", colunar.mascara(um_ano_atras.toordinal()))
+            cnaes_modais = colunar.moda("setor", "cnae")
+        else:
+            totais, aberturas, cnaes_modais = _agregar_setores(empresas, um_ano_atras.toordinal())
 
         tendencias = []
-        um_ano_atras = date.today() - timedelta(days=365)
 
-        for setor, lista in por_setor.items():
-            total = len(lista)
-
-            # Contar aberturas no último ano
-            aberturas_12m = sum(
-                1 for e in lista
-                if datetime.strptime(e.get("data_abertura", "2000-01-01"), "%Y-%m-%d").date() > um_ano_atras
-            )
+        for setor, total in totais.items():
+            # Aberturas no último ano
+            aberturas_12m = aberturas.get(setor, 0)
 
             # Crescimento percentual (simplificado)
             crescimento = (aberturas_12m / max(1, total - aberturas_12m)) * 100 if total > 0 else 0
@@ -155,13 +324,9 @@ class AnalyticsService:
             # Média mensal
             media_mensal = aberturas_12m / 12
 
-            # Pegar CNAE mais comum do setor
-            cnaes = [e.get("cnae_principal", "") for e in lista]
-            cnae_comum = max(set(cnaes), key=cnaes.count) if cnaes else ""
-
             tendencias.append({
                 "setor": setor,
-                "cnae": cnae_comum,
+                "cnae": cnaes_modais.get(setor, ""),
                 "total_empresas": total,
                 "aberturas_12_meses": aberturas_12m,
                 "crescimento_percentual": round(crescimento, 1),
@@ -172,61 +337,85 @@ class AnalyticsService:
         tendencias.sort(key=lambda x: x["total_empresas"], reverse=True)
         return tendencias
 
-    def calcular_projecoes(self) -> List[dict]:
+    def serie_aberturas(self, **parametros) -> dict:
+        """
+        Série temporal de aberturas (ver CuboAberturas.serie).
+
+        No município padrão usa o cubo mantido pelo EmpresasStore; nos
+        demais, monta o cubo a partir da lista de empresas do bundle.
+        """
+        empresas = self.municipio.lista_empresas()
+        if empresas is None:
+            return empresas_store.serie_aberturas(**parametros)
+        return CuboAberturas(empresas).serie(**parametros)
+
+    def receitas_cenarios(self, quartos: Optional[int] = None) -> Dict[str, np.ndarray]:
         """
-        Calcula projeções de ocupação e receita para diferentes cenários.
+        Ocupação, diária e receitas anuais estabilizadas dos cenários de projeção.
+
+        Args:
+            quartos: Número de quartos (padrão: quartos_estimados do hotel proposto)
 
         Returns:
-            Lista de projeções para cenários conservador, moderado e otimista
+            Dict com nomes e arrays (um valor por cenário) de ocupacao, diaria,
+            revpar, receita_quartos e receita_fb
         """
         hotel = self.concorrencia.get("hotel_proposto", {})
-        quartos = hotel.get("quartos_estimados", 55)
+        if quartos is None:
+            quartos = hotel.get("quartos_estimados", 55)
         diaria_media = hotel.get("diaria_media_target", 280)
 
-        cenarios = [
-            {
-                "nome": "conservador",
-                "ocupacao": 0.50,
-                "diaria_ajuste": 0.90  # 10% desconto
-            },
-            {
-                "nome": "moderado",
-                "ocupacao": 0.60,
-                "diaria_ajuste": 1.0
-            },
-            {
-                "nome": "otimista",
-                "ocupacao": 0.72,
-                "diaria_ajuste": 1.10  # 10% premium
-            }
-        ]
+        ocupacao = np.array([c["ocupacao"] for c in CENARIOS_PROJECAO])
+        diaria = diaria_media * np.array([c["diaria_ajuste"] for c in CENARIOS_PROJECAO])
 
-        projecoes = []
-        for cenario in cenarios:
-            ocupacao = cenario["ocupacao"]
-            diaria = diaria_media * cenario["diaria_ajuste"]
+        # RevPAR = Diária média * Ocupação
+        revpar = diaria * ocupacao
 
-            # RevPAR = Diária média * Ocupação
-            revpar = diaria * ocupacao
+        # Receita anual de quartos
+        diarias_vendidas = quartos * 365 * ocupacao
+        receita_quartos = diarias_vendidas * diaria
 
-            # Receita anual de quartos
-            diarias_vendidas = quartos * 365 * ocupacao
-            receita_quartos = diarias_vendidas * diaria
+        # Receita adicional (restaurante + rooftop + eventos) ~40% da receita de quartos
+        receita_fb = receita_quartos * 0.40
 
-            # Receita adicional (restaurante + rooftop + eventos) ~40% da receita de quartos
-            receita_fb = receita_quartos * 0.40
+        return {
+            "nomes": [c["nome"] for c in CENARIOS_PROJECAO],
+            "quartos": quartos,
+            "ocupacao": ocupacao,
+            "diaria": diaria,
+            "revpar": revpar,
+            "receita_quartos": receita_quartos,
+            "receita_fb": receita_fb
+        }
 
-            receita_total = receita_quartos + receita_fb
+    @cache_por_versao("concorrencia")
+    def calcular_projecoes(self) -> List[dict]:
+        """
+        Calcula projeções de ocupação, receita e retorno do investimento
+        para diferentes cenários.
 
-            projecoes.append({
-                "cenario": cenario["nome"],
-                "ocupacao_media_anual": round(ocupacao * 100, 1),
-                "revpar_estimado": round(revpar, 2),
-                "receita_anual_estimada": round(receita_total, 2),
-                "payback_anos": None  # Requer dados de investimento
-            })
+        Returns:
+            Lista de projeções para cenários conservador, moderado e otimista
+        """
+        cenarios = self.receitas_cenarios()
+        receita_total = cenarios["receita_quartos"] + cenarios["receita_fb"]
+
+        # Fluxo de caixa com as premissas financeiras padrão
+        parametros = financeiro.parametros_padrao(ParametrosFinanceiros().model_dump(), cenarios["quartos"])
+        resultado = financeiro.avaliar(cenarios["receita_quartos"], cenarios["receita_fb"], parametros)
 
-        return projecoes
+        return [
+            {
+                "cenario": nome,
+                "ocupacao_media_anual": round(float(cenarios["ocupacao"][i]) * 100, 1),
+                "revpar_estimado": round(float(cenarios["revpar"][i]), 2),
+                "receita_anual_estimada": round(float(receita_total[i]), 2),
+                "payback_anos": financeiro.arredondar(resultado["payback"][i], 1),
+                "vpl": financeiro.arredondar(resultado["vpl"][i]),
+                "tir": financeiro.arredondar(resultado["tir"][i] * 100, 1)
+            }
+            for i, nome in enumerate(cenarios["nomes"])
+        ]
 
     def get_eventos_por_mes(self) -> Dict[int, List[dict]]:
         """
@@ -252,6 +441,7 @@ class AnalyticsService:
 
         return dict(por_mes)
 
+    @cache_por_versao("eventos")
     def calcular_sazonalidade(self) -> List[dict]:
         """
         Calcula índice de sazonalidade por mês baseado nos eventos.
@@ -296,6 +486,7 @@ class AnalyticsService:
 
         return sazonalidade
 
+    @cache_por_versao("empresas", "eventos", "concorrencia", diario=True)
     def get_analise_completa(self, empresas: List[dict] = None) -> dict:
         """
         Retorna análise completa para o dashboard.
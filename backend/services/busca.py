@@ -0,0 +1,191 @@
+"""
+Índice de busca textual e aproximada sobre as empresas.
+
+- Índice invertido: termo normalizado (sem acentos, minúsculo) -> {id: peso}
+- Vocabulário ordenado para completar prefixos ("buff" -> "buffet")
+- Índice de trigramas sobre o vocabulário para tolerar erros de digitação
+
+Indexa razao_social, nome_fantasia, bairro e notas, com pesos por campo,
+e é atualizado incrementalmente a cada alteração do dataset.
+"""
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Campos indexados e seus pesos no ranking
+PESOS_CAMPOS = {
+    "razao_social": 3.0,
+    "nome_fantasia": 3.0,
+    "bairro": 1.0,
+    "notas": 0.5
+}
+
+# Termos muito frequentes em razões sociais, sem valor de busca
+STOPWORDS = {
+    "ltda", "me", "epp", "eireli", "sa", "s", "a", "o", "e", "de", "da",
+    "do", "das", "dos", "em", "com", "para"
+}
+
+# Jaccard mínimo entre os conjuntos de trigramas (0.3, como o pg_trgm):
+# um erro de uma letra numa palavra de 4-6 letras fica entre 0.3 e 0.5
+LIMIAR_SIMILARIDADE = 0.3
+MAX_EXPANSOES_PREFIXO = 50
+MAX_EXPANSOES_FUZZY = 20
+
+_RE_TERMO = re.compile(r"[a-z0-9]+")
+
+
+def normalizar(texto: str) -> str:
+    """Remove acentos e converte para minúsculas."""
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Quebra o texto em termos normalizados, sem stopwords."""
+    return [t for t in _RE_TERMO.findall(normalizar(texto)) if t not in STOPWORDS]
+
+
+def trigramas(termo: str) -> Set[str]:
+    """Trigramas do termo com bordas (estilo pg_trgm)."""
+    padded = f"  {termo} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class IndiceBusca:
+    """Índice invertido + trigramas, mantido incrementalmente."""
+
+    def __init__(self, empresas: Iterable[dict] = ()):
+        self._docs: Dict[int, Dict[str, float]] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._trigramas: Dict[str, Set[str]] = defaultdict(set)
+        # Termo -> tamanho do seu conjunto de trigramas (para o Jaccard)
+        self._n_trigramas: Dict[str, int] = {}
+        self._vocabulario: List[str] = []
+
+        for emp in empresas:
+            self._indexar(emp, ordenar=False)
+        self._vocabulario.sort()
+
+    # Manutenção
+
+    @staticmethod
+    def _termos(emp: dict) -> Dict[str, float]:
+        termos: Dict[str, float] = {}
+        for campo, peso in PESOS_CAMPOS.items():
+            for termo in set(tokenizar(emp.get(campo) or "")):
+                termos[termo] = termos.get(termo, 0.0) + peso
+        return termos
+
+    def _indexar(self, emp: dict, ordenar: bool = True):
+        empresa_id = emp.get("id")
+        termos = self._termos(emp)
+        self._docs[empresa_id] = termos
+
+        for termo, peso in termos.items():
+            postings = self._postings.get(termo)
+            if postings is None:
+                postings = self._postings[termo] = {}
+                tris = trigramas(termo)
+                for tri in tris:
+                    self._trigramas[tri].add(termo)
+                self._n_trigramas[termo] = len(tris)
+                if ordenar:
+                    insort(self._vocabulario, termo)
+                else:
+                    self._vocabulario.append(termo)
+            postings[empresa_id] = peso
+
+    def adicionar(self, emp: dict):
+        self._indexar(emp)
+
+    def remover(self, emp: dict):
+        empresa_id = emp.get("id")
+        for termo in self._docs.pop(empresa_id, {}):
+            postings = self._postings[termo]
+            postings.pop(empresa_id, None)
+            if not postings:
+                del self._postings[termo]
+                del self._n_trigramas[termo]
+                for tri in trigramas(termo):
+                    self._trigramas[tri].discard(termo)
+                i = bisect_left(self._vocabulario, termo)
+                if i < len(self._vocabulario) and self._vocabulario[i] == termo:
+                    del self._vocabulario[i]
+
+    def atualizar(self, antes: dict, depois: dict):
+        if any(antes.get(c) != depois.get(c) for c in PESOS_CAMPOS):
+            self.remover(antes)
+            self._indexar(depois)
+
+    # Consulta
+
+    def _expandir(self, termo: str) -> Dict[str, float]:
+        """Termos do vocabulário que casam com o termo da consulta e seus fatores."""
+        expansoes: Dict[str, float] = {}
+
+        # Prefixo (inclui o termo exato)
+        i = bisect_left(self._vocabulario, termo)
+        for candidato in self._vocabulario[i:i + MAX_EXPANSOES_PREFIXO]:
+            if not candidato.startswith(termo):
+                break
+            expansoes[candidato] = 1.0 if candidato == termo else 0.8
+
+        # Aproximado por trigramas, só quando não há casamento exato
+        if termo not in self._postings and len(termo) >= 3:
+            tri_termo = trigramas(termo)
+            comuns: Dict[str, int] = defaultdict(int)
+            for tri in tri_termo:
+                for candidato in self._trigramas.get(tri, ()):
+                    comuns[candidato] += 1
+            similares = []
+            for candidato, n in comuns.items():
+                # Jaccard: |A ∩ B| / |A ∪ B|
+                similaridade = n / (len(tri_termo) + self._n_trigramas[candidato] - n)
+                if similaridade >= LIMIAR_SIMILARIDADE:
+                    similares.append((similaridade, candidato))
+            for similaridade, candidato in heapq.nlargest(MAX_EXPANSOES_FUZZY, similares):
+                expansoes.setdefault(candidato, 0.7 * similaridade)
+
+        return expansoes
+
+    def buscar(self, consulta: str, limite: int = 20) -> List[Tuple[int, float]]:
+        """
+        Busca empresas pela consulta.
+
+        Empresas que casam com mais termos da consulta vêm primeiro; o
+        empate é decidido pela soma de peso do campo x idf x fator de
+        casamento (exato, prefixo ou aproximado).
+
+        Returns:
+            Lista de (id, score) em ordem decrescente de relevância
+        """
+        termos = tokenizar(consulta)
+        if not termos or not self._docs:
+            return []
+
+        total_docs = len(self._docs)
+        pontuacao: Dict[int, float] = defaultdict(float)
+        cobertura: Dict[int, int] = defaultdict(int)
+
+        for termo in dict.fromkeys(termos):
+            melhor: Dict[int, float] = {}
+            for candidato, fator in self._expandir(termo).items():
+                postings = self._postings[candidato]
+                idf = math.log(1 + total_docs / len(postings))
+                for empresa_id, peso in postings.items():
+                    valor = peso * idf * fator
+                    if valor > melhor.get(empresa_id, 0.0):
+                        melhor[empresa_id] = valor
+            for empresa_id, valor in melhor.items():
+                pontuacao[empresa_id] += valor
+                cobertura[empresa_id] += 1
+
+        ranking = heapq.nlargest(
+            limite, pontuacao, key=lambda d: (cobertura[d], pontuacao[d])
+        )
+        return [(empresa_id, round(pontuacao[empresa_id], 3)) for empresa_id in ranking]
@@ -0,0 +1,111 @@
+"""
+Cache de resultados invalidado pelas versões dos datasets.
+
+Cada resultado fica guardado junto com as versões dos datasets de que
+depende; enquanto elas não mudam, o valor é reaproveitado. Quando mudam,
+o primeiro chamador recalcula e os concorrentes esperam por esse mesmo
+cálculo, em vez de recalcular cada um o seu.
+"""
+import functools
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class CacheVersionado:
+    """
+    Valores por nome, válidos enquanto a chave de versões não muda.
+
+    Com `max_entradas`, os nomes menos usados recentemente são descartados
+    (ex.: resultados por hash de parâmetros).
+    """
+
+    def __init__(self, max_entradas: Optional[int] = None):
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[Hashable, Tuple[Hashable, Any]]" = OrderedDict()
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.calculos = 0
+
+    def _lock_de(self, nome: Hashable) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(nome, threading.Lock())
+
+    def obter(self, nome: Hashable, chave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor guardado para `nome` se a chave for a mesma;
+        senão calcula (uma única vez, mesmo com chamadas concorrentes).
+        """
+        entrada = self._entradas.get(nome)
+        if entrada is not None and entrada[0] == chave:
+            self.acertos += 1
+            if self.max_entradas is not None:
+                self._tocar(nome)
+            return entrada[1]
+
+        with self._lock_de(nome):
+            entrada = self._entradas.get(nome)
+            if entrada is not None and entrada[0] == chave:
+                self.acertos += 1
+                return entrada[1]
+            valor = calcular()
+            self.guardar(nome, chave, valor)
+            return valor
+
+    def consultar(self, nome: Hashable, chave: Hashable) -> Any:
+        """Valor guardado para `nome` com a mesma chave, ou None."""
+        entrada = self._entradas.get(nome)
+        if entrada is None or entrada[0] != chave:
+            return None
+        self.acertos += 1
+        if self.max_entradas is not None:
+            self._tocar(nome)
+        return entrada[1]
+
+    def guardar(self, nome: Hashable, chave: Hashable, valor: Any):
+        """Guarda um valor calculado fora do cache (ex.: em outro processo)."""
+        with self._lock:
+            self._entradas[nome] = (chave, valor)
+            self._entradas.move_to_end(nome)
+            while self.max_entradas is not None and len(self._entradas) > self.max_entradas:
+                antigo, _ = self._entradas.popitem(last=False)
+                self._locks.pop(antigo, None)
+        self.calculos += 1
+
+    def _tocar(self, nome: Hashable):
+        with self._lock:
+            if nome in self._entradas:
+                self._entradas.move_to_end(nome)
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+def cache_por_versao(*datasets: str, diario: bool = False):
+    """
+    Memoiza um método enquanto as versões de `datasets` não mudam.
+
+    O objeto precisa ter `_cache` (CacheVersionado) e `versoes_datasets`.
+    Chamadas com argumentos explícitos (ex.: uma lista de empresas já
+    filtrada) não usam o cache.
+
+    Args:
+        datasets: Nomes dos datasets de que o resultado depende
+        diario: O resultado depende da data de hoje (janelas de 12 meses)
+    """
+    def decorador(metodo):
+        @functools.wraps(metodo)
+        def wrapper(self, *args, **kwargs):
+            if any(a is not None for a in args) or any(v is not None for v in kwargs.values()):
+                return metodo(self, *args, **kwargs)
+
+            chave = tuple(sorted(self.versoes_datasets(datasets).items()))
+            if diario:
+                chave += (date.today().toordinal(),)
+            return self._cache.obter(metodo.__name__, chave, lambda: metodo(self))
+        return wrapper
+    return decorador
+
@@ -52,6 +52,15 @@ class CNAEClassifier:
             }
         return None
 
+    def classificar_lote(self, cnaes: List[str]) -> Dict[str, Optional[dict]]:
+        """
+        Classifica vários CNAEs de uma vez, cada código distinto uma única vez.
+
+        Returns:
+            Dict código -> classificação (ou None se não estratégico)
+        """
+        return {codigo: self.classificar(codigo) for codigo in set(cnaes)}
+
     def is_estrategico(self, cnae_codigo: str) -> bool:
         """Verifica se um CNAE é estratégico para o hotel."""
         cnae_normalizado = cnae_codigo.replace(".", "").strip()
@@ -98,6 +107,32 @@ class CNAEClassifier:
 classifier = CNAEClassifier()
 
 
+def _nao_classificado(cnae_principal: str) -> dict:
+    return {
+        "codigo": cnae_principal,
+        "descricao": "Não classificado",
+        "setor_hotel": "Outros",
+        "relevancia": "outros",
+        "impacto": ""
+    }
+
+
+def classificar_empresas(cnaes: List[str]) -> Dict[str, dict]:
+    """
+    Versão em lote de classificar_empresa.
+
+    Args:
+        cnaes: Códigos CNAE principais (podem se repetir)
+
+    Returns:
+        Dict código -> classificação (com "Outros" se não estratégico)
+    """
+    return {
+        codigo: resultado or _nao_classificado(codigo)
+        for codigo, resultado in classifier.classificar_lote(cnaes).items()
+    }
+
+
 def classificar_empresa(cnae_principal: str) -> dict:
     """
     Função utilitária para classificar uma empresa pelo CNAE principal.
@@ -111,10 +146,4 @@ def classificar_empresa(cnae_principal: str) -> dict:
     resultado = classifier.classificar(cnae_principal)
     if resultado:
         return resultado
-    return {
-        "codigo": cnae_principal,
-        "descricao": "Não classificado",
-        "setor_hotel": "Outros",
-        "relevancia": "outros",
-        "impacto": ""
-    }
+    return _nao_classificado(cnae_principal)
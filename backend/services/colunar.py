@@ -0,0 +1,175 @@
+"""
+Snapshot colunar (NumPy) das empresas para agregações vetorizadas.
+
+Cada empresa é uma linha em arrays paralelos:
+- data de abertura como ordinal (int32, -1 se ausente)
+- códigos categóricos (int32) para setor, porte, status, CNAE e bairro,
+  com um catálogo valor <-> código por coluna
+
+O snapshot é mantido incrementalmente junto com os demais índices do
+EmpresasStore: inserções usam capacidade amortizada, atualizações
+sobrescrevem a linha e exclusões marcam a linha como inativa (as linhas
+inativas são compactadas quando passam de um quarto do total).
+Contagens e modas por grupo saem de np.bincount sobre os códigos.
+"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from services.empresas_indices import data_ordinal
+
+# Coluna categórica -> (campo da empresa, valor padrão)
+CATEGORIAS = {
+    "setor": ("setor_hotel", "Outros"),
+    "porte": ("porte", "OUTROS"),
+    "status": ("status_parceria", "nao_contatado"),
+    "cnae": ("cnae_principal", ""),
+    "bairro": ("bairro", ""),
+}
+
+CAPACIDADE_INICIAL = 1024
+
+
+class Catalogo:
+    """Mapeamento valor <-> código inteiro de uma coluna categórica."""
+
+    def __init__(self):
+        self.valores: List[str] = []
+        self.codigos: Dict[str, int] = {}
+
+    def codigo(self, valor: str) -> int:
+        codigo = self.codigos.get(valor)
+        if codigo is None:
+            codigo = self.codigos[valor] = len(self.valores)
+            self.valores.append(valor)
+        return codigo
+
+    def __len__(self) -> int:
+        return len(self.valores)
+
+
+class SnapshotColunar:
+    """Colunas NumPy das empresas, mantidas a cada alteração do dataset."""
+
+    def __init__(self, empresas: Iterable[dict] = ()):
+        empresas = list(empresas)
+        self.catalogos: Dict[str, Catalogo] = {nome: Catalogo() for nome in CATEGORIAS}
+        self._posicao: Dict[int, int] = {}
+        self.n = 0
+        self.inativas = 0
+
+        capacidade = max(CAPACIDADE_INICIAL, len(empresas))
+        self.ids = np.zeros(capacidade, dtype=np.int64)
+        self.data = np.full(capacidade, -1, dtype=np.int32)
+        self.ativo = np.zeros(capacidade, dtype=bool)
+        self.codigos: Dict[str, np.ndarray] = {
+            nome: np.zeros(capacidade, dtype=np.int32) for nome in CATEGORIAS
+        }
+
+        for emp in empresas:
+            self._escrever(self.n, emp)
+            self._posicao[emp.get("id")] = self.n
+            self.n += 1
+
+    # Manutenção
+
+    def _escrever(self, linha: int, emp: dict):
+        self.ids[linha] = emp.get("id") or 0
+        ordinal = data_ordinal(emp.get("data_abertura"))
+        self.data[linha] = ordinal if ordinal is not None else -1
+        self.ativo[linha] = True
+        for nome, (campo, padrao) in CATEGORIAS.items():
+            self.codigos[nome][linha] = self.catalogos[nome].codigo(emp.get(campo) or padrao)
+
+    def _crescer(self):
+        capacidade = len(self.ids) * 2
+        self.ids = np.resize(self.ids, capacidade)
+        self.data = np.resize(self.data, capacidade)
+        self.ativo = np.resize(self.ativo, capacidade)
+        self.ativo[self.n:] = False
+        for nome in CATEGORIAS:
+            self.codigos[nome] = np.resize(self.codigos[nome], capacidade)
+
+    def _compactar(self):
+        """Remove as linhas inativas, preservando a ordem."""
+        vivas = np.flatnonzero(self.ativo[:self.n])
+        total = len(vivas)
+        self.ids[:total] = self.ids[vivas]
+        self.data[:total] = self.data[vivas]
+        for nome in CATEGORIAS:
+            self.codigos[nome][:total] = self.codigos[nome][vivas]
+        self.ativo[:total] = True
+        self.ativo[total:] = False
+        self.n = total
+        self.inativas = 0
+        self._posicao = {int(i): linha for linha, i in enumerate(self.ids[:total])}
+
+    def adicionar(self, emp: dict):
+        if self.n == len(self.ids):
+            self._crescer()
+        self._escrever(self.n, emp)
+        self._posicao[emp.get("id")] = self.n
+        self.n += 1
+
+    def remover(self, emp: dict):
+        linha = self._posicao.pop(emp.get("id"), None)
+        if linha is None:
+            return
+        self.ativo[linha] = False
+        self.inativas += 1
+        if self.inativas > CAPACIDADE_INICIAL and self.inativas * 4 > self.n:
+            self._compactar()
+
+    def atualizar(self, antes: dict, depois: dict):
+        linha = self._posicao.get(antes.get("id"))
+        if linha is None:
+            self.adicionar(depois)
+        else:
+            self._escrever(linha, depois)
+
+    # Consulta
+
+    @property
+    def total(self) -> int:
+        return len(self._posicao)
+
+    def mascara(self, abertas_apos: Optional[int] = None) -> np.ndarray:
+        """
+        Linhas ativas (opcionalmente só as abertas após o ordinal).
+        """
+        mascara = self.ativo[:self.n]
+        if abertas_apos is not None:
+            mascara = mascara & (self.data[:self.n] > abertas_apos)
+        return mascara
+
+    def contar(self, coluna: str, mascara: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """Contagem por valor de uma coluna categórica (group-by count)."""
+        if mascara is None:
+            mascara = self.mascara()
+        catalogo = self.catalogos[coluna]
+        contagem = np.bincount(self.codigos[coluna][:self.n][mascara], minlength=len(catalogo))
+        return {
+            catalogo.valores[codigo]: int(contagem[codigo])
+            for codigo in np.flatnonzero(contagem)
+        }
+
+    def _cruzar(self, coluna_a: str, coluna_b: str, mascara: np.ndarray) -> np.ndarray:
+        """Matriz de contagens (códigos de A x códigos de B)."""
+        na, nb = len(self.catalogos[coluna_a]), len(self.catalogos[coluna_b])
+        a = self.codigos[coluna_a][:self.n][mascara].astype(np.int64)
+        b = self.codigos[coluna_b][:self.n][mascara]
+        return np.bincount(a * nb + b, minlength=na * nb).reshape(na, nb)
+
+    def moda(self, grupo: str, coluna: str, mascara: Optional[np.ndarray] = None) -> Dict[str, str]:
+        """Valor mais frequente de `coluna` em cada valor de `grupo`."""
+        if mascara is None:
+            mascara = self.mascara()
+        matriz = self._cruzar(grupo, coluna, mascara)
+        presentes = np.flatnonzero(matriz.sum(axis=1))
+        modas = matriz[presentes].argmax(axis=1)
+        valores_grupo = self.catalogos[grupo].valores
+        valores_coluna = self.catalogos[coluna].valores
+        return {
+            valores_grupo[g]: valores_coluna[m]
+            for g, m in zip(presentes, modas)
+        }
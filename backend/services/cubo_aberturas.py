@@ -0,0 +1,291 @@
+"""
+Cubo de aberturas de empresas: mês x CNAE x setor x porte x bairro.
+
+Cada célula conta as empresas abertas num mês com uma combinação de
+CNAE, setor, porte e bairro. O cubo é mantido incrementalmente junto com
+os demais índices do EmpresasStore (deltas de +1/-1 por empresa), então
+séries temporais não percorrem a lista de empresas:
+
+- sem filtros, a série vem dos totais por mês ou das marginais
+  mês x dimensão (uma consulta por mês do intervalo)
+- com um filtro, vem das marginais mês x valor do filtro x valor do
+  agrupamento (acesso direto ao valor filtrado)
+- com mais filtros, percorre só as células dos meses do intervalo
+
+A granularidade mínima é o mês: datas de início e fim selecionam os
+meses que as contêm, dentro do intervalo com aberturas. Trimestres e
+anos são roll-ups dos meses.
+"""
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from itertools import permutations
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.empresas_indices import data_ordinal
+
+# Dimensão -> (campo da empresa, valor padrão), na ordem das células
+DIMENSOES = {
+    "cnae": ("cnae_principal", ""),
+    "setor": ("setor_hotel", "Outros"),
+    "porte": ("porte", "OUTROS"),
+    "bairro": ("bairro", ""),
+}
+
+# Pares (filtro, agrupamento) com marginais próprias
+PARES = tuple(permutations(DIMENSOES, 2))
+
+# Granularidade -> meses por período
+GRANULARIDADES = {"mes": 1, "trimestre": 3, "ano": 12}
+
+
+def indice_mes(dia: date) -> int:
+    """Mês como inteiro contínuo (ano * 12 + mês - 1)."""
+    return dia.year * 12 + dia.month - 1
+
+
+def rotulo_periodo(inicio: int, granularidade: str) -> str:
+    """Rótulo do período que começa no mês `inicio` (2025-03, 2025-T1, 2025)."""
+    ano, mes = divmod(inicio, 12)
+    if granularidade == "ano":
+        return str(ano)
+    if granularidade == "trimestre":
+        return f"{ano}-T{mes // 3 + 1}"
+    return f"{ano}-{mes + 1:02d}"
+
+
+class CuboAberturas:
+    """Contagens de aberturas por mês e dimensões, mantidas por deltas."""
+
+    def __init__(self, empresas: Iterable[dict] = ()):
+        # mês -> célula (cnae, setor, porte, bairro) -> quantidade
+        self.celulas: Dict[int, Dict[Tuple[str, ...], int]] = {}
+        # dimensão -> mês -> valor -> quantidade
+        self.marginais: Dict[str, Dict[int, Dict[str, int]]] = {d: {} for d in DIMENSOES}
+        # (filtro, agrupamento) -> mês -> valor do filtro -> valor do agrupamento -> quantidade
+        self.pares: Dict[Tuple[str, str], Dict[int, Dict[str, Dict[str, int]]]] = {p: {} for p in PARES}
+        self.totais: Dict[int, int] = {}
+        self.meses: List[int] = []
+        self.sem_data = 0
+
+        # Carga inicial: agrega por célula antes de alimentar as marginais
+        iniciais: Dict[Tuple[int, Tuple[str, ...]], int] = {}
+        for emp in empresas:
+            mes = self._mes(emp)
+            if mes is None:
+                self.sem_data += 1
+            else:
+                chave = (mes, self._celula(emp))
+                iniciais[chave] = iniciais.get(chave, 0) + 1
+        for (mes, celula), quantidade in iniciais.items():
+            self._aplicar_celula(mes, celula, quantidade)
+
+    # Manutenção
+
+    @staticmethod
+    def _somar(contador: dict, chave, delta: int):
+        valor = contador.get(chave, 0) + delta
+        if valor > 0:
+            contador[chave] = valor
+        else:
+            contador.pop(chave, None)
+
+    @staticmethod
+    def _mes(emp: dict) -> Optional[int]:
+        ordinal = data_ordinal(emp.get("data_abertura"))
+        if ordinal is None:
+            return None
+        return indice_mes(date.fromordinal(ordinal))
+
+    @staticmethod
+    def _celula(emp: dict) -> Tuple[str, ...]:
+        return tuple(emp.get(campo) or padrao for campo, padrao in DIMENSOES.values())
+
+    def _aplicar(self, emp: dict, delta: int):
+        mes = self._mes(emp)
+        if mes is None:
+            self.sem_data += delta
+        else:
+            self._aplicar_celula(mes, self._celula(emp), delta)
+
+    def _aplicar_celula(self, mes: int, celula: Tuple[str, ...], delta: int):
+        self._somar(self.celulas.setdefault(mes, {}), celula, delta)
+        valores = dict(zip(DIMENSOES, celula))
+        for dimensao, valor in valores.items():
+            self._somar(self.marginais[dimensao].setdefault(mes, {}), valor, delta)
+        for filtro, grupo in PARES:
+            por_filtro = self.pares[(filtro, grupo)].setdefault(mes, {})
+            contador = por_filtro.setdefault(valores[filtro], {})
+            self._somar(contador, valores[grupo], delta)
+            if not contador:
+                del por_filtro[valores[filtro]]
+
+        antes = self.totais.get(mes, 0)
+        self._somar(self.totais, mes, delta)
+        if antes == 0 and delta > 0:
+            insort(self.meses, mes)
+        elif antes > 0 and mes not in self.totais:
+            # Mês ficou vazio: sai da lista e dos dicionários
+            del self.meses[bisect_left(self.meses, mes)]
+            self.celulas.pop(mes, None)
+            for marginal in (*self.marginais.values(), *self.pares.values()):
+                marginal.pop(mes, None)
+
+    def adicionar(self, emp: dict):
+        self._aplicar(emp, 1)
+
+    def remover(self, emp: dict):
+        self._aplicar(emp, -1)
+
+    def atualizar(self, antes: dict, depois: dict):
+        self._aplicar(antes, -1)
+        self._aplicar(depois, 1)
+
+    # Consulta
+
+    @staticmethod
+    def _aceita(dimensao: str, valor: str, filtro: str) -> bool:
+        # CNAE filtra por prefixo, como em /empresas; demais por igualdade
+        return valor.startswith(filtro) if dimensao == "cnae" else valor == filtro
+
+    def _contar_um_filtro(
+        self,
+        meses: List[int],
+        agrupar_por: Optional[str],
+        dimensao: str,
+        filtro: str
+    ) -> Dict[int, Dict[str, int]]:
+        """Contagens com um único filtro, pelas marginais (sem ler as células)."""
+        contagens = {}
+        if agrupar_por is None or agrupar_por == dimensao:
+            marginal = self.marginais[dimensao]
+            for mes in meses:
+                por_grupo: Dict[str, int] = {}
+                for valor, quantidade in marginal[mes].items():
+                    if self._aceita(dimensao, valor, filtro):
+                        chave = valor if agrupar_por else "total"
+                        por_grupo[chave] = por_grupo.get(chave, 0) + quantidade
+                contagens[mes] = por_grupo
+            return contagens
+
+        pares = self.pares[(dimensao, agrupar_por)]
+        for mes in meses:
+            por_filtro = pares[mes]
+            if dimensao != "cnae":
+                contagens[mes] = por_filtro.get(filtro, {})
+                continue
+            por_grupo = {}
+            for valor, por_valor in por_filtro.items():
+                if valor.startswith(filtro):
+                    for chave, quantidade in por_valor.items():
+                        por_grupo[chave] = por_grupo.get(chave, 0) + quantidade
+            contagens[mes] = por_grupo
+        return contagens
+
+    def _contar_meses(
+        self,
+        meses: List[int],
+        agrupar_por: Optional[str],
+        filtros: Dict[str, str]
+    ) -> Dict[int, Dict[str, int]]:
+        """Contagens por mês e grupo ("total" sem agrupamento)."""
+        if not filtros:
+            if agrupar_por is None:
+                return {mes: {"total": self.totais[mes]} for mes in meses}
+            marginal = self.marginais[agrupar_por]
+            return {mes: marginal[mes] for mes in meses}
+
+        if len(filtros) == 1:
+            return self._contar_um_filtro(meses, agrupar_por, *next(iter(filtros.items())))
+
+        posicoes = list(DIMENSOES)
+        predicados = [(posicoes.index(dimensao), dimensao, valor) for dimensao, valor in filtros.items()]
+        grupo = posicoes.index(agrupar_por) if agrupar_por else None
+
+        contagens = {}
+        for mes in meses:
+            por_grupo: Dict[str, int] = {}
+            for celula, quantidade in self.celulas[mes].items():
+                if all(self._aceita(dimensao, celula[i], valor) for i, dimensao, valor in predicados):
+                    chave = celula[grupo] if grupo is not None else "total"
+                    por_grupo[chave] = por_grupo.get(chave, 0) + quantidade
+            contagens[mes] = por_grupo
+        return contagens
+
+    def serie(
+        self,
+        inicio: Optional[date] = None,
+        fim: Optional[date] = None,
+        agrupar_por: Optional[str] = None,
+        granularidade: str = "mes",
+        **filtros: Optional[str]
+    ) -> dict:
+        """
+        Série de aberturas no intervalo, com roll-up e fatias opcionais.
+
+        Args:
+            inicio: Data inicial (mês que a contém), limitada à primeira abertura
+            fim: Data final (mês que a contém), limitada à última abertura
+            agrupar_por: Dimensão de DIMENSOES para quebrar a série, ou None
+            granularidade: mes, trimestre ou ano
+            **filtros: Valores fixos de cnae (prefixo), setor, porte ou bairro
+
+        Returns:
+            Dict com periodos (rótulos, sem lacunas), series
+            ([{grupo, valores, total}] por total decrescente), total e
+            sem_data_abertura (empresas fora do cubo)
+
+        Raises:
+            ValueError: dimensão, filtro ou granularidade inválidos
+        """
+        if agrupar_por is not None and agrupar_por not in DIMENSOES:
+            raise ValueError(f"agrupar_por deve ser um de: {', '.join(DIMENSOES)}")
+        if granularidade not in GRANULARIDADES:
+            raise ValueError(f"granularidade deve ser uma de: {', '.join(GRANULARIDADES)}")
+        filtros = {d: v for d, v in filtros.items() if v}
+        invalidos = [d for d in filtros if d not in DIMENSOES]
+        if invalidos:
+            raise ValueError(f"Filtros inválidos: {', '.join(invalidos)}")
+        if inicio and fim and fim < inicio:
+            raise ValueError("data_fim deve ser >= data_inicio")
+
+        vazio = {
+            "granularidade": granularidade, "periodos": [], "series": [],
+            "total": 0, "sem_data_abertura": self.sem_data
+        }
+        if not self.meses:
+            return vazio
+
+        # O intervalo é limitado aos meses com aberturas: datas extremas
+        # (0001-01-01 a 9999-12-31) não geram séries de milhares de zeros
+        primeiro = max(indice_mes(inicio), self.meses[0]) if inicio else self.meses[0]
+        ultimo = min(indice_mes(fim), self.meses[-1]) if fim else self.meses[-1]
+        if ultimo < primeiro:
+            return vazio
+        meses = self.meses[bisect_left(self.meses, primeiro):bisect_right(self.meses, ultimo)]
+        contagens = self._contar_meses(meses, agrupar_por, filtros)
+
+        # Roll-up: períodos alinhados ao calendário (trimestres, anos)
+        passo = GRANULARIDADES[granularidade]
+        base = primeiro - primeiro % passo
+        n_periodos = (ultimo - base) // passo + 1
+
+        series: Dict[str, List[int]] = {}
+        for mes, por_grupo in contagens.items():
+            periodo = (mes - base) // passo
+            for chave, quantidade in por_grupo.items():
+                valores = series.get(chave)
+                if valores is None:
+                    valores = series[chave] = [0] * n_periodos
+                valores[periodo] += quantidade
+
+        resultado = sorted(
+            ({"grupo": chave, "valores": valores, "total": sum(valores)} for chave, valores in series.items()),
+            key=lambda s: (-s["total"], s["grupo"])
+        )
+        return {
+            "granularidade": granularidade,
+            "periodos": [rotulo_periodo(base + i * passo, granularidade) for i in range(n_periodos)],
+            "series": resultado,
+            "total": sum(s["total"] for s in resultado),
+            "sem_data_abertura": self.sem_data
+        }
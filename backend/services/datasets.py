@@ -0,0 +1,86 @@
+"""
+Datasets de referência e suas versões.
+
+Eventos, concorrência, CNAEs e municípios são arquivos JSON pequenos e quase
+estáticos: ficam parseados em memória e só são relidos quando o arquivo
+muda (mtime/tamanho). Cada dataset — incluindo as empresas — tem um
+número de versão que muda a cada alteração, usado para ETags e caches.
+"""
+import json
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from services.empresas_store import empresas_store
+
+DATA_PATH = Path(__file__).parent.parent / "data"
+
+# Identifica o processo: versões em memória recomeçam a cada reinício
+INSTANCIA = uuid.uuid4().hex[:8]
+
+
+class DatasetJSON:
+    """Arquivo JSON mantido em memória, relido só quando muda."""
+
+    def __init__(self, path: Path, padrao: Optional[dict] = None):
+        self.path = path
+        self.padrao = padrao or {}
+        self.versao = 0
+        self._lock = threading.Lock()
+        self._assinatura: Optional[Tuple[int, int]] = None
+        self._dados: dict = {}
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _verificar(self):
+        assinatura = self._stat()
+        if assinatura == self._assinatura and self.versao > 0:
+            return
+        with self._lock:
+            if assinatura == self._assinatura and self.versao > 0:
+                return
+            if assinatura is None:
+                self._dados = dict(self.padrao)
+            else:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._dados = json.load(f)
+            self._assinatura = assinatura
+            self.versao += 1
+
+    def dados(self) -> dict:
+        """Conteúdo atual do arquivo (não deve ser modificado)."""
+        self._verificar()
+        return self._dados
+
+    def versao_atual(self) -> int:
+        self._verificar()
+        return self.versao
+
+
+# Instâncias globais
+eventos_dataset = DatasetJSON(DATA_PATH / "eventos.json", {"eventos": [], "resumo": {}})
+concorrencia_dataset = DatasetJSON(
+    DATA_PATH / "concorrencia.json",
+    {"hoteis": [], "analise_mercado": {}, "hotel_proposto": {}}
+)
+cnaes_dataset = DatasetJSON(DATA_PATH / "cnaes.json", {"cnaes_estrategicos": []})
+municipios_dataset = DatasetJSON(DATA_PATH / "municipios.json", {"municipios": []})
+
+DATASETS = {
+    "empresas": empresas_store,
+    "eventos": eventos_dataset,
+    "concorrencia": concorrencia_dataset,
+    "cnaes": cnaes_dataset,
+    "municipios": municipios_dataset
+}
+
+
+def versoes(nomes: Iterable[str] = DATASETS) -> Dict[str, int]:
+    """Versão atual de cada dataset pedido."""
+    return {nome: DATASETS[nome].versao_atual() for nome in nomes}
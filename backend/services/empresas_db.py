@@ -0,0 +1,297 @@
+"""
+Armazenamento das empresas em SQLite.
+
+Alternativa ao arquivo JSON para bases grandes (importações CNPJá com
+dezenas de milhares de empresas). Cada empresa é uma linha com as colunas
+de filtro indexadas e o registro completo em JSON na coluna `dados`.
+
+Ativado com a variável de ambiente EMPRESAS_STORAGE=sqlite. Na primeira
+abertura, o banco é populado a partir de `empresas_exemplo.json`.
+
+Migração manual:
+    python -m services.empresas_db
+"""
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from services.empresas_indices import canonizar_cnpj
+
+try:
+    import aiosqlite
+    AIOSQLITE_AVAILABLE = True
+except ImportError:
+    AIOSQLITE_AVAILABLE = False
+
+DATA_PATH = Path(__file__).parent.parent / "data"
+DB_PATH = DATA_PATH / "empresas.db"
+JSON_PATH = DATA_PATH / "empresas_exemplo.json"
+
+COLUNAS = (
+    "id, cnpj_canonico, setor_hotel, cnae_principal, porte, "
+    "status_parceria, data_abertura, dados"
+)
+
+UPSERT = f"""
+INSERT INTO empresas ({COLUNAS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    cnpj_canonico = excluded.cnpj_canonico,
+    setor_hotel = excluded.setor_hotel,
+    cnae_principal = excluded.cnae_principal,
+    porte = excluded.porte,
+    status_parceria = excluded.status_parceria,
+    data_abertura = excluded.data_abertura,
+    dados = excluded.dados
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS empresas (
+    id INTEGER PRIMARY KEY,
+    cnpj_canonico TEXT UNIQUE,
+    setor_hotel TEXT,
+    cnae_principal TEXT,
+    porte TEXT,
+    status_parceria TEXT,
+    data_abertura TEXT,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_empresas_setor ON empresas (setor_hotel);
+CREATE INDEX IF NOT EXISTS idx_empresas_cnae ON empresas (cnae_principal);
+CREATE INDEX IF NOT EXISTS idx_empresas_porte ON empresas (porte);
+CREATE INDEX IF NOT EXISTS idx_empresas_status ON empresas (status_parceria);
+CREATE INDEX IF NOT EXISTS idx_empresas_abertura ON empresas (data_abertura);
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+
+def _linha(emp: dict) -> tuple:
+    """Converte uma empresa para a tupla de colunas da tabela."""
+    return (
+        emp.get("id"),
+        canonizar_cnpj(emp.get("cnpj")),
+        emp.get("setor_hotel"),
+        emp.get("cnae_principal"),
+        emp.get("porte"),
+        emp.get("status_parceria"),
+        emp.get("data_abertura") or None,
+        json.dumps(emp, ensure_ascii=False)
+    )
+
+
+def _montar_filtros(
+    setor: Optional[str] = None,
+    cnae: Optional[str] = None,
+    porte: Optional[str] = None,
+    status: Optional[str] = None,
+    data_inicio: Optional[str] = None,
+    data_fim: Optional[str] = None
+) -> Tuple[str, list]:
+    """Monta a cláusula WHERE usando apenas comparações indexáveis."""
+    condicoes = []
+    params = []
+
+    if setor:
+        condicoes.append("setor_hotel = ?")
+        params.append(setor)
+    if cnae:
+        # Prefixo como intervalo para usar o índice (LIKE não usaria)
+        condicoes.append("cnae_principal >= ? AND cnae_principal < ?")
+        params.extend([cnae, cnae + "\uffff"])
+    if porte:
+        condicoes.append("porte = ?")
+        params.append(porte)
+    if status:
+        condicoes.append("status_parceria = ?")
+        params.append(status)
+    if data_inicio:
+        condicoes.append("data_abertura >= ?")
+        params.append(data_inicio)
+    if data_fim:
+        condicoes.append("data_abertura <= ?")
+        params.append(data_fim)
+
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    return where, params
+
+
+class EmpresasDB:
+    """Backend SQLite do repositório de empresas."""
+
+    def __init__(self, path: Path = DB_PATH, json_path: Path = JSON_PATH):
+        self.path = path
+        self.json_path = json_path
+        self._inicializado = False
+        # Conexão de leitura da versão, mantida aberta (assinatura() é
+        # chamada a cada acesso ao repositório)
+        self._conexao_versao: Optional[sqlite3.Connection] = None
+        self._lock_versao = threading.Lock()
+        self._data_version: Optional[int] = None
+        self._assinatura: Optional[tuple] = None
+
+    @contextmanager
+    def _conectar(self):
+        """Abre uma conexão, faz commit ao final e fecha."""
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def inicializar(self):
+        """Cria o schema e migra o JSON na primeira execução."""
+        if self._inicializado:
+            return
+        with self._conectar() as conn:
+            # WAL fica gravado no arquivo do banco: basta ativar uma vez
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            migrado = conn.execute(
+                "SELECT valor FROM meta WHERE chave = 'migrado_de_json'"
+            ).fetchone()
+        if not migrado:
+            self.migrar_json()
+        self._inicializado = True
+
+    def migrar_json(self) -> dict:
+        """
+        Importa as empresas do arquivo JSON (migração única).
+
+        CNPJs repetidos são ignorados e contabilizados no resultado.
+        """
+        empresas = []
+        if self.json_path.exists():
+            with open(self.json_path, "r", encoding="utf-8") as f:
+                empresas = json.load(f).get("empresas", [])
+
+        with self._conectar() as conn:
+            conn.executescript(SCHEMA)
+            antes = conn.execute("SELECT COUNT(*) FROM empresas").fetchone()[0]
+            conn.executemany(
+                f"INSERT OR IGNORE INTO empresas ({COLUNAS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [_linha(e) for e in empresas]
+            )
+            depois = conn.execute("SELECT COUNT(*) FROM empresas").fetchone()[0]
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('migrado_de_json', ?)",
+                (str(self.json_path),)
+            )
+            self._incrementar_versao(conn)
+
+        return {
+            "lidas": len(empresas),
+            "importadas": depois - antes,
+            "ignoradas": len(empresas) - (depois - antes)
+        }
+
+    def _incrementar_versao(self, conn: sqlite3.Connection):
+        conn.execute(
+            "INSERT INTO meta VALUES ('versao', '1') "
+            "ON CONFLICT(chave) DO UPDATE SET valor = CAST(valor AS INTEGER) + 1"
+        )
+
+    def assinatura(self) -> Optional[tuple]:
+        """
+        Versão persistida do banco, incrementada a cada gravação.
+
+        Usa uma conexão persistente e só relê a tabela meta quando o
+        PRAGMA data_version indica um commit de outra conexão.
+        """
+        self.inicializar()
+        with self._lock_versao:
+            if self._conexao_versao is None:
+                self._conexao_versao = sqlite3.connect(self.path, check_same_thread=False)
+            conn = self._conexao_versao
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version or self._assinatura is None:
+                linha = conn.execute(
+                    "SELECT valor FROM meta WHERE chave = 'versao'"
+                ).fetchone()
+                self._assinatura = ("sqlite", int(linha[0]) if linha else 0)
+                self._data_version = data_version
+            return self._assinatura
+
+    def carregar(self, reparar: bool = False) -> dict:
+        """Carrega todas as empresas ordenadas por ID (`reparar` não se aplica ao SQLite)."""
+        self.inicializar()
+        with self._conectar() as conn:
+            linhas = conn.execute("SELECT dados FROM empresas ORDER BY id").fetchall()
+        return {"empresas": [json.loads(l[0]) for l in linhas]}
+
+    def gravar(self, mutacoes: List[tuple]):
+        """
+        Aplica mutações linha a linha numa única transação.
+
+        Um CNPJ já cadastrado em outra empresa levanta sqlite3.IntegrityError.
+
+        Args:
+            mutacoes: Lista de ("insert" | "update", empresa) ou ("delete", id)
+        """
+        self.inicializar()
+        with self._conectar() as conn:
+            for operacao, valor in mutacoes:
+                if operacao == "delete":
+                    conn.execute("DELETE FROM empresas WHERE id = ?", (valor,))
+                else:
+                    conn.execute(UPSERT, _linha(valor))
+            self._incrementar_versao(conn)
+
+    def precisa_compactar(self) -> bool:
+        return False
+
+    def compactar(self, dados: dict):
+        """Nada a fazer: o SQLite já grava linha a linha."""
+
+    async def listar(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        apos_id: Optional[int] = None,
+        **filtros
+    ) -> Tuple[int, List[dict], bool]:
+        """
+        Lista empresas com filtros e paginação em SQL indexado.
+
+        Com `apos_id` a página é buscada por keyset (id > apos_id), com
+        custo proporcional ao tamanho da página. Uma linha a mais é lida
+        para saber se há próxima página.
+
+        Returns:
+            Tupla (total filtrado, empresas da página, se há mais páginas)
+        """
+        if not AIOSQLITE_AVAILABLE:
+            raise ImportError("aiosqlite não está instalado")
+
+        self.inicializar()
+        where, params = _montar_filtros(**filtros)
+
+        if apos_id is not None:
+            pagina_where = f"{where} AND id > ?" if where else "WHERE id > ?"
+            pagina_params = params + [apos_id]
+        else:
+            pagina_where, pagina_params = where, params
+
+        async with aiosqlite.connect(self.path) as conn:
+            async with conn.execute(f"SELECT COUNT(*) FROM empresas {where}", params) as cur:
+                total = (await cur.fetchone())[0]
+            async with conn.execute(
+                f"SELECT dados FROM empresas {pagina_where} ORDER BY id LIMIT ? OFFSET ?",
+                pagina_params + [limit + 1, offset]
+            ) as cur:
+                linhas = await cur.fetchall()
+
+        return total, [json.loads(l[0]) for l in linhas[:limit]], len(linhas) > limit
+
+
+# Instância global
+empresas_db = EmpresasDB()
+
+
+if __name__ == "__main__":
+    print(empresas_db.migrar_json())
@@ -0,0 +1,379 @@
+"""
+Índices secundários em memória para os filtros de /empresas.
+
+- setor_hotel, porte, status_parceria: hash valor -> conjunto de IDs
+- cnae_principal: lista ordenada (cnae, id) consultada por prefixo
+- data_abertura: lista ordenada (ordinal, id) consultada por intervalo
+- cnpj: hash CNPJ canônico (14 dígitos) -> ID, para duplicidade e busca
+  (em bases legadas com CNPJ repetido, o menor ID; os demais donos ficam
+  em cnpj_repetidos e assumem a chave quando ele sai)
+
+Os filtros são combinados partindo do candidato de menor cardinalidade e
+verificando os demais predicados apenas nesses candidatos, de modo que o
+custo acompanha o tamanho do resultado e não o tamanho da base. Páginas
+por cursor (IDs após um dado ID) param ao completar a página.
+"""
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+CAMPOS_HASH = ("setor_hotel", "porte", "status_parceria")
+
+
+def canonizar_cnpj(cnpj) -> Optional[str]:
+    """
+    Chave canônica do CNPJ: 14 dígitos, sem pontuação.
+
+    Zeros à esquerda perdidos (ex.: planilhas) são recompostos.
+    Retorna None se não houver dígitos.
+    """
+    digitos = "".join(filter(str.isdigit, str(cnpj or "")))
+    if not digitos:
+        return None
+    return digitos.zfill(14)
+
+
+def data_ordinal(valor) -> Optional[int]:
+    """Converte data_abertura (YYYY-MM-DD ou DD/MM/YYYY) para ordinal."""
+    if isinstance(valor, date):
+        return valor.toordinal()
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(valor[:10]).toordinal()
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(valor[:10], "%d/%m/%Y").toordinal()
+    except ValueError:
+        return None
+
+
+class IndicesEmpresas:
+    """Índices mantidos incrementalmente a cada alteração do dataset."""
+
+    def __init__(self, empresas: Iterable[dict] = ()):
+        self.hash: Dict[str, Dict[str, Set[int]]] = {c: {} for c in CAMPOS_HASH}
+        self.cnae: List[Tuple[str, int]] = []
+        self.datas: List[Tuple[int, int]] = []
+        self.cnpj: Dict[str, int] = {}
+        self.cnpj_repetidos: Dict[str, Set[int]] = {}
+
+        for emp in empresas:
+            self._adicionar_hash(emp)
+            self.cnae.append((emp.get("cnae_principal") or "", emp.get("id")))
+            ordinal = data_ordinal(emp.get("data_abertura"))
+            if ordinal is not None:
+                self.datas.append((ordinal, emp.get("id")))
+        self.cnae.sort()
+        self.datas.sort()
+
+    # Manutenção
+
+    def _adicionar_hash(self, emp: dict):
+        for campo in CAMPOS_HASH:
+            self.hash[campo].setdefault(emp.get(campo), set()).add(emp.get("id"))
+        chave = canonizar_cnpj(emp.get("cnpj"))
+        if chave:
+            self._adicionar_cnpj(chave, emp.get("id"))
+
+    def _adicionar_cnpj(self, chave: str, empresa_id: int):
+        dono = self.cnpj.setdefault(chave, empresa_id)
+        if dono == empresa_id:
+            return
+        # CNPJ repetido (base legada): a chave fica com o menor ID
+        if empresa_id < dono:
+            self.cnpj[chave], empresa_id = empresa_id, dono
+        self.cnpj_repetidos.setdefault(chave, set()).add(empresa_id)
+
+    def _remover_cnpj(self, chave: str, empresa_id: int):
+        repetidos = self.cnpj_repetidos.get(chave)
+        if self.cnpj.get(chave) == empresa_id:
+            if repetidos:
+                self.cnpj[chave] = min(repetidos)
+                repetidos.discard(self.cnpj[chave])
+            else:
+                del self.cnpj[chave]
+        elif repetidos:
+            repetidos.discard(empresa_id)
+        if repetidos is not None and not repetidos:
+            del self.cnpj_repetidos[chave]
+
+    def adicionar(self, emp: dict):
+        """Indexa uma nova empresa."""
+        self._adicionar_hash(emp)
+        insort(self.cnae, (emp.get("cnae_principal") or "", emp.get("id")))
+        ordinal = data_ordinal(emp.get("data_abertura"))
+        if ordinal is not None:
+            insort(self.datas, (ordinal, emp.get("id")))
+
+    def remover(self, emp: dict):
+        """Remove uma empresa (com os valores que estavam indexados)."""
+        empresa_id = emp.get("id")
+        for campo in CAMPOS_HASH:
+            ids = self.hash[campo].get(emp.get(campo))
+            if ids is not None:
+                ids.discard(empresa_id)
+                if not ids:
+                    del self.hash[campo][emp.get(campo)]
+        chave = canonizar_cnpj(emp.get("cnpj"))
+        if chave:
+            self._remover_cnpj(chave, empresa_id)
+        self._remover_ordenado(self.cnae, (emp.get("cnae_principal") or "", empresa_id))
+        ordinal = data_ordinal(emp.get("data_abertura"))
+        if ordinal is not None:
+            self._remover_ordenado(self.datas, (ordinal, empresa_id))
+
+    def atualizar(self, antes: dict, depois: dict):
+        """Reindexa uma empresa cujos campos mudaram."""
+        self.remover(antes)
+        self.adicionar(depois)
+
+    @staticmethod
+    def _remover_ordenado(lista: list, chave: tuple):
+        i = bisect_left(lista, chave)
+        if i < len(lista) and lista[i] == chave:
+            del lista[i]
+
+    # Consulta
+
+    def _intervalo_cnae(self, prefixo: str) -> Tuple[int, int]:
+        return (
+            bisect_left(self.cnae, (prefixo,)),
+            bisect_left(self.cnae, (prefixo + "\uffff",))
+        )
+
+    def _intervalo_datas(self, inicio: Optional[int], fim: Optional[int]) -> Tuple[int, int]:
+        i = bisect_left(self.datas, (inicio,)) if inicio is not None else 0
+        j = bisect_right(self.datas, (fim, float("inf"))) if fim is not None else len(self.datas)
+        return i, j
+
+    def _candidatos(
+        self,
+        setor: Optional[str] = None,
+        cnae: Optional[str] = None,
+        porte: Optional[str] = None,
+        status: Optional[str] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ) -> List[tuple]:
+        """(tamanho, gerador de IDs, predicado por empresa) de cada filtro, do menor ao maior."""
+        candidatos = []
+
+        for campo, valor in (("setor_hotel", setor), ("porte", porte), ("status_parceria", status)):
+            if valor:
+                ids = self.hash[campo].get(valor, set())
+                candidatos.append((
+                    len(ids),
+                    lambda ids=ids: iter(ids),
+                    lambda e, ids=ids: e.get("id") in ids
+                ))
+
+        if cnae:
+            i, j = self._intervalo_cnae(cnae)
+            candidatos.append((
+                j - i,
+                lambda i=i, j=j: (self.cnae[k][1] for k in range(i, j)),
+                lambda e: (e.get("cnae_principal") or "").startswith(cnae)
+            ))
+
+        if data_inicio or data_fim:
+            inicio = data_inicio.toordinal() if data_inicio else None
+            fim = data_fim.toordinal() if data_fim else None
+            i, j = self._intervalo_datas(inicio, fim)
+
+            def na_faixa(e, inicio=inicio, fim=fim):
+                ordinal = data_ordinal(e.get("data_abertura"))
+                return (
+                    ordinal is not None
+                    and (inicio is None or ordinal >= inicio)
+                    and (fim is None or ordinal <= fim)
+                )
+
+            candidatos.append((
+                j - i,
+                lambda i=i, j=j: (self.datas[k][1] for k in range(i, j)),
+                na_faixa
+            ))
+
+        candidatos.sort(key=lambda c: c[0])
+        return candidatos
+
+    def filtrar(self, por_id: Dict[int, dict], **filtros) -> Optional[List[int]]:
+        """
+        Retorna os IDs (ordenados) que satisfazem todos os filtros.
+
+        Args:
+            **filtros: setor, cnae (prefixo), porte, status, data_inicio, data_fim
+
+        Returns:
+            Lista de IDs, ou None se nenhum filtro foi informado
+        """
+        candidatos = self._candidatos(**filtros)
+        if not candidatos:
+            return None
+
+        _, gerar, _ = candidatos[0]
+        predicados = [c[2] for c in candidatos[1:]]
+        resultado = [
+            empresa_id for empresa_id in gerar()
+            if all(p(por_id[empresa_id]) for p in predicados)
+        ]
+        resultado.sort()
+        return resultado
+
+    def contar(self, por_id: Dict[int, dict], **filtros) -> int:
+        """Quantidade de empresas que satisfazem os filtros (sem montar a lista)."""
+        candidatos = self._candidatos(**filtros)
+        if not candidatos:
+            return len(por_id)
+        tamanho, gerar, _ = candidatos[0]
+        if len(candidatos) == 1:
+            return tamanho
+        predicados = [c[2] for c in candidatos[1:]]
+        return sum(1 for empresa_id in gerar() if all(p(por_id[empresa_id]) for p in predicados))
+
+    def pagina(
+        self,
+        ordenados: List[dict],
+        por_id: Dict[int, dict],
+        apos_id: int,
+        limite: int,
+        **filtros
+    ) -> List[dict]:
+        """
+        Até `limite` empresas filtradas com ID maior que `apos_id`, por ID.
+
+        Parte do cursor e para ao completar a página. Se o menor candidato
+        é pequeno (tamanho² <= limite x base), ordena os seus IDs e começa
+        no cursor por bisseção; senão percorre `ordenados` (a base por ID)
+        a partir do cursor testando todos os filtros, o que lê em média
+        limite x base / tamanho empresas. Nos dois casos o custo é no
+        máximo da ordem de sqrt(limite x base), sem depender da posição do
+        cursor nem do tamanho do resultado.
+
+        Args:
+            ordenados: Todas as empresas, ordenadas por ID
+            por_id: Empresas por ID
+            apos_id: Cursor (último ID da página anterior)
+            limite: Tamanho da página
+            **filtros: setor, cnae (prefixo), porte, status, data_inicio, data_fim
+        """
+        candidatos = self._candidatos(**filtros)
+        if candidatos and candidatos[0][0] ** 2 <= limite * len(ordenados):
+            _, gerar, _ = candidatos[0]
+            ids = sorted(gerar())
+            fonte = (por_id[ids[k]] for k in range(bisect_right(ids, apos_id), len(ids)))
+            predicados = [c[2] for c in candidatos[1:]]
+        else:
+            inicio = bisect_right(ordenados, apos_id, key=lambda e: e.get("id") or 0)
+            fonte = (ordenados[k] for k in range(inicio, len(ordenados)))
+            predicados = [c[2] for c in candidatos]
+        return list(islice((e for e in fonte if all(p(e) for p in predicados)), limite))
+
+
+def contar_facetas(empresas: Iterable[dict]) -> dict:
+    """Conta setor, porte, status, CNAE e bairro numa única passada."""
+    setor: Dict[str, int] = {}
+    porte: Dict[str, int] = {}
+    status: Dict[str, int] = {}
+    cnae: Dict[str, int] = {}
+    bairro: Dict[str, int] = {}
+
+    for emp in empresas:
+        chave = emp.get("setor_hotel", "Outros")
+        setor[chave] = setor.get(chave, 0) + 1
+        chave = emp.get("porte", "OUTROS")
+        porte[chave] = porte.get(chave, 0) + 1
+        chave = emp.get("status_parceria", "nao_contatado")
+        status[chave] = status.get(chave, 0) + 1
+        chave = emp.get("cnae_principal") or ""
+        cnae[chave] = cnae.get(chave, 0) + 1
+        chave = emp.get("bairro") or ""
+        bairro[chave] = bairro.get(chave, 0) + 1
+
+    return {"setor": setor, "porte": porte, "status": status, "cnae": cnae, "bairro": bairro}
+
+
+class ContadoresEmpresas:
+    """
+    Contadores por setor, porte, status, CNAE e bairro mantidos por deltas.
+
+    Alimentam /empresas/estatisticas, /empresas/por-setor/resumo e o bloco
+    `estatisticas` do snapshot sem recontar a base.
+    """
+
+    def __init__(self, empresas: Iterable[dict] = ()):
+        self.total = 0
+        self.por_setor: Dict[str, int] = {}
+        self.por_porte: Dict[str, int] = {}
+        self.por_status: Dict[str, int] = {}
+        self.por_cnae: Dict[str, int] = {}
+        self.por_bairro: Dict[str, int] = {}
+        self.setor_status: Dict[Tuple[str, str], int] = {}
+
+        for emp in empresas:
+            self._aplicar(emp, 1)
+
+    @staticmethod
+    def _somar(contador: dict, chave, delta: int):
+        valor = contador.get(chave, 0) + delta
+        if valor > 0:
+            contador[chave] = valor
+        else:
+            contador.pop(chave, None)
+
+    def _aplicar(self, emp: dict, delta: int):
+        setor = emp.get("setor_hotel", "Outros")
+        porte = emp.get("porte", "OUTROS")
+        status = emp.get("status_parceria", "nao_contatado")
+
+        self.total += delta
+        self._somar(self.por_setor, setor, delta)
+        self._somar(self.por_porte, porte, delta)
+        self._somar(self.por_status, status, delta)
+        self._somar(self.por_cnae, emp.get("cnae_principal") or "", delta)
+        self._somar(self.por_bairro, emp.get("bairro") or "", delta)
+        self._somar(self.setor_status, (setor, status), delta)
+
+    def adicionar(self, emp: dict):
+        self._aplicar(emp, 1)
+
+    def remover(self, emp: dict):
+        self._aplicar(emp, -1)
+
+    def atualizar(self, antes: dict, depois: dict):
+        self._aplicar(antes, -1)
+        self._aplicar(depois, 1)
+
+    def estatisticas(self) -> dict:
+        """Estatísticas no formato de /empresas/estatisticas."""
+        return {
+            "total_empresas": self.total,
+            "por_setor": dict(self.por_setor),
+            "por_porte": dict(self.por_porte),
+            "por_status": dict(self.por_status)
+        }
+
+    def facetas(self) -> dict:
+        """Contagens de todas as dimensões de filtro para a base inteira."""
+        return {
+            "setor": dict(self.por_setor),
+            "porte": dict(self.por_porte),
+            "status": dict(self.por_status),
+            "cnae": dict(self.por_cnae),
+            "bairro": dict(self.por_bairro)
+        }
+
+    def resumo_por_setor(self) -> dict:
+        """Totais e funil de parceria por setor."""
+        resumo = {
+            setor: {"total": total, "parceiros": 0, "prospectados": 0, "contatados": 0}
+            for setor, total in self.por_setor.items()
+        }
+        campos = {"parceiro": "parceiros", "prospectado": "prospectados", "contatado": "contatados"}
+        for (setor, status), quantidade in self.setor_status.items():
+            if status in campos:
+                resumo[setor][campos[status]] = quantidade
+        return resumo
@@ -0,0 +1,681 @@
+"""
+Repositório em memória das empresas estratégicas.
+
+Mantém o dataset já parseado e só o relê quando a assinatura do backend
+muda (mtime/tamanho do JSON ou versão gravada no SQLite). Todos os
+routers e serviços devem acessar as empresas por aqui em vez de ler o
+arquivo diretamente.
+
+O backend é escolhido pela variável de ambiente EMPRESAS_STORAGE
+("json", padrão, ou "sqlite").
+"""
+import asyncio
+import json
+from bisect import bisect_left
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.empresas_db import EmpresasDB, empresas_db
+from services.busca import IndiceBusca
+from services.cache import CacheVersionado
+from services.colunar import SnapshotColunar
+from services.cubo_aberturas import CuboAberturas
+from services.empresas_indices import (
+    ContadoresEmpresas, IndicesEmpresas, canonizar_cnpj, contar_facetas
+)
+
+DATA_PATH = Path(__file__).parent.parent / "data" / "empresas_exemplo.json"
+
+# Município das empresas do dataset (padrão quando a origem não informa)
+MUNICIPIO = "Ribeirão Pires"
+
+# Número de mutações no journal que dispara a compactação do snapshot
+COMPACTAR_APOS = 500
+
+# Num recarregamento, até esta fração da base alterada os índices recebem
+# só a diferença; acima dela são reconstruídos
+FRACAO_DIFERENCA_RECARGA = 0.1
+
+# Janela (segundos) e tamanho máximo do lote de escrita (group commit)
+JANELA_COMMIT = 0.005
+LOTE_MAXIMO = 1000
+
+
+class CNPJDuplicadoError(ValueError):
+    """CNPJ (na forma canônica) já pertence a outra empresa."""
+
+    def __init__(self, cnpj: str, empresa_id: Optional[int]):
+        super().__init__(f"CNPJ {cnpj} já cadastrado")
+        self.cnpj = cnpj
+        self.empresa_id = empresa_id
+
+
+class JSONBackend:
+    """
+    Persistência em snapshot JSON + journal de mutações.
+
+    Cada gravação apenas acrescenta uma linha JSON por mutação ao journal
+    (`empresas_exemplo.journal.jsonl`). Quando o journal cresce além do
+    limite, o snapshot é regravado (compactação) e o journal é zerado.
+    Na leitura, o journal é reaplicado sobre o último snapshot.
+    """
+
+    def __init__(self, path: Path = DATA_PATH, compactar_apos: int = COMPACTAR_APOS):
+        self.path = path
+        self.journal_path = path.with_suffix(".journal.jsonl")
+        self.compactar_apos = compactar_apos
+        self._entradas_journal = 0
+
+    def _stat(self, path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def assinatura(self) -> Optional[tuple]:
+        """Retorna (mtime, tamanho) do snapshot e do journal."""
+        return (self._stat(self.path), self._stat(self.journal_path))
+
+    def carregar(self, reparar: bool = False) -> dict:
+        """
+        Lê o snapshot e reaplica o journal sobre ele.
+
+        O replay para na primeira linha incompleta ou inválida. Só com
+        `reparar` (carga inicial, sem escritor ativo) o journal é truncado
+        ali: numa releitura a linha pode ser uma gravação em andamento de
+        outro processo, e truncá-la apagaria registros válidos.
+        """
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        else:
+            dados = {"empresas": []}
+
+        por_id = {e.get("id"): e for e in dados.get("empresas", [])}
+        self._entradas_journal = 0
+
+        if self.journal_path.exists():
+            with open(self.journal_path, "rb+" if reparar else "rb") as f:
+                posicao = 0
+                for linha in f:
+                    try:
+                        if not linha.endswith(b"\n"):
+                            raise ValueError("linha sem terminador")
+                        entrada = json.loads(linha)
+                        if entrada["op"] == "delete":
+                            por_id.pop(entrada["id"], None)
+                        else:
+                            por_id[entrada["empresa"]["id"]] = entrada["empresa"]
+                    except (ValueError, KeyError, TypeError):
+                        # Linha incompleta (queda ou gravação em andamento) ou corrompida
+                        if reparar:
+                            f.truncate(posicao)
+                        break
+                    posicao += len(linha)
+                    self._entradas_journal += 1
+
+        dados["empresas"] = list(por_id.values())
+        return dados
+
+    def gravar(self, mutacoes: List[tuple]):
+        """Acrescenta as mutações ao journal com um único fsync."""
+        linhas = []
+        for operacao, valor in mutacoes:
+            if operacao == "delete":
+                entrada = {"op": "delete", "id": valor}
+            else:
+                entrada = {"op": operacao, "empresa": valor}
+            linhas.append(json.dumps(entrada, ensure_ascii=False, separators=(",", ":")))
+
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(linhas) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._entradas_journal += len(linhas)
+
+    def precisa_compactar(self) -> bool:
+        return self._entradas_journal >= self.compactar_apos
+
+    def compactar(self, dados: dict):
+        """Regrava o snapshot de forma atômica e zera o journal."""
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+        # Se cair entre o replace e o truncate, reaplicar o journal é idempotente
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+        self._entradas_journal = 0
+
+
+def _criar_backend():
+    if os.environ.get("EMPRESAS_STORAGE", "json").lower() == "sqlite":
+        return empresas_db
+    return JSONBackend()
+
+
+class EmpresasStore:
+    """Mantém o dataset de empresas em memória com detecção de alterações."""
+
+    def __init__(self, backend=None):
+        self.backend = backend or _criar_backend()
+        self.versao = 0
+        self._lock = threading.RLock()
+        self._assinatura = None
+        self._dados: dict = {}
+        self._empresas: List[dict] = []
+        self._por_id: Dict[int, dict] = {}
+        self.indices = IndicesEmpresas()
+        self.contadores = ContadoresEmpresas()
+        self.busca = IndiceBusca()
+        self.cubo = CuboAberturas()
+        self.colunar = SnapshotColunar()
+        # Totais filtrados das páginas por cursor, válidos na mesma versão
+        self._totais = CacheVersionado(max_entradas=64)
+        self._fila: Optional[asyncio.Queue] = None
+        self._escritor: Optional[asyncio.Task] = None
+        self._nao_gravadas = 0
+        # Um lote falhou: a memória tem mutações que não chegaram ao backend.
+        # Só um recarregamento completo limpa a marca.
+        self._sujo = False
+        self._compactando = False
+        # Chamados após cada commit com as mutações gravadas, ou com None
+        # quando o dataset é recarregado inteiro do backend
+        self.ouvintes: List[Callable[[Optional[List[tuple]]], None]] = []
+
+    def _notificar(self, mutacoes: Optional[List[tuple]]):
+        for ouvinte in self.ouvintes:
+            try:
+                ouvinte(mutacoes)
+            except Exception:
+                # Um ouvinte com erro não pode afetar o commit
+                pass
+
+    def versao_atual(self) -> int:
+        """Versão do dataset, após verificar alterações externas no backend."""
+        self._verificar()
+        return self.versao
+
+    @property
+    def usa_sqlite(self) -> bool:
+        """Indica se o backend atual é o SQLite (consultas indexadas em SQL)."""
+        return isinstance(self.backend, EmpresasDB)
+
+    def _verificar(self):
+        """Recarrega o dataset se o backend mudou desde a última leitura."""
+        if self._nao_gravadas or self._compactando:
+            # Há mutações em memória ainda não gravadas (o backend está
+            # atrás) ou o snapshot está sendo regravado por nós mesmos
+            return
+        assinatura = self.backend.assinatura()
+        if assinatura == self._assinatura and self.versao > 0 and not self._sujo:
+            return
+        with self._lock:
+            assinatura = self.backend.assinatura()
+            if assinatura == self._assinatura and self.versao > 0 and not self._sujo:
+                return
+            self._recarregar(assinatura)
+
+    def _recarregar(self, assinatura):
+        """
+        Lê o backend e atualiza as estruturas em memória.
+
+        Na primeira carga (ou com mudança grande) os índices são
+        construídos do zero; nas demais recebem só as empresas que mudaram.
+        """
+        # Só a carga inicial repara o journal: ainda não há escritor neste
+        # processo, e releituras podem ver gravações em andamento
+        dados = self.backend.carregar(reparar=self.versao == 0)
+        anteriores = self._por_id if self.versao > 0 else None
+
+        self._dados = dados
+        self._empresas = dados.get("empresas", [])
+        self._empresas.sort(key=lambda e: e.get("id") or 0)
+        self._por_id = {e.get("id"): e for e in self._empresas}
+        for emp in self._empresas:
+            self._internar(emp)
+        if anteriores is None or not self._aplicar_diferenca(anteriores):
+            self.indices = IndicesEmpresas(self._empresas)
+            self.contadores = ContadoresEmpresas(self._empresas)
+            self.busca = IndiceBusca(self._empresas)
+            self.cubo = CuboAberturas(self._empresas)
+            self.colunar = SnapshotColunar(self._empresas)
+        self._assinatura = assinatura
+        self._sujo = False
+        self.versao += 1
+        if self.versao > 1:
+            self._notificar(None)
+
+    def _aplicar_diferenca(self, anteriores: Dict[int, dict]) -> bool:
+        """
+        Aplica aos índices só as empresas incluídas, alteradas ou removidas
+        em relação às que estavam indexadas.
+
+        Returns:
+            False (sem alterar nada) se a diferença passa de
+            FRACAO_DIFERENCA_RECARGA da base
+        """
+        alteradas = [
+            (anteriores.get(empresa_id), emp)
+            for empresa_id, emp in self._por_id.items()
+            if anteriores.get(empresa_id) != emp
+        ]
+        removidas = [emp for empresa_id, emp in anteriores.items() if empresa_id not in self._por_id]
+        if len(alteradas) + len(removidas) > FRACAO_DIFERENCA_RECARGA * max(len(self._por_id), 1):
+            return False
+
+        for emp in removidas:
+            self._desindexar(emp)
+        for antes, depois in alteradas:
+            if antes is None:
+                self._indexar(depois)
+            else:
+                self._reindexar(antes, depois)
+        return True
+
+    async def _salvar(self, mutacoes: List[tuple]):
+        """
+        Enfileira mutações já aplicadas em memória e aguarda o commit.
+
+        Args:
+            mutacoes: Lista de ("insert" | "update", empresa) ou ("delete", id)
+        """
+        # Cópias rasas: o escritor serializa em outra thread
+        mutacoes = [
+            (op, dict(valor) if op != "delete" else valor)
+            for op, valor in mutacoes
+        ]
+        self.versao += 1
+
+        if self._escritor is None or self._escritor.done():
+            self._fila = asyncio.Queue()
+            self._escritor = asyncio.get_running_loop().create_task(self._escrever())
+
+        concluido = asyncio.get_running_loop().create_future()
+        self._nao_gravadas += 1
+        self._fila.put_nowait((mutacoes, concluido))
+        await concluido
+
+    async def _escrever(self):
+        """
+        Tarefa única de escrita (group commit).
+
+        Junta as mutações que chegam dentro de JANELA_COMMIT segundos (até
+        LOTE_MAXIMO) e as grava com uma única chamada ao backend.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self._fila.get()]
+            total = len(lote[0][0])
+            prazo = loop.time() + JANELA_COMMIT
+            while total < LOTE_MAXIMO:
+                restante = prazo - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._fila.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+                lote.append(item)
+                total += len(item[0])
+
+            erro = None
+            try:
+                mutacoes = [m for item, _ in lote for m in item]
+                await asyncio.to_thread(self.backend.gravar, mutacoes)
+            except Exception as e:
+                erro = e
+
+            self._nao_gravadas -= len(lote)
+            if erro is not None:
+                # Descarta o estado em memória; a próxima leitura (sem
+                # gravações pendentes) recarrega do backend
+                self._sujo = True
+            elif self._nao_gravadas == 0 and not self._sujo:
+                self._assinatura = self.backend.assinatura()
+
+            if erro is None:
+                self._notificar(mutacoes)
+
+            for _, concluido in lote:
+                if not concluido.done():
+                    if erro is not None:
+                        concluido.set_exception(erro)
+                    else:
+                        concluido.set_result(None)
+
+            # Só compacta com a memória igual ao que já está gravado. Os
+            # lotes só são dados como concluídos depois, para que fechar()
+            # espere a compactação em andamento.
+            if (
+                erro is None and self._nao_gravadas == 0 and not self._sujo
+                and self.backend.precisa_compactar()
+            ):
+                await self._compactar_em_thread()
+            for _ in lote:
+                self._fila.task_done()
+
+    async def fechar(self):
+        """Aguarda a gravação de todas as mutações pendentes (shutdown)."""
+        if self._escritor is not None and not self._escritor.done():
+            await self._fila.join()
+            self._escritor.cancel()
+        self._escritor = None
+
+    def _copia_para_compactar(self) -> dict:
+        """Cópia do documento para gravar o snapshot fora do event loop."""
+        with self._lock:
+            self._dados["empresas"] = self._empresas
+            self._dados["estatisticas"] = self.contadores.estatisticas()
+            return {**self._dados, "empresas": [dict(e) for e in self._empresas]}
+
+    async def _compactar_em_thread(self):
+        """
+        Regrava o snapshot numa thread, sem bloquear o event loop.
+
+        Uma falha aqui não afeta os commits (o journal continua válido);
+        a compactação é tentada de novo após o próximo lote.
+        """
+        dados = self._copia_para_compactar()
+        self._compactando = True
+        try:
+            await asyncio.to_thread(self.backend.compactar, dados)
+        except Exception:
+            return
+        finally:
+            self._compactando = False
+        if self._nao_gravadas == 0 and not self._sujo:
+            self._assinatura = self.backend.assinatura()
+
+    def compactar(self):
+        """Força a compactação do journal no snapshot."""
+        with self._lock:
+            self._verificar()
+            self.backend.compactar(self._copia_para_compactar())
+            self._assinatura = self.backend.assinatura()
+
+    # Leitura
+
+    def listar(self) -> List[dict]:
+        """
+        Retorna a lista de empresas em memória, ordenada por ID.
+
+        A lista é compartilhada: quem chama não deve alterá-la.
+        """
+        self._verificar()
+        return self._empresas
+
+    def obter(self, empresa_id: int) -> Optional[dict]:
+        """Retorna uma empresa pelo ID ou None."""
+        self._verificar()
+        return self._por_id.get(empresa_id)
+
+    def obter_por_cnpj(self, cnpj: str) -> Optional[dict]:
+        """Retorna a empresa pelo CNPJ, com ou sem formatação."""
+        self._verificar()
+        empresa_id = self.indices.cnpj.get(canonizar_cnpj(cnpj))
+        return self._por_id.get(empresa_id) if empresa_id is not None else None
+
+    def buscar(self, consulta: str, limite: int = 20) -> List[Tuple[dict, float]]:
+        """Busca textual/aproximada. Retorna pares (empresa, score) ordenados."""
+        self._verificar()
+        return [
+            (self._por_id[empresa_id], score)
+            for empresa_id, score in self.busca.buscar(consulta, limite)
+        ]
+
+    def filtrar(self, **filtros) -> List[dict]:
+        """
+        Filtra empresas usando os índices secundários (resultado ordenado por ID).
+
+        Args:
+            **filtros: setor, cnae (prefixo), porte, status, data_inicio, data_fim
+        """
+        self._verificar()
+        ids = self.indices.filtrar(self._por_id, **filtros)
+        if ids is None:
+            return self._empresas
+        return [self._por_id[i] for i in ids]
+
+    def pagina_filtrada(self, apos_id: int, limite: int, **filtros) -> Tuple[int, List[dict], bool]:
+        """
+        Página por cursor (IDs após `apos_id`) do conjunto filtrado.
+
+        A página é lida a partir do cursor e para em limite + 1 empresas;
+        o total filtrado fica em cache até a próxima alteração do dataset.
+
+        Returns:
+            Tupla (total filtrado, empresas da página, se há mais páginas)
+        """
+        self._verificar()
+        pagina = self.indices.pagina(self._empresas, self._por_id, apos_id, limite + 1, **filtros)
+        chave = tuple(sorted((nome, valor) for nome, valor in filtros.items() if valor))
+        total = self._totais.obter(
+            chave, self.versao, lambda: self.indices.contar(self._por_id, **filtros)
+        )
+        return total, pagina[:limite], len(pagina) > limite
+
+    def get_dados(self) -> dict:
+        """Retorna o documento completo (empresas, estatísticas, notas)."""
+        self._verificar()
+        return self._dados
+
+    def estatisticas(self) -> dict:
+        """Estatísticas por setor, porte e status (contadores incrementais)."""
+        self._verificar()
+        return self.contadores.estatisticas()
+
+    def facetas(self, empresas: Optional[List[dict]] = None) -> dict:
+        """
+        Contagens por setor, porte, status, CNAE e bairro.
+
+        Args:
+            empresas: Conjunto já filtrado (uma passada); None = base inteira,
+                servida pelos contadores incrementais
+        """
+        if empresas is None:
+            self._verificar()
+            return self.contadores.facetas()
+        return contar_facetas(empresas)
+
+    def resumo_por_setor(self) -> dict:
+        """Total, parceiros, prospectados e contatados por setor."""
+        self._verificar()
+        return self.contadores.resumo_por_setor()
+
+    def serie_aberturas(self, **parametros) -> dict:
+        """
+        Série temporal de aberturas pelo cubo incremental (ver CuboAberturas.serie).
+
+        O custo acompanha o número de meses (e de células, com filtros) do
+        intervalo, não o tamanho da base.
+        """
+        with self._lock:
+            self._verificar()
+            return self.cubo.serie(**parametros)
+
+    def snapshot_colunar(self) -> SnapshotColunar:
+        """Colunas NumPy atualizadas das empresas."""
+        self._verificar()
+        return self.colunar
+
+    # Escrita
+
+    @staticmethod
+    def _internar(emp: dict):
+        """Compartilha as strings de CNAE e setor, que se repetem em toda a base."""
+        for campo in ("cnae_principal", "setor_hotel"):
+            if isinstance(emp.get(campo), str):
+                emp[campo] = sys.intern(emp[campo])
+
+    def _indexar(self, emp: dict):
+        self._internar(emp)
+        self.indices.adicionar(emp)
+        self.contadores.adicionar(emp)
+        self.busca.adicionar(emp)
+        self.cubo.adicionar(emp)
+        self.colunar.adicionar(emp)
+
+    def _desindexar(self, emp: dict):
+        self.indices.remover(emp)
+        self.contadores.remover(emp)
+        self.busca.remover(emp)
+        self.cubo.remover(emp)
+        self.colunar.remover(emp)
+
+    def _reindexar(self, antes: dict, depois: dict):
+        self._internar(depois)
+        self.indices.atualizar(antes, depois)
+        self.contadores.atualizar(antes, depois)
+        self.busca.atualizar(antes, depois)
+        self.cubo.atualizar(antes, depois)
+        self.colunar.atualizar(antes, depois)
+
+    def _proximo_id(self) -> int:
+        return max(self._por_id.keys(), default=0) + 1
+
+    async def adicionar(self, empresa: dict) -> dict:
+        """Adiciona uma empresa, gerando o ID, e persiste."""
+        return (await self.adicionar_varias([empresa]))[0]
+
+    async def adicionar_varias(self, empresas: Iterable[dict]) -> List[dict]:
+        """
+        Adiciona várias empresas de uma vez com uma única gravação.
+
+        Raises:
+            CNPJDuplicadoError: se algum CNPJ já existir (nada é gravado)
+        """
+        empresas = list(empresas)
+        with self._lock:
+            self._verificar()
+            vistos = set()
+            for emp in empresas:
+                chave = canonizar_cnpj(emp.get("cnpj"))
+                if chave and (chave in self.indices.cnpj or chave in vistos):
+                    raise CNPJDuplicadoError(chave, self.indices.cnpj.get(chave))
+                vistos.add(chave)
+
+            novas = []
+            proximo_id = self._proximo_id()
+            for emp in empresas:
+                emp = {**emp, "id": proximo_id}
+                proximo_id += 1
+                self._empresas.append(emp)
+                self._por_id[emp["id"]] = emp
+                self._indexar(emp)
+                novas.append(emp)
+        if novas:
+            await self._salvar([("insert", e) for e in novas])
+        return novas
+
+    async def upsert_varias(
+        self,
+        empresas: Iterable[dict],
+        padroes: Optional[dict] = None
+    ) -> Tuple[List[dict], List[dict]]:
+        """
+        Insere ou atualiza empresas pelo CNPJ canônico, com uma única gravação.
+
+        Empresas já cadastradas têm os campos recebidos sobrescritos (ID,
+        status e notas são preservados se não vierem nos dados). CNPJs
+        repetidos dentro do lote são aplicados em sequência.
+
+        Args:
+            empresas: Dados das empresas
+            padroes: Campos aplicados apenas às empresas novas
+
+        Returns:
+            Tupla (inseridas, atualizadas)
+        """
+        with self._lock:
+            self._verificar()
+            inseridas: Dict[int, dict] = {}
+            atualizadas: Dict[int, dict] = {}
+            mutacoes = []
+            proximo_id = self._proximo_id()
+
+            for dados in empresas:
+                chave = canonizar_cnpj(dados.get("cnpj"))
+                existente_id = self.indices.cnpj.get(chave) if chave else None
+
+                if existente_id is None:
+                    emp = {**(padroes or {}), **dados, "id": proximo_id}
+                    proximo_id += 1
+                    self._empresas.append(emp)
+                    self._por_id[emp["id"]] = emp
+                    self._indexar(emp)
+                    inseridas[emp["id"]] = emp
+                    mutacoes.append(("insert", emp))
+                else:
+                    emp = self._por_id[existente_id]
+                    antes = dict(emp)
+                    emp.update({k: v for k, v in dados.items() if k != "id"})
+                    self._reindexar(antes, emp)
+                    if existente_id not in inseridas:
+                        atualizadas[existente_id] = emp
+                    mutacoes.append(("update", emp))
+
+        if mutacoes:
+            await self._salvar(mutacoes)
+        return list(inseridas.values()), list(atualizadas.values())
+
+    async def atualizar(self, empresa_id: int, campos: dict) -> Optional[dict]:
+        """
+        Atualiza campos de uma empresa. Retorna None se não existir.
+
+        Raises:
+            CNPJDuplicadoError: se o novo CNPJ pertencer a outra empresa
+        """
+        with self._lock:
+            self._verificar()
+            emp = self._por_id.get(empresa_id)
+            if emp is None:
+                return None
+            chave = canonizar_cnpj(campos.get("cnpj"))
+            if chave and chave != canonizar_cnpj(emp.get("cnpj")):
+                dono = self.indices.cnpj.get(chave)
+                if dono is not None:
+                    raise CNPJDuplicadoError(chave, dono)
+            antes = dict(emp)
+            emp.update(campos)
+            self._reindexar(antes, emp)
+        await self._salvar([("update", emp)])
+        return emp
+
+    async def remover(self, empresa_id: int) -> bool:
+        """Remove uma empresa pelo ID."""
+        with self._lock:
+            self._verificar()
+            emp = self._por_id.pop(empresa_id, None)
+            if emp is None:
+                return False
+            del self._empresas[bisect_left(self._empresas, empresa_id, key=lambda e: e.get("id") or 0)]
+            self._desindexar(emp)
+        await self._salvar([("delete", empresa_id)])
+        return True
+
+    async def remover_onde(self, condicao: Callable[[dict], bool]) -> int:
+        """Remove as empresas que satisfazem a condição. Retorna quantas."""
+        with self._lock:
+            self._verificar()
+            manter = []
+            removidas = []
+            for emp in self._empresas:
+                (removidas if condicao(emp) else manter).append(emp)
+            if removidas:
+                self._empresas = manter
+                for emp in removidas:
+                    del self._por_id[emp.get("id")]
+                    self._desindexar(emp)
+        if removidas:
+            await self._salvar([("delete", e.get("id")) for e in removidas])
+        return len(removidas)
+
+
+# Instância global
+empresas_store = EmpresasStore()
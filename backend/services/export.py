@@ -1,8 +1,6 @@
 """
 Serviço de exportação de dados para Excel e PDF.
 """
-import json
-from pathlib import Path
 from typing import List, Dict
 from datetime import datetime
 import io
@@ -21,25 +19,22 @@ try:
 except ImportError:
     OPENPYXL_AVAILABLE = False
 
-
-DATA_PATH = Path(__file__).parent.parent / "data"
+from services.datasets import concorrencia_dataset, eventos_dataset
+from services.empresas_store import empresas_store
 
 
 class ExportService:
     """Serviço para exportação de dados em diferentes formatos."""
 
-    def __init__(self):
-        self.empresas = self._load_json("empresas_exemplo.json")
-        self.eventos = self._load_json("eventos.json")
-        self.concorrencia = self._load_json("concorrencia.json")
+    @property
+    def eventos(self) -> dict:
+        """Dados de eventos (relidos se o arquivo mudar)."""
+        return eventos_dataset.dados()
 
-    def _load_json(self, filename: str) -> dict:
-        """Carrega arquivo JSON."""
-        filepath = DATA_PATH / filename
-        if filepath.exists():
-            with open(filepath, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return {}
+    @property
+    def concorrencia(self) -> dict:
+        """Dados de concorrência (relidos se o arquivo mudar)."""
+        return concorrencia_dataset.dados()
 
     def exportar_empresas_excel(self, empresas: List[dict] = None) -> bytes:
         """
@@ -52,7 +47,7 @@ class ExportService:
             raise ImportError("openpyxl não está instalado")
 
         if empresas is None:
-            empresas = self.empresas.get("empresas", [])
+            empresas = empresas_store.listar()
 
         wb = Workbook()
         ws = wb.active
@@ -176,7 +171,7 @@ class ExportService:
 
         # Aba 4: Empresas
         ws4 = wb.create_sheet("Empresas")
-        empresas = self.empresas.get("empresas", [])
+        empresas = empresas_store.listar()
 
         headers = ["Nome", "Setor", "CNAE", "Status"]
         for col, header in enumerate(headers, 1):
@@ -202,7 +197,7 @@ class ExportService:
             String CSV
         """
         if empresas is None:
-            empresas = self.empresas.get("empresas", [])
+            empresas = empresas_store.listar()
 
         headers = ["Nome", "CNPJ", "Setor", "CNAE", "Telefone", "Email", "Status"]
         lines = [";".join(headers)]
@@ -0,0 +1,158 @@
+"""
+Feed de alterações das empresas e KPIs para Server-Sent Events.
+
+A cada commit do EmpresasStore é publicado um evento `empresas` com os
+deltas gravados (insert/update/delete) e, logo depois, um evento `kpis`
+com os KPIs recalculados (no máximo um a cada INTERVALO_KPIS segundos,
+mesmo com vários commits seguidos).
+
+Os eventos recebem IDs sequenciais (prefixados pela instância do processo)
+e os últimos HISTORICO ficam guardados: um cliente que reconecta com
+Last-Event-ID recebe o que perdeu. Se o histórico não cobre o pedido, ou
+se o cliente ficou para trás, recebe um evento `reset` e deve recarregar
+os dados completos.
+"""
+import asyncio
+import json
+from collections import deque
+from typing import List, Optional, Set
+
+from services.analytics import analytics_service
+from services.datasets import INSTANCIA
+from services.empresas_store import empresas_store
+
+HISTORICO = 1000
+FILA_MAXIMA = 500
+INTERVALO_KPIS = 1.0
+
+
+def formatar_sse(sequencia: Optional[int], tipo: str, dados: dict) -> str:
+    """Serializa um evento no formato text/event-stream."""
+    linhas = []
+    if sequencia is not None:
+        linhas.append(f"id: {INSTANCIA}-{sequencia}")
+    linhas.append(f"event: {tipo}")
+    linhas.append(f"data: {json.dumps(dados, ensure_ascii=False, default=str)}")
+    return "\n".join(linhas) + "\n\n"
+
+
+class FeedAlteracoes:
+    """Distribui os eventos de alteração para os clientes conectados."""
+
+    def __init__(self):
+        self._sequencia = 0
+        self._historico: deque = deque(maxlen=HISTORICO)
+        self._assinantes: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._kpis_pendentes: Optional[asyncio.TimerHandle] = None
+
+    # Assinaturas
+
+    def _sequencia_do_id(self, ultimo_id: Optional[str]) -> Optional[int]:
+        """Sequência de um Last-Event-ID desta instância (-1 se de outra)."""
+        if not ultimo_id:
+            return None
+        instancia, _, sequencia = ultimo_id.partition("-")
+        if instancia != INSTANCIA or not sequencia.isdigit():
+            return -1
+        return int(sequencia)
+
+    def assinar(self, ultimo_id: Optional[str] = None) -> asyncio.Queue:
+        """
+        Registra um cliente e retorna sua fila de eventos SSE já formatados.
+
+        Args:
+            ultimo_id: Last-Event-ID do cliente que reconecta
+        """
+        self._loop = asyncio.get_running_loop()
+        fila: asyncio.Queue = asyncio.Queue(maxsize=FILA_MAXIMA)
+
+        ultimo_id = self._sequencia_do_id(ultimo_id)
+        if ultimo_id == -1:
+            fila.put_nowait(formatar_sse(self._sequencia, "reset", {"motivo": "reinicio"}))
+        elif ultimo_id is not None and ultimo_id < self._sequencia:
+            perdidos = [(i, texto) for i, texto in self._historico if i > ultimo_id]
+            if perdidos and perdidos[0][0] == ultimo_id + 1 and len(perdidos) < FILA_MAXIMA:
+                for _, texto in perdidos:
+                    fila.put_nowait(texto)
+            else:
+                fila.put_nowait(formatar_sse(self._sequencia, "reset", {"motivo": "historico"}))
+
+        self._assinantes.add(fila)
+        return fila
+
+    def cancelar(self, fila: asyncio.Queue):
+        self._assinantes.discard(fila)
+
+    @property
+    def total_assinantes(self) -> int:
+        return len(self._assinantes)
+
+    # Publicação
+
+    def _publicar(self, tipo: str, dados: dict):
+        self._sequencia += 1
+        texto = formatar_sse(self._sequencia, tipo, dados)
+        self._historico.append((self._sequencia, texto))
+
+        for fila in list(self._assinantes):
+            try:
+                fila.put_nowait(texto)
+            except asyncio.QueueFull:
+                # Cliente lento: descarta a fila e pede recarga completa
+                while not fila.empty():
+                    fila.get_nowait()
+                fila.put_nowait(formatar_sse(self._sequencia, "reset", {"motivo": "atraso"}))
+
+    def _no_loop(self, funcao, *args):
+        """Executa no event loop dos assinantes (o store pode notificar de outra thread)."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        try:
+            rodando = asyncio.get_running_loop()
+        except RuntimeError:
+            rodando = None
+        if rodando is self._loop:
+            funcao(*args)
+        else:
+            self._loop.call_soon_threadsafe(funcao, *args)
+
+    def ao_gravar(self, mutacoes: Optional[List[tuple]]):
+        """Ouvinte do EmpresasStore: publica os deltas do commit."""
+        if self._loop is None:
+            # Nenhum cliente conectou ainda: nada a publicar
+            return
+        self._no_loop(self._publicar_commit, mutacoes, empresas_store.versao)
+
+    def _publicar_commit(self, mutacoes: Optional[List[tuple]], versao: int):
+        if mutacoes is None:
+            self._publicar("reset", {"motivo": "recarga", "versao": versao})
+        else:
+            self._publicar("empresas", {
+                "versao": versao,
+                "alteracoes": [
+                    {"op": op, "id": valor}
+                    if op == "delete" else
+                    {"op": op, "id": valor.get("id"), "empresa": valor}
+                    for op, valor in mutacoes
+                ]
+            })
+        self._agendar_kpis()
+
+    def _agendar_kpis(self):
+        if self._kpis_pendentes is None and self._assinantes:
+            self._kpis_pendentes = self._loop.call_later(INTERVALO_KPIS, self._publicar_kpis)
+
+    def _publicar_kpis(self):
+        self._kpis_pendentes = None
+        if not self._assinantes:
+            return
+        self._publicar("kpis", {
+            "versao": empresas_store.versao,
+            "kpis": analytics_service.calcular_kpis()
+        })
+
+
+# Instância global, registrada como ouvinte do store
+feed_alteracoes = FeedAlteracoes()
+empresas_store.ouvintes.append(feed_alteracoes.ao_gravar)
@@ -0,0 +1,168 @@
+"""
+Fluxo de caixa do investidor: VPL, TIR e payback em lote.
+
+Cada linha é um cenário (ou uma simulação de Monte Carlo) com a sua
+receita anual estabilizada de quartos e de A&B; as colunas são os anos
+(0 = investimento). O financiamento é SAC com carência de juros e os
+impostos sobre o lucro não compensam prejuízos de anos anteriores.
+
+Tudo é calculado com broadcasting sobre a matriz linhas x anos; a TIR
+é encontrada por bisseção feita em todas as linhas ao mesmo tempo.
+"""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+ITERACOES_TIR = 50
+TIR_MINIMA = -0.99
+TIR_MAXIMA = 10.0
+
+
+def parametros_padrao(parametros: dict, quartos: int) -> dict:
+    """Completa o CAPEX (quartos x capex_por_quarto) quando não informado."""
+    parametros = dict(parametros)
+    if parametros.get("capex") is None:
+        parametros["capex"] = quartos * parametros["capex_por_quarto"]
+    return parametros
+
+
+def cronograma_financiamento(parametros: dict) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Juros e amortização por ano (1..horizonte) de um financiamento SAC.
+
+    Returns:
+        (juros, amortizacao), arrays com um valor por ano
+    """
+    horizonte = parametros["horizonte_anos"]
+    valor = parametros["capex"] * parametros["percentual_financiado"]
+    prazo, carencia = parametros["prazo_anos"], parametros["carencia_anos"]
+
+    anos = np.arange(1, horizonte + 1)
+    parcela = valor / prazo
+    # Parcelas de amortização pagas antes do início de cada ano
+    pagas = np.clip(anos - 1 - carencia, 0, prazo)
+    saldo_inicial = valor - parcela * pagas
+    amortizacao = np.where((anos > carencia) & (anos <= carencia + prazo), parcela, 0.0)
+    return saldo_inicial * parametros["taxa_juros"], amortizacao
+
+
+def fluxos_caixa(receita_quartos: np.ndarray, receita_fb: np.ndarray, parametros: dict) -> np.ndarray:
+    """
+    Fluxo de caixa do acionista (linhas x anos 0..horizonte), sem valor residual.
+
+    Args:
+        receita_quartos: Receita anual estabilizada de quartos por linha
+        receita_fb: Receita anual estabilizada de A&B por linha
+        parametros: Dict no formato de ParametrosFinanceiros, com capex
+    """
+    horizonte = parametros["horizonte_anos"]
+    rampa = np.ones(horizonte)
+    inicio_rampa = np.asarray(parametros["rampa"][:horizonte], dtype=np.float64)
+    rampa[:len(inicio_rampa)] = inicio_rampa
+
+    quartos = np.asarray(receita_quartos, dtype=np.float64)[:, None] * rampa
+    fb = np.asarray(receita_fb, dtype=np.float64)[:, None] * rampa
+    receita = quartos + fb
+
+    custos = (
+        quartos * parametros["custo_quartos"]
+        + fb * parametros["custo_fb"]
+        + receita * parametros["despesas_gerais"]
+        + parametros["custo_fixo_anual"]
+    )
+    ebitda = receita * (1 - parametros["impostos_receita"]) - custos
+
+    capex = parametros["capex"]
+    anos = np.arange(1, horizonte + 1)
+    depreciacao = np.where(anos <= parametros["vida_util_anos"], capex / parametros["vida_util_anos"], 0.0)
+    juros, amortizacao = cronograma_financiamento(parametros)
+
+    imposto = np.maximum(ebitda - depreciacao - juros, 0) * parametros["aliquota_ir"]
+
+    fluxos = np.empty((len(receita), horizonte + 1))
+    fluxos[:, 0] = -capex * (1 - parametros["percentual_financiado"])
+    fluxos[:, 1:] = ebitda - imposto - juros - amortizacao
+    return fluxos
+
+
+def vpl(fluxos: np.ndarray, taxa) -> np.ndarray:
+    """
+    Valor presente líquido de cada linha (taxa escalar ou uma por linha).
+
+    É o polinômio dos fluxos em 1 / (1 + taxa), avaliado por Horner.
+    """
+    desconto = 1 / (1 + np.asarray(taxa, dtype=np.float64))
+    return np.polynomial.polynomial.polyval(desconto, fluxos.T, tensor=False)
+
+
+def tir(fluxos: np.ndarray) -> np.ndarray:
+    """
+    Taxa interna de retorno de cada linha, por bisseção simultânea.
+
+    NaN quando o VPL não muda de sinal entre TIR_MINIMA e TIR_MAXIMA
+    (ex.: o fluxo nunca se paga).
+    """
+    n = fluxos.shape[0]
+    baixo = np.full(n, TIR_MINIMA)
+    alto = np.full(n, TIR_MAXIMA)
+    vpl_baixo = vpl(fluxos, baixo)
+    definida = np.sign(vpl_baixo) != np.sign(vpl(fluxos, alto))
+
+    for _ in range(ITERACOES_TIR):
+        meio = (baixo + alto) / 2
+        vpl_meio = vpl(fluxos, meio)
+        mesmo_sinal = np.sign(vpl_meio) == np.sign(vpl_baixo)
+        baixo = np.where(mesmo_sinal, meio, baixo)
+        vpl_baixo = np.where(mesmo_sinal, vpl_meio, vpl_baixo)
+        alto = np.where(mesmo_sinal, alto, meio)
+
+    return np.where(definida, (baixo + alto) / 2, np.nan)
+
+
+def payback(fluxos: np.ndarray, taxa: Optional[float] = None) -> np.ndarray:
+    """
+    Anos até o fluxo acumulado ficar positivo (interpolado dentro do ano).
+
+    Com `taxa`, payback descontado. NaN se não se paga no horizonte; 0 se
+    não há desembolso do acionista no ano 0.
+    """
+    if taxa is not None:
+        fluxos = fluxos / (1 + taxa) ** np.arange(fluxos.shape[1])
+    acumulado = fluxos.cumsum(axis=1)
+    positivo = acumulado >= 0
+    ano = positivo.argmax(axis=1)
+    pago = positivo.any(axis=1)
+
+    linhas = np.arange(len(fluxos))
+    anterior = acumulado[linhas, np.maximum(ano - 1, 0)]
+    fluxo_ano = fluxos[linhas, ano]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fracao = -anterior / fluxo_ano
+    return np.where(pago, np.where(ano == 0, 0.0, ano - 1 + fracao), np.nan)
+
+
+def avaliar(receita_quartos: np.ndarray, receita_fb: np.ndarray, parametros: dict) -> Dict[str, np.ndarray]:
+    """
+    VPL, TIR e paybacks de cada linha de receitas.
+
+    O valor residual (fração do CAPEX) entra no último ano para VPL e TIR,
+    mas não no payback.
+
+    Returns:
+        Dict com arrays vpl, tir, payback e payback_descontado (NaN = não se aplica)
+    """
+    fluxos = fluxos_caixa(receita_quartos, receita_fb, parametros)
+    com_residual = fluxos.copy()
+    com_residual[:, -1] += parametros["capex"] * parametros["valor_residual"]
+
+    return {
+        "vpl": vpl(com_residual, parametros["taxa_desconto"]),
+        "tir": tir(com_residual),
+        "payback": payback(fluxos),
+        "payback_descontado": payback(fluxos, parametros["taxa_desconto"])
+    }
+
+
+def arredondar(valor: float, casas: int = 2) -> Optional[float]:
+    """Arredonda para a resposta JSON (NaN vira None)."""
+    return None if np.isnan(valor) else round(float(valor), casas)
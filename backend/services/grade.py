@@ -0,0 +1,147 @@
+"""
+Grade de cenários: receita para todas as combinações de quartos, diária,
+ocupação e participação de A&B.
+
+As fórmulas são as de AnalyticsService.calcular_projecoes, calculadas por
+broadcasting sobre os quatro eixos de uma vez. Cada métrica é devolvida
+só com os eixos de que depende (o RevPAR não depende de quartos nem de
+A&B), como um array plano em ordem C; receitas em reais inteiros e RevPAR
+com centavos. Formatar números é a parte cara, então o cache (pelo hash
+dos parâmetros) guarda a grade já serializada.
+"""
+import json
+from typing import Dict, Iterator
+
+import numpy as np
+
+from services.cache import CacheVersionado
+from services.monte_carlo import hash_parametros
+
+EIXOS = ("quartos", "diaria", "ocupacao", "participacao_fb")
+MAX_VALORES_EIXO = 1000
+MAX_CELULAS_GRADE = 2_000_000
+BLOCO_SERIALIZACAO = 50_000
+
+# Métrica -> eixos de que depende
+METRICAS = {
+    "revpar": ("diaria", "ocupacao"),
+    "receita_quartos": ("quartos", "diaria", "ocupacao"),
+    "receita_fb": EIXOS,
+    "receita_total": EIXOS,
+}
+
+
+def valores_eixo(eixo: dict, nome: str = "") -> np.ndarray:
+    """
+    Valores de um eixo (lista explícita ou inicio..fim com passo).
+
+    Raises:
+        ValueError: eixo vazio, incompleto ou com valores demais
+    """
+    if eixo.get("valores"):
+        valores = np.asarray(eixo["valores"], dtype=np.float64)
+    else:
+        inicio, fim, passo = eixo.get("inicio"), eixo.get("fim"), eixo.get("passo")
+        if inicio is None:
+            raise ValueError(f"{nome}: informe 'valores' ou 'inicio'")
+        if fim is None:
+            fim = inicio
+        if fim < inicio:
+            raise ValueError(f"{nome}: 'fim' deve ser >= 'inicio'")
+        if fim > inicio and not passo:
+            raise ValueError(f"{nome}: faixa requer 'passo'")
+        if fim > inicio and (fim - inicio) / passo >= MAX_VALORES_EIXO:
+            raise ValueError(f"{nome}: máximo de {MAX_VALORES_EIXO} valores por eixo")
+        # Meio passo de folga para incluir o fim apesar do arredondamento
+        valores = np.arange(inicio, fim + (passo or 1) / 2, passo or 1)
+        valores = np.round(valores, 6)
+
+    if len(valores) > MAX_VALORES_EIXO:
+        raise ValueError(f"{nome}: máximo de {MAX_VALORES_EIXO} valores por eixo")
+    return valores
+
+
+class GradeCenarios:
+    """Varredura vetorizada de cenários de receita."""
+
+    def __init__(self):
+        self._cache = CacheVersionado(max_entradas=8)
+
+    def calcular(self, parametros: dict) -> Dict[str, object]:
+        """
+        Calcula (ou serve do cache) a grade completa.
+
+        Returns:
+            Dict com eixos (arrays por eixo), celulas, parametros_hash,
+            metricas ({nome: array plano na ordem dos eixos de METRICAS})
+            e json (partes já serializadas, ver serializar_grade)
+        """
+        eixos = {nome: valores_eixo(parametros[nome], nome) for nome in EIXOS}
+        celulas = int(np.prod([len(v) for v in eixos.values()]))
+        if celulas > MAX_CELULAS_GRADE:
+            raise ValueError(f"Grade com {celulas} combinações; máximo {MAX_CELULAS_GRADE}")
+
+        chave = hash_parametros(parametros)
+        return self._cache.obter(chave, None, lambda: self._calcular(eixos, celulas, chave))
+
+    def _calcular(self, eixos: Dict[str, np.ndarray], celulas: int, chave: str) -> dict:
+        # Um eixo por dimensão: (quartos, diaria, ocupacao, participacao_fb)
+        quartos, diaria, ocupacao, fb = np.ix_(*(eixos[nome] for nome in EIXOS))
+
+        revpar = diaria * ocupacao
+        receita_quartos = quartos * 365 * revpar
+        receita_fb = receita_quartos * fb
+        receita_total = receita_quartos + receita_fb
+
+        metricas = {
+            "revpar": revpar[0, :, :, 0],
+            "receita_quartos": receita_quartos[..., 0],
+            "receita_fb": receita_fb,
+            "receita_total": receita_total,
+        }
+        grade = {
+            "eixos": eixos,
+            "celulas": celulas,
+            "parametros_hash": chave,
+            "metricas": {
+                nome: (np.round(valores, 2) if nome == "revpar" else np.rint(valores).astype(np.int64)).ravel()
+                for nome, valores in metricas.items()
+            },
+        }
+        grade["json"] = [parte.encode() for parte in serializar_grade(grade)]
+        return grade
+
+
+def _numeros(valores: np.ndarray) -> Iterator[str]:
+    """Array como lista JSON, em blocos (evita montar um texto gigante)."""
+    yield "["
+    for inicio in range(0, len(valores), BLOCO_SERIALIZACAO):
+        bloco = valores[inicio:inicio + BLOCO_SERIALIZACAO].tolist()
+        yield ("," if inicio else "") + ",".join(map(str, bloco))
+    yield "]"
+
+
+def serializar_grade(grade: dict) -> Iterator[str]:
+    """
+    Serializa a grade como JSON em partes, para StreamingResponse.
+
+    Formato: {"celulas", "parametros_hash", "eixos": {nome: [...]},
+    "metricas": {nome: {"eixos": [...], "forma": [...], "valores": [...]}}}
+    """
+    eixos = grade["eixos"]
+    yield f'{{"celulas":{grade["celulas"]},"parametros_hash":"{grade["parametros_hash"]}","eixos":{{'
+    for i, nome in enumerate(EIXOS):
+        yield ("," if i else "") + f'"{nome}":'
+        yield from _numeros(eixos[nome])
+    yield '},"metricas":{'
+    for i, (nome, valores) in enumerate(grade["metricas"].items()):
+        forma = [len(eixos[e]) for e in METRICAS[nome]]
+        cabecalho = json.dumps({"eixos": list(METRICAS[nome]), "forma": forma})[:-1]
+        yield ("," if i else "") + f'"{nome}":{cabecalho},"valores":'
+        yield from _numeros(valores)
+        yield "}"
+    yield "}}"
+
+
+# Instância global
+grade_cenarios = GradeCenarios()
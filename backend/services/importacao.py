@@ -0,0 +1,451 @@
+"""
+Importação de empresas em lote (JSON, NDJSON, CSV e XLSX).
+
+- Validação de um lote inteiro com um único TypeAdapter, com erros por linha
+- Classificação de cada CNAE distinto uma única vez por lote
+- Upsert pelo CNPJ canônico com uma única gravação por lote; empresas já
+  cadastradas só têm atualizados os campos presentes no registro
+
+Planilhas são lidas linha a linha (csv / openpyxl em modo read_only)
+direto do arquivo temporário do upload e gravadas em lotes de LOTE_IMPORTACAO linhas, de modo que o consumo de
+memória não depende do tamanho do arquivo. O andamento fica disponível
+pelo ID do job em `importacoes`.
+"""
+import asyncio
+import csv
+import io
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+try:
+    from openpyxl import load_workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+from models.schemas import EmpresaCreate
+from services.busca import normalizar
+from services.cnae_classifier import classificar_empresas
+from services.empresas_indices import canonizar_cnpj
+from services.empresas_store import MUNICIPIO, empresas_store
+
+# Linhas por lote de gravação nas importações de planilha
+LOTE_IMPORTACAO = 2000
+
+# Erros guardados por job (os demais são só contados)
+MAX_ERROS_JOB = 1000
+
+# Jobs concluídos mantidos para consulta
+MAX_JOBS = 50
+
+_ADAPTER = TypeAdapter(List[EmpresaCreate])
+
+# Valores dos campos ausentes no registro; só valem para empresas novas
+PADROES_IMPORTACAO = {"porte": "OUTROS", "municipio": MUNICIPIO}
+
+# Campos iniciais de uma empresa nova (os opcionais ausentes ficam None)
+PADROES_INSERCAO = {
+    **{campo: None for campo in EmpresaCreate.model_fields},
+    **PADROES_IMPORTACAO,
+    "status_parceria": "nao_contatado",
+    "notas": None
+}
+
+# Cabeçalho normalizado (sem acentos, minúsculo) -> campo de EmpresaBase
+MAPA_COLUNAS = {
+    "cnpj": "cnpj",
+    "razao social": "razao_social",
+    "razao_social": "razao_social",
+    "nome empresarial": "razao_social",
+    "nome fantasia": "nome_fantasia",
+    "nome_fantasia": "nome_fantasia",
+    "cnae": "cnae_principal",
+    "cnae principal": "cnae_principal",
+    "cnae_principal": "cnae_principal",
+    "atividade principal": "cnae_principal",
+    "descricao cnae": "cnae_descricao",
+    "cnae descricao": "cnae_descricao",
+    "cnae_descricao": "cnae_descricao",
+    "descricao da atividade": "cnae_descricao",
+    "data abertura": "data_abertura",
+    "data de abertura": "data_abertura",
+    "data_abertura": "data_abertura",
+    "abertura": "data_abertura",
+    "municipio": "municipio",
+    "cidade": "municipio",
+    "bairro": "bairro",
+    "endereco": "endereco",
+    "logradouro": "endereco",
+    "telefone": "telefone",
+    "fone": "telefone",
+    "email": "email",
+    "e-mail": "email",
+    "porte": "porte",
+    "capital social": "capital_social",
+    "capital_social": "capital_social",
+    "setor": "setor_hotel",
+    "setor_hotel": "setor_hotel",
+}
+
+# Descrições de porte usadas pela Receita -> PorteEmpresa
+MAPA_PORTE = {
+    "mei": "MEI",
+    "me": "ME",
+    "micro empresa": "ME",
+    "microempresa": "ME",
+    "epp": "EPP",
+    "empresa de pequeno porte": "EPP",
+    "demais": "OUTROS",
+}
+
+
+# Validação e gravação de lotes
+
+def validar_lote(registros: list, erros: Optional[dict] = None) -> Tuple[list, dict]:
+    """
+    Valida todos os registros com um único TypeAdapter.
+
+    Registros inválidos são separados com seus erros; os demais são
+    revalidados juntos, sem abortar o lote.
+
+    Args:
+        registros: Dicts de empresa (posições já em `erros` são ignoradas)
+        erros: Erros prévios por índice (ex.: linha NDJSON malformada)
+
+    Returns:
+        Tupla (lista de (índice, EmpresaCreate), erros por índice)
+    """
+    erros = erros if erros is not None else {}
+    indices = [i for i in range(len(registros)) if i not in erros]
+    try:
+        validos = _ADAPTER.validate_python([registros[i] for i in indices])
+        return list(zip(indices, validos)), erros
+    except ValidationError as e:
+        for erro in e.errors(include_url=False):
+            indice = indices[erro["loc"][0]]
+            erros.setdefault(indice, []).append({
+                "campo": ".".join(str(p) for p in erro["loc"][1:]) or None,
+                "mensagem": erro["msg"]
+            })
+
+    indices = [i for i in indices if i not in erros]
+    validos = _ADAPTER.validate_python([registros[i] for i in indices])
+    return list(zip(indices, validos)), erros
+
+
+def completar_lote(registros: list) -> list:
+    """
+    Completa os registros para a validação: setor e descrição do CNAE pela
+    classificação (cada CNAE distinto uma única vez) e PADROES_IMPORTACAO
+    nos campos ausentes.
+    """
+    classificacoes = classificar_empresas([
+        r["cnae_principal"] for r in registros
+        if isinstance(r, dict) and isinstance(r.get("cnae_principal"), str)
+    ])
+    completos = []
+    for registro in registros:
+        if not isinstance(registro, dict):
+            completos.append(registro)
+            continue
+        completo = {**PADROES_IMPORTACAO, **registro}
+        info = classificacoes.get(registro.get("cnae_principal"))
+        if info:
+            completo.setdefault("cnae_descricao", info["descricao"])
+            completo["setor_hotel"] = info.get("setor_hotel", "Outros")
+        completos.append(completo)
+    return completos
+
+
+def _campos_recebidos(registro: dict, empresa: EmpresaCreate) -> dict:
+    """Campos validados que estavam presentes no registro (e os derivados do CNAE)."""
+    presentes = set(registro)
+    if "cnae_principal" in presentes:
+        presentes |= {"cnae_descricao", "setor_hotel"}
+    dados = {**empresa.model_dump(), "data_abertura": str(empresa.data_abertura)}
+    return {campo: valor for campo, valor in dados.items() if campo in presentes}
+
+
+async def gravar_lote(registros: list, erros: Optional[dict] = None) -> dict:
+    """
+    Valida, classifica e grava (upsert por CNPJ) um lote de empresas.
+
+    Empresas novas recebem os padrões nos campos ausentes; nas já
+    cadastradas, campos que o registro não traz são preservados.
+
+    Returns:
+        Dict com contagens e erros por índice do lote
+    """
+    validos, erros = validar_lote(completar_lote(registros), erros)
+
+    inseridas, atualizadas = await empresas_store.upsert_varias(
+        (_campos_recebidos(registros[indice], empresa) for indice, empresa in validos),
+        padroes=PADROES_INSERCAO
+    )
+
+    return {
+        "inseridas": len(inseridas),
+        "atualizadas": len(atualizadas),
+        "rejeitadas": len(erros),
+        "erros": erros
+    }
+
+
+# Mapeamento de linhas de planilha
+
+def formatar_cnae(valor) -> str:
+    """Converte um CNAE de planilha (ex.: 5620102 ou 5620-1/02) para XXXX-X/XX."""
+    if isinstance(valor, float):
+        valor = int(valor)
+    digitos = "".join(filter(str.isdigit, str(valor or "")))
+    if len(digitos) == 7:
+        return f"{digitos[:4]}-{digitos[4]}/{digitos[5:]}"
+    return str(valor or "").strip()
+
+
+def _converter_data(valor):
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date) or not valor:
+        return valor
+    texto = str(valor).strip()[:10]
+    for formato in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    return texto
+
+
+def mapear_colunas(cabecalho: List) -> Dict[int, str]:
+    """Posição da coluna -> campo de EmpresaBase, para as colunas reconhecidas."""
+    mapa = {}
+    for posicao, nome in enumerate(cabecalho):
+        campo = MAPA_COLUNAS.get(normalizar(str(nome or "")).strip())
+        if campo and campo not in mapa.values():
+            mapa[posicao] = campo
+    return mapa
+
+
+def mapear_linha(valores: tuple, colunas: Dict[int, str]) -> dict:
+    """
+    Monta o dict de EmpresaBase a partir de uma linha da planilha.
+
+    Normaliza CNPJ, CNAE, data (ISO ou DD/MM/AAAA) e porte; células
+    vazias são omitidas.
+    """
+    dados = {}
+    for posicao, campo in colunas.items():
+        if posicao >= len(valores):
+            continue
+        valor = valores[posicao]
+        if isinstance(valor, str):
+            valor = valor.strip()
+        if valor is None or valor == "":
+            continue
+        dados[campo] = valor
+
+    if "cnpj" in dados:
+        cnpj = dados["cnpj"]
+        dados["cnpj"] = canonizar_cnpj(int(cnpj) if isinstance(cnpj, float) else cnpj) or ""
+    if "cnae_principal" in dados:
+        dados["cnae_principal"] = formatar_cnae(dados["cnae_principal"])
+    if "data_abertura" in dados:
+        dados["data_abertura"] = _converter_data(dados["data_abertura"])
+    if isinstance(dados.get("capital_social"), str) and "," in dados["capital_social"]:
+        # Formato brasileiro: 10.000,50
+        dados["capital_social"] = dados["capital_social"].replace(".", "").replace(",", ".")
+    if "porte" in dados:
+        porte = str(dados["porte"])
+        dados["porte"] = MAPA_PORTE.get(normalizar(porte).strip(), porte.upper())
+    for campo in ("telefone", "razao_social", "nome_fantasia", "municipio", "bairro", "endereco"):
+        if campo in dados and not isinstance(dados[campo], str):
+            valor = dados[campo]
+            dados[campo] = str(int(valor) if isinstance(valor, float) and valor.is_integer() else valor)
+
+    return dados
+
+
+# Leitura das planilhas
+
+def ler_csv(bruto: BinaryIO) -> Iterator[Tuple[int, tuple, float]]:
+    """
+    Lê um CSV linha a linha (separador , ou ; detectado).
+
+    Yields:
+        (número da linha, valores, fração do arquivo já lida); a primeira
+        é o cabeçalho
+    """
+    tamanho = bruto.seek(0, io.SEEK_END) or 1
+    bruto.seek(0)
+    amostra = bruto.read(64 * 1024)
+    bruto.seek(0)
+    try:
+        texto = amostra.decode("utf-8")
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError:
+        texto = amostra.decode("latin-1")
+        encoding = "latin-1"
+    try:
+        dialeto = csv.Sniffer().sniff(texto.split("\n", 1)[0], delimiters=",;\t|")
+    except csv.Error:
+        dialeto = csv.excel
+
+    arquivo = io.TextIOWrapper(bruto, encoding=encoding, newline="")
+    try:
+        leitor = csv.reader(arquivo, dialeto)
+        for linha in leitor:
+            yield leitor.line_num, tuple(linha), bruto.tell() / tamanho
+    finally:
+        # O arquivo continua sendo do job, que o fecha ao final
+        arquivo.detach()
+
+
+def ler_xlsx(bruto: BinaryIO) -> Iterator[Tuple[int, tuple, float]]:
+    """
+    Lê a primeira aba de um XLSX linha a linha (openpyxl read_only).
+
+    Yields:
+        (número da linha, valores, fração das linhas já lida); a primeira
+        é o cabeçalho
+    """
+    if not OPENPYXL_AVAILABLE:
+        raise ImportError("openpyxl não está instalado")
+
+    wb = load_workbook(bruto, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        total = ws.max_row or 0
+        for numero, linha in enumerate(ws.iter_rows(values_only=True), 1):
+            yield numero, linha, (numero / total if total else 0.0)
+    finally:
+        wb.close()
+
+
+def ler_planilha(arquivo: BinaryIO, formato: str) -> Iterator[Tuple[int, tuple, float]]:
+    return ler_xlsx(arquivo) if formato == "xlsx" else ler_csv(arquivo)
+
+
+def _proximo_lote(linhas: Iterator, colunas: Dict[int, str]) -> Tuple[List[dict], List[int], float]:
+    """
+    Lê e mapeia as próximas LOTE_IMPORTACAO linhas (executado numa thread).
+
+    Returns:
+        Tupla (registros, número da linha de cada registro, progresso);
+        a classificação e os padrões ficam para gravar_lote
+    """
+    registros, numeros, progresso = [], [], 0.0
+    for numero, valores, progresso in linhas:
+        if not any(v not in (None, "") for v in valores):
+            continue
+        registros.append(mapear_linha(valores, colunas))
+        numeros.append(numero)
+        if len(registros) >= LOTE_IMPORTACAO:
+            break
+    return registros, numeros, progresso
+
+
+# Jobs
+
+class GerenciadorImportacoes:
+    """Registro dos jobs de importação de planilhas e seu andamento."""
+
+    def __init__(self, max_jobs: int = MAX_JOBS):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._tarefas: Dict[str, asyncio.Task] = {}
+
+    def obter(self, job_id: str) -> Optional[dict]:
+        return self._jobs.get(job_id)
+
+    def listar(self) -> List[dict]:
+        return list(reversed(self._jobs.values()))
+
+    def iniciar(self, arquivo: BinaryIO, formato: str, nome_arquivo: str) -> dict:
+        """
+        Agenda a importação de uma planilha recebida no upload.
+
+        Args:
+            arquivo: Arquivo binário posicionável (o temporário do upload);
+                o job passa a ser seu dono e o fecha ao final
+        """
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "arquivo": nome_arquivo,
+            "formato": formato,
+            "status": "pendente",
+            "progresso": 0.0,
+            "linhas_processadas": 0,
+            "inseridas": 0,
+            "atualizadas": 0,
+            "rejeitadas": 0,
+            "colunas_reconhecidas": [],
+            "erros": [],
+            "mensagem": None,
+            "iniciado_em": datetime.now().isoformat(),
+            "concluido_em": None
+        }
+        self._jobs[job["job_id"]] = job
+        while len(self._jobs) > self.max_jobs:
+            antigo_id, antigo = next(iter(self._jobs.items()))
+            if antigo["status"] in ("pendente", "processando"):
+                break
+            del self._jobs[antigo_id]
+
+        tarefa = asyncio.create_task(self._executar(job, arquivo, formato))
+        self._tarefas[job["job_id"]] = tarefa
+        tarefa.add_done_callback(lambda _: self._tarefas.pop(job["job_id"], None))
+        return job
+
+    async def _executar(self, job: dict, arquivo: BinaryIO, formato: str):
+        job["status"] = "processando"
+        linhas = None
+        try:
+            linhas = ler_planilha(arquivo, formato)
+            cabecalho = await asyncio.to_thread(next, linhas, None)
+            if cabecalho is None:
+                raise ValueError("Planilha vazia")
+
+            colunas = mapear_colunas(cabecalho[1])
+            job["colunas_reconhecidas"] = sorted(set(colunas.values()))
+            if "cnpj" not in colunas.values():
+                raise ValueError("Coluna CNPJ não encontrada no cabeçalho")
+
+            while True:
+                registros, numeros, progresso = await asyncio.to_thread(_proximo_lote, linhas, colunas)
+                if not registros:
+                    break
+
+                resultado = await gravar_lote(registros)
+                job["inseridas"] += resultado["inseridas"]
+                job["atualizadas"] += resultado["atualizadas"]
+                job["rejeitadas"] += resultado["rejeitadas"]
+                for indice, erros in sorted(resultado["erros"].items()):
+                    if len(job["erros"]) >= MAX_ERROS_JOB:
+                        break
+                    job["erros"].append({
+                        "linha": numeros[indice],
+                        "cnpj": registros[indice].get("cnpj"),
+                        "erros": erros
+                    })
+                job["linhas_processadas"] += len(registros)
+                job["progresso"] = round(min(progresso, 1.0) * 100, 1)
+
+            job["status"] = "concluido"
+            job["progresso"] = 100.0
+        except Exception as e:
+            job["status"] = "erro"
+            job["mensagem"] = str(e)
+        finally:
+            job["concluido_em"] = datetime.now().isoformat()
+            if linhas is not None:
+                linhas.close()
+            await asyncio.to_thread(arquivo.close)
+
+
+# Instância global
+importacoes = GerenciadorImportacoes()
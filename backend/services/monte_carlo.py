@@ -0,0 +1,275 @@
+"""
+Simulação de Monte Carlo de ocupação e receita do hotel.
+
+Cada simulação sorteia ocupação média anual, diária média, participação
+de A&B (alimentos e bebidas) e a intensidade da sazonalidade; a curva
+mensal vem do índice de sazonalidade dos eventos (AnalyticsService):
+
+    fator_mes = 1 + elasticidade x (indice_mes - 1)
+    ocupacao_mes = clip(ocupacao x fator_mes x (1 + ruído), 0, ocupacao_maxima)
+
+Todas as simulações são calculadas de uma vez em arrays (simulações x 12
+meses), e o fluxo de caixa (services.financeiro) é avaliado para todas
+elas em lote. Os resultados (faixas P10/P50/P90) ficam em cache pelo hash
+dos parâmetros e pelas versões dos datasets de eventos e concorrência.
+"""
+import hashlib
+import json
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from services import financeiro
+from services.analytics import analytics_service
+from services.cache import CacheVersionado
+from services.datasets import concorrencia_dataset, versoes
+
+DIAS_MES = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.float64)
+PERCENTIS = (10, 50, 90)
+
+
+def amostrar(distribuicao: dict, n: int, rng: np.random.Generator, nome: str = "") -> np.ndarray:
+    """
+    Sorteia n valores de uma distribuição (dict no formato de Distribuicao).
+
+    Raises:
+        ValueError: parâmetros ausentes ou inconsistentes para o tipo
+    """
+    tipo = distribuicao.get("tipo", "triangular")
+    minimo = distribuicao.get("minimo")
+    moda = distribuicao.get("moda")
+    maximo = distribuicao.get("maximo")
+    media = distribuicao.get("media")
+    desvio = distribuicao.get("desvio")
+
+    if tipo == "fixa":
+        valor = media if media is not None else moda
+        if valor is None:
+            raise ValueError(f"{nome}: distribuição fixa requer 'media'")
+        return np.full(n, float(valor))
+
+    if tipo == "uniforme":
+        if minimo is None or maximo is None or minimo > maximo:
+            raise ValueError(f"{nome}: distribuição uniforme requer minimo <= maximo")
+        return rng.uniform(minimo, maximo, n)
+
+    if tipo == "triangular":
+        if minimo is None or maximo is None:
+            raise ValueError(f"{nome}: distribuição triangular requer minimo e maximo")
+        moda = moda if moda is not None else (minimo + maximo) / 2
+        if not minimo <= moda <= maximo:
+            raise ValueError(f"{nome}: distribuição triangular requer minimo <= moda <= maximo")
+        if minimo == maximo:
+            return np.full(n, float(minimo))
+        return rng.triangular(minimo, moda, maximo, n)
+
+    if tipo == "normal":
+        if media is None or desvio is None or desvio < 0:
+            raise ValueError(f"{nome}: distribuição normal requer media e desvio >= 0")
+        valores = rng.normal(media, desvio, n)
+        if minimo is not None or maximo is not None:
+            valores = np.clip(valores, minimo, maximo)
+        return valores
+
+    raise ValueError(f"{nome}: tipo de distribuição desconhecido '{tipo}'")
+
+
+def _arredondar(valor: float, casas: int) -> Optional[float]:
+    return round(float(valor), casas) if np.isfinite(valor) else None
+
+
+def faixas(valores: np.ndarray, casas: int = 2, axis: Optional[int] = None):
+    """
+    P10/P50/P90 e média; com `axis`, listas por posição (ex.: por mês).
+
+    Sem `axis`, valores infinitos são aceitos (ex.: payback que não ocorre)
+    e as estatísticas que caem neles viram None.
+    """
+    with np.errstate(invalid="ignore"):
+        p10, p50, p90 = np.percentile(valores, PERCENTIS, axis=axis)
+        media = valores.mean(axis=axis)
+    if axis is None:
+        return {
+            "p10": _arredondar(p10, casas),
+            "p50": _arredondar(p50, casas),
+            "p90": _arredondar(p90, casas),
+            "media": _arredondar(media, casas)
+        }
+    return {
+        "p10": np.round(p10, casas).tolist(),
+        "p50": np.round(p50, casas).tolist(),
+        "p90": np.round(p90, casas).tolist(),
+        "media": np.round(media, casas).tolist()
+    }
+
+
+def hash_parametros(parametros: dict) -> str:
+    """Hash estável dos parâmetros (independe da ordem das chaves)."""
+    texto = json.dumps(parametros, sort_keys=True, default=str)
+    return hashlib.sha1(texto.encode()).hexdigest()
+
+
+class MonteCarloService:
+    """Projeções de ocupação e receita por simulação de Monte Carlo."""
+
+    def __init__(self):
+        self._cache = CacheVersionado(max_entradas=64)
+
+    def parametros_padrao(self, parametros: dict) -> dict:
+        """Completa quartos e diária com os dados do hotel proposto."""
+        hotel = concorrencia_dataset.dados().get("hotel_proposto", {})
+        faixa = hotel.get("diaria_projetada", {})
+        parametros = dict(parametros)
+        if parametros.get("quartos") is None:
+            parametros["quartos"] = hotel.get("quartos_estimados", 55)
+        if parametros.get("diaria") is None:
+            parametros["diaria"] = {
+                "tipo": "triangular",
+                "minimo": faixa.get("min", 250),
+                "moda": hotel.get("diaria_media_target", 280),
+                "maximo": faixa.get("max", 350)
+            }
+        return parametros
+
+    def indices_sazonais(self) -> np.ndarray:
+        """Índice de sazonalidade mensal (média 1) a partir dos eventos."""
+        sazonalidade = analytics_service.calcular_sazonalidade()
+        indices = np.array([m["indice_sazonalidade"] for m in sazonalidade], dtype=np.float64) / 100
+        return indices if indices.any() else np.ones(12)
+
+    def simular_trials(self, parametros: dict) -> Dict[str, np.ndarray]:
+        """
+        Sorteia todas as simulações e retorna os arrays por simulação.
+
+        Returns:
+            Dict com ocupacao_mensal (n x 12), ocupacao_anual, diaria,
+            participacao_fb, receita_quartos, receita_fb, receita_total e revpar
+        """
+        parametros = self.parametros_padrao(parametros)
+        n = parametros["simulacoes"]
+        quartos = parametros["quartos"]
+        rng = np.random.default_rng(parametros.get("semente"))
+
+        ocupacao = amostrar(parametros["ocupacao"], n, rng, "ocupacao")
+        diaria = amostrar(parametros["diaria"], n, rng, "diaria")
+        participacao_fb = amostrar(parametros["participacao_fb"], n, rng, "participacao_fb")
+        elasticidade = amostrar(parametros["elasticidade_sazonal"], n, rng, "elasticidade_sazonal")
+
+        fator = 1 + elasticidade[:, None] * (self.indices_sazonais()[None, :] - 1)
+        ruido = 1 + parametros["ruido_mensal"] * rng.standard_normal((n, 12))
+        ocupacao_mensal = np.clip(
+            ocupacao[:, None] * fator * ruido, 0, parametros["ocupacao_maxima"]
+        )
+
+        diarias_vendidas = quartos * (ocupacao_mensal * DIAS_MES).sum(axis=1)
+        ocupacao_anual = diarias_vendidas / (quartos * DIAS_MES.sum())
+        receita_quartos = diarias_vendidas * diaria
+        receita_fb = receita_quartos * participacao_fb
+
+        return {
+            "ocupacao_mensal": ocupacao_mensal,
+            "ocupacao_anual": ocupacao_anual,
+            "diaria": diaria,
+            "participacao_fb": participacao_fb,
+            "receita_quartos": receita_quartos,
+            "receita_fb": receita_fb,
+            "receita_total": receita_quartos + receita_fb,
+            "revpar": diaria * ocupacao_anual,
+            "revpar_mensal": diaria[:, None] * ocupacao_mensal
+        }
+
+    def simular(self, parametros: dict) -> dict:
+        """
+        Executa (ou serve do cache) a simulação e resume em faixas P10/P50/P90.
+
+        Args:
+            parametros: Dict no formato de ParametrosMonteCarlo
+        """
+        parametros = self.parametros_padrao(parametros)
+        chave = tuple(sorted(versoes(("eventos", "concorrencia")).items()))
+        return self._cache.obter(
+            hash_parametros(parametros), chave, lambda: self._resumir(parametros)
+        )
+
+    def _resumir(self, parametros: dict) -> dict:
+        inicio = time.perf_counter()
+        trials = self.simular_trials(parametros)
+
+        return {
+            "simulacoes": parametros["simulacoes"],
+            "parametros": parametros,
+            "parametros_hash": hash_parametros(parametros),
+            "ocupacao_media_anual": faixas(trials["ocupacao_anual"] * 100, 1),
+            "diaria_media": faixas(trials["diaria"]),
+            "revpar": faixas(trials["revpar"]),
+            "receita_quartos": faixas(trials["receita_quartos"]),
+            "receita_fb": faixas(trials["receita_fb"]),
+            "receita_total": faixas(trials["receita_total"]),
+            "mensal": {
+                "ocupacao": faixas(trials["ocupacao_mensal"] * 100, 1, axis=0),
+                "revpar": faixas(trials["revpar_mensal"], 2, axis=0)
+            },
+            "tempo_ms": round((time.perf_counter() - inicio) * 1000, 1)
+        }
+
+    def viabilidade(self, parametros: dict, parametros_financeiros: dict) -> dict:
+        """
+        VPL, TIR e payback dos cenários de projeção e de cada simulação.
+
+        Args:
+            parametros: Dict no formato de ParametrosMonteCarlo
+            parametros_financeiros: Dict no formato de ParametrosFinanceiros
+        """
+        parametros = self.parametros_padrao(parametros)
+        parametros_financeiros = financeiro.parametros_padrao(parametros_financeiros, parametros["quartos"])
+        nome = hash_parametros({"monte_carlo": parametros, "financeiro": parametros_financeiros})
+        chave = tuple(sorted(versoes(("eventos", "concorrencia")).items()))
+        return self._cache.obter(
+            nome, chave, lambda: self._viabilidade(parametros, parametros_financeiros, nome)
+        )
+
+    def _viabilidade(self, parametros: dict, parametros_financeiros: dict, nome: str) -> dict:
+        inicio = time.perf_counter()
+        trials = self.simular_trials(parametros)
+        resultado = financeiro.avaliar(trials["receita_quartos"], trials["receita_fb"], parametros_financeiros)
+
+        cenarios = analytics_service.receitas_cenarios(parametros["quartos"])
+        por_cenario = financeiro.avaliar(
+            cenarios["receita_quartos"], cenarios["receita_fb"], parametros_financeiros
+        )
+
+        # Sem payback no horizonte = infinito; TIR indefinida = abaixo do mínimo
+        payback = np.nan_to_num(resultado["payback"], nan=np.inf)
+        payback_descontado = np.nan_to_num(resultado["payback_descontado"], nan=np.inf)
+        tir = np.nan_to_num(resultado["tir"], nan=-np.inf)
+
+        return {
+            "simulacoes": parametros["simulacoes"],
+            "parametros_hash": nome,
+            "parametros_financeiros": parametros_financeiros,
+            "cenarios": [
+                {
+                    "cenario": cenario,
+                    "receita_anual_estimada": round(float(cenarios["receita_quartos"][i] + cenarios["receita_fb"][i]), 2),
+                    "vpl": financeiro.arredondar(por_cenario["vpl"][i]),
+                    "tir": financeiro.arredondar(por_cenario["tir"][i] * 100, 1),
+                    "payback_anos": financeiro.arredondar(por_cenario["payback"][i], 1),
+                    "payback_descontado_anos": financeiro.arredondar(por_cenario["payback_descontado"][i], 1)
+                }
+                for i, cenario in enumerate(cenarios["nomes"])
+            ],
+            "monte_carlo": {
+                "vpl": faixas(resultado["vpl"]),
+                "tir": faixas(tir * 100, 1),
+                "payback_anos": faixas(payback, 1),
+                "payback_descontado_anos": faixas(payback_descontado, 1),
+                "probabilidade_vpl_positivo": round(float((resultado["vpl"] > 0).mean() * 100), 1),
+                "probabilidade_payback_no_horizonte": round(float(np.isfinite(payback).mean() * 100), 1)
+            },
+            "tempo_ms": round((time.perf_counter() - inicio) * 1000, 1)
+        }
+
+
+# Instância global
+monte_carlo_service = MonteCarloService()
@@ -0,0 +1,143 @@
+"""
+Municípios candidatos e o conjunto de datasets de cada um.
+
+O registro (data/municipios.json) lista os municípios por código IBGE.
+O município padrão (Ribeirão Pires) usa os datasets principais: eventos,
+concorrência e o EmpresasStore. Os demais leem arquivos no mesmo formato
+em data/municipios/<codigo_ibge>/ (ou na pasta da variável de ambiente
+MUNICIPIOS_PATH, lida também pelos processos do pool do ranking):
+- eventos.json ({"eventos": [...], "resumo": {"total_eventos_ano", "publico_total_estimado"}})
+- concorrencia.json ({"hoteis": [...], "analise_mercado": {"leitos_cidade", ...}, "hotel_proposto": {...}})
+- empresas.json ({"empresas": [...]})
+
+Sem esses arquivos o município aparece no registro como sem dados.
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from services.datasets import (
+    DATA_PATH,
+    DatasetJSON,
+    concorrencia_dataset,
+    eventos_dataset,
+    municipios_dataset,
+    versoes,
+)
+
+MUNICIPIOS_PATH = Path(os.environ.get("MUNICIPIOS_PATH", DATA_PATH / "municipios"))
+MUNICIPIO_PADRAO = "3543303"
+
+
+class BundleMunicipio:
+    """Datasets de eventos, concorrência e empresas de um município."""
+
+    def __init__(
+        self,
+        codigo_ibge: str,
+        nome: str,
+        eventos: DatasetJSON,
+        concorrencia: DatasetJSON,
+        empresas: Optional[DatasetJSON] = None,
+        crescimento_empresarial: Optional[float] = None,
+        uf: str = "SP"
+    ):
+        """
+        Args:
+            empresas: Dataset de empresas; None usa o EmpresasStore
+            crescimento_empresarial: Crescimento (%) levantado em estudo; se
+                None, é estimado pelas aberturas dos últimos 12 meses
+        """
+        self.codigo_ibge = codigo_ibge
+        self.nome = nome
+        self.uf = uf
+        self.eventos = eventos
+        self.concorrencia = concorrencia
+        self.empresas = empresas
+        self.crescimento_empresarial = crescimento_empresarial
+
+    @property
+    def usa_store(self) -> bool:
+        return self.empresas is None
+
+    @property
+    def disponivel(self) -> bool:
+        """Indica se os arquivos de dados do município existem."""
+        if self.usa_store:
+            return True
+        return all(d.path.exists() for d in (self.eventos, self.concorrencia, self.empresas))
+
+    def lista_empresas(self) -> Optional[List[dict]]:
+        """Empresas do município, ou None quando vêm do EmpresasStore."""
+        if self.usa_store:
+            return None
+        return self.empresas.dados().get("empresas", [])
+
+    def versoes(self, nomes: Iterable[str]) -> Dict[str, int]:
+        """Versões dos datasets do município (mesmos nomes de datasets.versoes)."""
+        if self.usa_store:
+            return versoes(nomes)
+        proprios = {"empresas": self.empresas, "eventos": self.eventos, "concorrencia": self.concorrencia}
+        return {
+            nome: proprios[nome].versao_atual() if nome in proprios else versoes((nome,))[nome]
+            for nome in nomes
+        }
+
+
+# Ribeirão Pires: datasets principais e crescimento do estudo
+# (2024: 326 empresas, jan-set 2025: 298 = ~33/mês)
+bundle_padrao = BundleMunicipio(
+    MUNICIPIO_PADRAO, "Ribeirao Pires", eventos_dataset, concorrencia_dataset,
+    crescimento_empresarial=15.2
+)
+
+
+class RegistroMunicipios:
+    """Municípios do registro e seus bundles (criados uma vez por código)."""
+
+    def __init__(self):
+        self._bundles: Dict[str, BundleMunicipio] = {MUNICIPIO_PADRAO: bundle_padrao}
+        self._lock = threading.Lock()
+
+    def listar(self) -> List[dict]:
+        """Entradas do registro com a disponibilidade de dados."""
+        return [
+            {
+                "codigo_ibge": entrada["codigo_ibge"],
+                "nome": entrada.get("nome", ""),
+                "uf": entrada.get("uf", "SP"),
+                "padrao": entrada["codigo_ibge"] == MUNICIPIO_PADRAO,
+                "dados_disponiveis": self.obter(entrada["codigo_ibge"]).disponivel
+            }
+            for entrada in municipios_dataset.dados().get("municipios", [])
+        ]
+
+    def obter(self, codigo_ibge: str) -> Optional[BundleMunicipio]:
+        """Bundle do município, ou None se o código não está no registro."""
+        bundle = self._bundles.get(codigo_ibge)
+        if bundle is not None:
+            return bundle
+
+        entrada = next(
+            (m for m in municipios_dataset.dados().get("municipios", []) if m["codigo_ibge"] == codigo_ibge),
+            None
+        )
+        if entrada is None:
+            return None
+
+        pasta = MUNICIPIOS_PATH / codigo_ibge
+        with self._lock:
+            return self._bundles.setdefault(codigo_ibge, BundleMunicipio(
+                codigo_ibge,
+                entrada.get("nome", ""),
+                DatasetJSON(pasta / "eventos.json", {"eventos": [], "resumo": {}}),
+                DatasetJSON(pasta / "concorrencia.json", {"hoteis": [], "analise_mercado": {}, "hotel_proposto": {}}),
+                DatasetJSON(pasta / "empresas.json", {"empresas": []}),
+                crescimento_empresarial=entrada.get("crescimento_empresarial"),
+                uf=entrada.get("uf", "SP")
+            ))
+
+
+# Instância global
+registro_municipios = RegistroMunicipios()
@@ -0,0 +1,58 @@
+"""
+Projeção de campos e formato colunar para os endpoints de listagem.
+
+- `fields=cnpj,razao_social,...` devolve só os campos pedidos
+- `formato=colunar` devolve {columns: [...], rows: [[...]]}, sem repetir
+  os nomes dos campos em cada registro
+"""
+from typing import Iterable, List, Optional
+
+FORMATOS = ("objetos", "colunar")
+
+
+def parse_campos(fields: Optional[str]) -> Optional[List[str]]:
+    """Converte "a, b,a" em ["a", "b"]; None se nada foi pedido."""
+    if not fields:
+        return None
+    campos = [c.strip() for c in fields.split(",") if c.strip()]
+    return list(dict.fromkeys(campos)) or None
+
+
+def _colunas(registros: List[dict]) -> List[str]:
+    """Campos de todos os registros, na ordem em que aparecem."""
+    colunas = {}
+    for registro in registros:
+        for campo in registro:
+            colunas.setdefault(campo, None)
+    return list(colunas)
+
+
+def projetar(
+    registros: Iterable[dict],
+    fields: Optional[str] = None,
+    formato: str = "objetos"
+):
+    """
+    Aplica a projeção de campos e o formato pedido a uma lista de registros.
+
+    Args:
+        registros: Registros completos (não são modificados)
+        fields: Campos separados por vírgula (None = todos)
+        formato: "objetos" (lista de dicts) ou "colunar"
+
+    Returns:
+        Lista de dicts, ou {"columns": [...], "rows": [[...]]} no formato colunar
+    """
+    campos = parse_campos(fields)
+    registros = registros if isinstance(registros, list) else list(registros)
+
+    if formato == "colunar":
+        colunas = campos or _colunas(registros)
+        return {
+            "columns": colunas,
+            "rows": [[r.get(c) for c in colunas] for r in registros]
+        }
+
+    if campos is None:
+        return registros
+    return [{c: r.get(c) for c in campos} for r in registros]
@@ -0,0 +1,164 @@
+"""
+Ranking de viabilidade entre municípios candidatos.
+
+Cada município é avaliado por um AnalyticsService com o seu bundle de
+datasets (KPIs, score e projeção do cenário moderado). Os resultados
+ficam em cache por município até mudar a versão dos seus datasets (e o
+dia, como os KPIs). Os municípios fora do cache são avaliados em
+paralelo num pool de processos; o padrão, que lê o EmpresasStore em
+memória deste processo, é avaliado no próprio event loop, como as
+demais rotas de analytics, e não numa thread concorrente com as
+mutações do store.
+
+Hoje só o município padrão (Ribeirão Pires) tem dados: os demais do
+registro não têm arquivos em data/municipios/<codigo_ibge>/ e voltam
+com status "sem_dados" até que o bundle seja incluído.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional
+
+from services.analytics import AnalyticsService, analytics_service
+from services.cache import CacheVersionado
+from services.municipios import MUNICIPIO_PADRAO, BundleMunicipio, registro_municipios
+
+MAX_PROCESSOS = 4
+
+# Serviços por município neste processo (e em cada processo do pool)
+_servicos: Dict[str, AnalyticsService] = {}
+
+
+def servico_municipio(codigo_ibge: str) -> Optional[AnalyticsService]:
+    """AnalyticsService do município (None se não está no registro)."""
+    if codigo_ibge == MUNICIPIO_PADRAO:
+        return analytics_service
+    servico = _servicos.get(codigo_ibge)
+    if servico is None:
+        bundle = registro_municipios.obter(codigo_ibge)
+        if bundle is None:
+            return None
+        servico = _servicos.setdefault(codigo_ibge, AnalyticsService(bundle))
+    return servico
+
+
+def avaliar_municipio(codigo_ibge: str) -> dict:
+    """KPIs, score e projeção moderada de um município (roda no pool)."""
+    servico = servico_municipio(codigo_ibge)
+    bundle = servico.municipio
+    kpis = servico.calcular_kpis()
+    projecoes = servico.calcular_projecoes()
+    return {
+        "codigo_ibge": bundle.codigo_ibge,
+        "nome": bundle.nome,
+        "uf": bundle.uf,
+        "status": "avaliado",
+        "score_viabilidade": kpis["score_viabilidade"],
+        "kpis": kpis,
+        "projecao_moderada": next((p for p in projecoes if p["cenario"] == "moderado"), None)
+    }
+
+
+class RankingMunicipios:
+    """Avaliação em lote de municípios, com cache por município."""
+
+    def __init__(self):
+        self._cache = CacheVersionado()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: o processo principal tem threads (escrita do store)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=min(MAX_PROCESSOS, os.cpu_count() or 1),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _chave(self, bundle: BundleMunicipio) -> tuple:
+        chave = tuple(sorted(bundle.versoes(("empresas", "eventos", "concorrencia")).items()))
+        return chave + (date.today().toordinal(),)
+
+    async def ranquear(self, bundles: List[BundleMunicipio]) -> dict:
+        """
+        Avalia os municípios e ordena pelo score (desempate: gap de mercado).
+
+        Args:
+            bundles: Municípios a comparar (os sem dados são listados à parte)
+
+        Returns:
+            Dict com ranking (status "avaliado") e sem_dados (status
+            "sem_dados" e o motivo), além das contagens e do tempo
+        """
+        inicio = time.perf_counter()
+        com_dados = [b for b in bundles if b.disponivel]
+        sem_dados = [
+            {
+                "codigo_ibge": b.codigo_ibge,
+                "nome": b.nome,
+                "uf": b.uf,
+                "status": "sem_dados",
+                "motivo": f"Sem arquivos de dados em data/municipios/{b.codigo_ibge}/"
+            }
+            for b in bundles if not b.disponivel
+        ]
+
+        resultados: Dict[str, dict] = {}
+        pendentes = []
+        for bundle in com_dados:
+            chave = self._chave(bundle)
+            valor = self._cache.consultar(bundle.codigo_ibge, chave)
+            if valor is None:
+                pendentes.append((bundle, chave))
+            else:
+                resultados[bundle.codigo_ibge] = valor
+
+        # Bundles com arquivos próprios vão para o pool; o do store é
+        # avaliado aqui, no loop, enquanto o pool trabalha
+        loop = asyncio.get_running_loop()
+        no_pool = [(bundle, chave) for bundle, chave in pendentes if not bundle.usa_store]
+        futuros = [
+            loop.run_in_executor(self._executor(), avaliar_municipio, bundle.codigo_ibge)
+            for bundle, _ in no_pool
+        ]
+        calculados = [
+            (bundle, chave, avaliar_municipio(bundle.codigo_ibge))
+            for bundle, chave in pendentes if bundle.usa_store
+        ]
+        calculados += [
+            (bundle, chave, valor)
+            for (bundle, chave), valor in zip(no_pool, await asyncio.gather(*futuros))
+        ]
+        for bundle, chave, valor in calculados:
+            self._cache.guardar(bundle.codigo_ibge, chave, valor)
+            resultados[bundle.codigo_ibge] = valor
+
+        ranking = sorted(
+            (resultados[b.codigo_ibge] for b in com_dados),
+            key=lambda r: (r["score_viabilidade"], r["kpis"]["gap_mercado_estimado"]),
+            reverse=True
+        )
+        return {
+            "ranking": [{"posicao": i, **r} for i, r in enumerate(ranking, 1)],
+            "sem_dados": sem_dados,
+            "avaliados": len(pendentes),
+            "em_cache": len(com_dados) - len(pendentes),
+            "tempo_ms": round((time.perf_counter() - inicio) * 1000, 1)
+        }
+
+    def encerrar(self):
+        """Encerra o pool de processos (no shutdown da aplicação)."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# Instância global
+ranking_municipios = RankingMunicipios()
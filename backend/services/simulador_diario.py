@@ -0,0 +1,336 @@
+"""
+Simulação diária de ocupação do hotel ao longo de um ano.
+
+Para cada dia do ano (e cada replicação) a demanda em quartos é sorteada
+com Poisson, somando duas partes:
+- base: quartos x ocupacao_base x curva_semanal[dia da semana]
+- eventos: publico x taxa_pernoite / pessoas_por_quarto x captura,
+  distribuída pelos dias do evento conforme a curva semanal
+
+O nível de demanda de cada replicação varia (lognormal de média 1). As
+reservas chegam com antecedência exponencial (eventos reservam mais cedo)
+e são aceitas por ordem de chegada até lotar: nos dias lotados só entram
+as reservas feitas antes do corte de antecedência em que a capacidade
+esgotou, e as que chegam depois (de hóspedes de eventos ou da demanda
+base) são recusadas. O corte define quantas diárias vendidas são de
+eventos e quantas reservas de eventos se perdem; a curva de pickup
+mostra quanto da ocupação final já estava reservado a N dias da chegada.
+
+Tudo é calculado em arrays replicações x dias; os resumos (faixas
+P10/P50/P90 diárias, semanais e mensais) ficam em cache pelo hash dos
+parâmetros e pelas versões dos datasets de eventos e concorrência.
+"""
+import time
+from datetime import date
+from typing import List, Tuple
+
+import numpy as np
+
+from services.cache import CacheVersionado
+from services.datasets import concorrencia_dataset, eventos_dataset, versoes
+from services.monte_carlo import PERCENTIS, faixas, hash_parametros
+
+# Antecedências (dias antes da chegada) reportadas na curva de pickup
+ANTECEDENCIAS = (180, 90, 60, 30, 14, 7, 3, 1, 0)
+
+# Newton do corte de antecedência: para quando o maior passo fica abaixo
+# da tolerância (dias); o limite de iterações só protege contra NaN
+TOLERANCIA_CORTE = 1e-6
+MAX_ITERACOES_CORTE = 50
+
+
+def _dias_do_ano(ano: int) -> np.ndarray:
+    """Ordinais (date.toordinal) de todos os dias do ano."""
+    return np.arange(date(ano, 1, 1).toordinal(), date(ano + 1, 1, 1).toordinal())
+
+
+def _intervalos_eventos(parametros: dict, ano: int) -> List[Tuple[int, int, float, float]]:
+    """
+    (ordinal inicial, ordinal final, público, taxa de pernoite) de cada evento.
+
+    Sem eventos nos parâmetros, usa o calendário do dataset: datas exatas
+    quando houver, senão os meses inteiros de mes_inicio a mes_fim.
+    """
+    taxa_padrao = parametros["taxa_pernoite"]
+    if parametros.get("eventos") is not None:
+        return [
+            (
+                date.fromisoformat(str(e["data_inicio"])).toordinal(),
+                date.fromisoformat(str(e["data_fim"])).toordinal(),
+                e["publico_estimado"],
+                e["taxa_pernoite"] if e.get("taxa_pernoite") is not None else taxa_padrao
+            )
+            for e in parametros["eventos"]
+        ]
+
+    intervalos = []
+    for evento in eventos_dataset.dados().get("eventos", []):
+        publico = evento.get("publico_estimado", 0)
+        if evento.get("data_inicio"):
+            inicio = date.fromisoformat(evento["data_inicio"]).toordinal()
+            fim = date.fromisoformat(evento.get("data_fim") or evento["data_inicio"]).toordinal()
+            intervalos.append((inicio, fim, publico, taxa_padrao))
+            continue
+
+        mes_inicio = evento.get("mes_inicio", 1)
+        mes_fim = evento.get("mes_fim", mes_inicio)
+        inicio = date(ano, mes_inicio, 1).toordinal()
+        fim = (date(ano + 1, 1, 1) if mes_fim == 12 else date(ano, mes_fim + 1, 1)).toordinal() - 1
+        if mes_fim < mes_inicio:
+            # Evento que atravessa o ano: divide o público pelos dois trechos
+            inicio_ano, fim_ano = date(ano, 1, 1).toordinal(), date(ano, 12, 31).toordinal()
+            dias = (fim_ano - inicio + 1) + (fim - inicio_ano + 1)
+            intervalos.append((inicio, fim_ano, publico * (fim_ano - inicio + 1) / dias, taxa_padrao))
+            intervalos.append((inicio_ano, fim, publico * (fim - inicio_ano + 1) / dias, taxa_padrao))
+        else:
+            intervalos.append((inicio, fim, publico, taxa_padrao))
+    return intervalos
+
+
+def corte_antecedencia(
+    demanda_base: np.ndarray,
+    demanda_eventos: np.ndarray,
+    quartos: int,
+    media_base: float,
+    media_eventos: float
+) -> np.ndarray:
+    """
+    Antecedência (dias) em que a capacidade esgota, nos dias lotados.
+
+    Com antecedências exponenciais, as reservas feitas com antecedência
+    >= L são, em média, base x exp(-L/media_base) + eventos x
+    exp(-L/media_eventos). O corte é o L em que essa soma iguala os
+    quartos. A soma é convexa e decrescente em L e, como nenhuma curva cai
+    mais rápido que a de menor média, o corte de uma curva só,
+    min(médias) x ln(demanda / quartos), fica à esquerda da raiz: o
+    método de Newton parte dele e converge sem ultrapassá-la.
+
+    Returns:
+        Corte de cada elemento de demanda_base / demanda_eventos (que
+        devem ser só os dias com demanda acima dos quartos)
+    """
+    corte = min(media_base, media_eventos) * np.log((demanda_base + demanda_eventos) / quartos)
+    for _ in range(MAX_ITERACOES_CORTE):
+        base = demanda_base * np.exp(-corte / media_base)
+        eventos = demanda_eventos * np.exp(-corte / media_eventos)
+        derivada = base / media_base + eventos / media_eventos
+        passo = (base + eventos - quartos) / derivada
+        corte += passo
+        if not len(passo) or np.abs(passo).max() < TOLERANCIA_CORTE:
+            break
+    return corte
+
+
+def faixas_por_dia(vendidos: np.ndarray, quartos: int, escala, casas: int) -> dict:
+    """
+    Faixas P10/P50/P90 e média por dia (coluna) de `vendidos x escala`.
+
+    Quartos vendidos são inteiros de 0 a `quartos`: os percentis saem do
+    histograma acumulado de cada dia (mesma interpolação linear de
+    np.percentile) sem ordenar as replicações. Como a escala é positiva,
+    também servem para o RevPAR (vendidos x diária do dia / quartos).
+    """
+    n, dias = vendidos.shape
+    contagens = np.bincount(
+        (np.arange(dias) * (quartos + 1) + vendidos).ravel(), minlength=dias * (quartos + 1)
+    ).reshape(dias, quartos + 1)
+    acumulado = contagens.cumsum(axis=1)
+
+    def kesimo(k: np.ndarray) -> np.ndarray:
+        # Valor na posição k (0-based) das replicações ordenadas
+        return (acumulado <= k[:, None]).sum(axis=1)
+
+    resultado = {}
+    for percentil in PERCENTIS:
+        posicao = (n - 1) * percentil / 100
+        k = np.full(dias, int(np.floor(posicao)))
+        abaixo, acima = kesimo(k), kesimo(np.minimum(k + 1, n - 1))
+        valor = abaixo + (posicao - np.floor(posicao)) * (acima - abaixo)
+        resultado[f"p{percentil}"] = np.round(valor * escala, casas).tolist()
+    resultado["media"] = np.round(vendidos.mean(axis=0) * escala, casas).tolist()
+    return resultado
+
+
+class SimuladorDiario:
+    """Ocupação e RevPAR dia a dia por replicações estocásticas."""
+
+    def __init__(self):
+        self._cache = CacheVersionado(max_entradas=32)
+
+    def parametros_padrao(self, parametros: dict) -> dict:
+        """Completa ano, quartos, diária e captura com os dados do hotel proposto."""
+        concorrencia = concorrencia_dataset.dados()
+        hotel = concorrencia.get("hotel_proposto", {})
+        parametros = dict(parametros)
+        if parametros.get("ano") is None:
+            parametros["ano"] = date.today().year
+        if parametros.get("quartos") is None:
+            parametros["quartos"] = hotel.get("quartos_estimados", 55)
+        if parametros.get("diaria") is None:
+            parametros["diaria"] = hotel.get("diaria_media_target", 280)
+        if parametros.get("captura_eventos") is None:
+            leitos_hotel = hotel.get("leitos_estimados", 110)
+            mercado = concorrencia.get("analise_mercado", {})
+            leitos_cidade = mercado.get("leitos_cidade", mercado.get("leitos_ribeirao_pires", 200))
+            parametros["captura_eventos"] = round(leitos_hotel / max(1, leitos_hotel + leitos_cidade), 4)
+        return parametros
+
+    def demanda_esperada(self, parametros: dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Demanda média (quartos por dia) base e de eventos, e o dia da semana.
+
+        Returns:
+            (base, eventos, dia_semana), arrays com um valor por dia
+        """
+        ano = parametros["ano"]
+        dias = _dias_do_ano(ano)
+        # date(1, 1, 1) é segunda-feira: ordinal 1 -> 0
+        dia_semana = (dias - 1) % 7
+        curva = np.asarray(parametros["curva_semanal"], dtype=np.float64)[dia_semana]
+
+        base = parametros["quartos"] * parametros["ocupacao_base"] * curva
+
+        eventos = np.zeros(len(dias))
+        fator = parametros["captura_eventos"] / parametros["pessoas_por_quarto"]
+        for inicio, fim, publico, taxa in _intervalos_eventos(parametros, ano):
+            mascara = (dias >= inicio) & (dias <= fim)
+            peso = curva * mascara
+            if peso.sum() > 0:
+                eventos += publico * taxa * fator * peso / peso.sum()
+
+        return base, eventos, dia_semana
+
+    def _pickup(
+        self,
+        parametros: dict,
+        demanda_base: np.ndarray,
+        demanda_eventos: np.ndarray,
+        lotados: np.ndarray,
+        corte: np.ndarray,
+        vendidos: np.ndarray
+    ) -> List[dict]:
+        """
+        Percentual da ocupação final já reservado a cada antecedência.
+
+        Reservas feitas com antecedência >= N são fração exp(-N/média) da
+        demanda de cada segmento. Um dia lotado com corte >= N já tinha
+        todos os quartos reservados; com corte < N entra como os demais.
+        """
+        media_base = parametros["antecedencia_media"]
+        media_eventos = parametros["antecedencia_media_eventos"]
+        quartos = parametros["quartos"]
+        base_lotados, eventos_lotados = demanda_base[lotados], demanda_eventos[lotados]
+        livres_base = demanda_base.sum() - base_lotados.sum()
+        livres_eventos = demanda_eventos.sum() - eventos_lotados.sum()
+        total_vendido = max(1, vendidos.sum())
+
+        pickup = []
+        for antecedencia in ANTECEDENCIAS:
+            abertos = corte < antecedencia
+            reservadas = (
+                (livres_base + base_lotados[abertos].sum()) * np.exp(-antecedencia / media_base)
+                + (livres_eventos + eventos_lotados[abertos].sum()) * np.exp(-antecedencia / media_eventos)
+                + quartos * (len(corte) - abertos.sum())
+            )
+            pickup.append({
+                "antecedencia_dias": antecedencia,
+                "percentual_reservado": round(float(reservadas / total_vendido * 100), 1)
+            })
+        return pickup
+
+    def simular(self, parametros: dict) -> dict:
+        """
+        Executa (ou serve do cache) a simulação diária.
+
+        Args:
+            parametros: Dict no formato de ParametrosSimulacaoDiaria
+        """
+        parametros = self.parametros_padrao(parametros)
+        chave = tuple(sorted(versoes(("eventos", "concorrencia")).items()))
+        return self._cache.obter(
+            hash_parametros(parametros), chave, lambda: self._simular(parametros)
+        )
+
+    def _simular(self, parametros: dict) -> dict:
+        inicio = time.perf_counter()
+        n = parametros["replicacoes"]
+        quartos = parametros["quartos"]
+        rng = np.random.default_rng(parametros.get("semente"))
+
+        base, eventos, dia_semana = self.demanda_esperada(parametros)
+        dias = len(base)
+
+        # Nível de demanda do ano em cada replicação (lognormal de média 1)
+        sigma = parametros["variabilidade_anual"]
+        nivel = np.exp(sigma * rng.standard_normal((n, 1)) - sigma ** 2 / 2)
+
+        demanda_base = rng.poisson(base * nivel)
+        demanda_eventos = rng.poisson(eventos * nivel)
+        demanda = demanda_base + demanda_eventos
+        vendidos = np.minimum(demanda, quartos)
+
+        # Ordem de chegada: nos dias lotados, das reservas aceitas (antes do
+        # corte) cada uma é de evento com a probabilidade do seu segmento
+        lotados = demanda > quartos
+        corte = corte_antecedencia(
+            demanda_base[lotados], demanda_eventos[lotados], quartos,
+            parametros["antecedencia_media"], parametros["antecedencia_media_eventos"]
+        )
+        aceitas_base = demanda_base[lotados] * np.exp(-corte / parametros["antecedencia_media"])
+        aceitas_eventos = demanda_eventos[lotados] * np.exp(-corte / parametros["antecedencia_media_eventos"])
+        vendidos_eventos = demanda_eventos.copy()
+        vendidos_eventos[lotados] = rng.binomial(quartos, aceitas_eventos / (aceitas_base + aceitas_eventos))
+
+        fim_de_semana = (dia_semana == 4) | (dia_semana == 5)
+        diaria = (
+            parametros["diaria"]
+            * (1 + parametros["premio_fim_semana"] * fim_de_semana)
+            * (1 + parametros["premio_evento"] * (eventos > 0))
+        )
+        ocupacao = vendidos / quartos
+        revpar = ocupacao * diaria
+
+        ano = parametros["ano"]
+        inicio_semanas = np.arange(0, dias, 7)
+        inicio_meses = np.array([date(ano, m, 1).timetuple().tm_yday - 1 for m in range(1, 13)])
+
+        def por_periodo(valores: np.ndarray, inicios: np.ndarray) -> np.ndarray:
+            tamanhos = np.diff(np.append(inicios, dias))
+            return np.add.reduceat(valores, inicios, axis=1) / tamanhos
+
+        return {
+            "ano": ano,
+            "dias": dias,
+            "replicacoes": n,
+            "parametros": parametros,
+            "parametros_hash": hash_parametros(parametros),
+            "anual": {
+                "ocupacao": faixas(ocupacao.mean(axis=1) * 100, 1),
+                "revpar": faixas(revpar.mean(axis=1)),
+                "receita_quartos": faixas((vendidos * diaria).sum(axis=1)),
+                "diarias_vendidas": faixas(vendidos.sum(axis=1), 0),
+                "demanda_recusada": faixas((demanda - vendidos).sum(axis=1), 0),
+                "diarias_eventos": faixas(vendidos_eventos.sum(axis=1), 0),
+                "reservas_eventos_recusadas": faixas((demanda_eventos - vendidos_eventos).sum(axis=1), 0),
+                "dias_lotados": faixas((vendidos == quartos).sum(axis=1), 0)
+            },
+            "diario": {
+                "ocupacao": faixas_por_dia(vendidos, quartos, 100 / quartos, 1),
+                "revpar": faixas_por_dia(vendidos, quartos, diaria / quartos, 2)
+            },
+            "semanal": {
+                "inicio": [date.fromordinal(date(ano, 1, 1).toordinal() + int(d)).isoformat() for d in inicio_semanas],
+                "ocupacao": faixas(por_periodo(ocupacao, inicio_semanas) * 100, 1, axis=0),
+                "revpar": faixas(por_periodo(revpar, inicio_semanas), 2, axis=0)
+            },
+            "mensal": {
+                "ocupacao": faixas(por_periodo(ocupacao, inicio_meses) * 100, 1, axis=0),
+                "revpar": faixas(por_periodo(revpar, inicio_meses), 2, axis=0)
+            },
+            "pickup": self._pickup(parametros, demanda_base, demanda_eventos, lotados, corte, vendidos),
+            "tempo_ms": round((time.perf_counter() - inicio) * 1000, 1)
+        }
+
+
+# Instância global
+simulador_diario = SimuladorDiario()
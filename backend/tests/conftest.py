@@ -0,0 +1,62 @@
+"""
+Fixtures compartilhadas: repositório de empresas isolado em diretório
+temporário (os testes nunca tocam em data/).
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.empresas_store import EmpresasStore, JSONBackend  # noqa: E402
+
+
+def empresa(empresa_id: int, **campos) -> dict:
+    """Empresa completa no formato do dataset."""
+    return {
+        "id": empresa_id,
+        "cnpj": f"{empresa_id:08d}000100",
+        "razao_social": f"EMPRESA {empresa_id} LTDA",
+        "nome_fantasia": None,
+        "cnae_principal": "5620-1/02",
+        "cnae_descricao": "Servicos de alimentacao para eventos e recepcoes",
+        "data_abertura": "2020-01-15",
+        "municipio": "Ribeirão Pires",
+        "bairro": "Centro",
+        "endereco": "Rua A, 1",
+        "telefone": "(11) 4828-0000",
+        "email": f"contato{empresa_id}@exemplo.com.br",
+        "porte": "ME",
+        "setor_hotel": "Buffets/Catering",
+        "capital_social": None,
+        "status_parceria": "nao_contatado",
+        "notas": None,
+        **campos
+    }
+
+
+@pytest.fixture
+def criar_store(tmp_path):
+    """Cria um EmpresasStore sobre um snapshot JSON temporário."""
+    def criar(empresas=(), compactar_apos: int = 500) -> EmpresasStore:
+        path = tmp_path / "empresas.json"
+        if not path.exists():
+            path.write_text(json.dumps({"empresas": list(empresas)}), encoding="utf-8")
+        return EmpresasStore(JSONBackend(path, compactar_apos=compactar_apos))
+    return criar
+
+
+@pytest.fixture
+def criar_app(monkeypatch):
+    """App só com o router de empresas, servindo o repositório informado."""
+    def criar(store: EmpresasStore):
+        from fastapi import FastAPI
+        from api import empresas as api_empresas
+
+        monkeypatch.setattr(api_empresas, "empresas_store", store)
+        app = FastAPI()
+        app.include_router(api_empresas.router)
+        return app
+    return criar
@@ -0,0 +1,53 @@
+"""Busca textual e aproximada (/empresas/busca)."""
+import asyncio
+
+from conftest import empresa
+from services.busca import IndiceBusca
+from services.empresas_store import EmpresasStore, JSONBackend
+
+EMPRESAS = [
+    empresa(1, razao_social="HOTEL TESTE LTDA"),
+    empresa(2, razao_social="REQUINTE BUFFET E EVENTOS EIRELI"),
+    empresa(3, razao_social="POUSADA DA SERRA LTDA", bairro="Ouro Fino"),
+    empresa(4, razao_social="RESTAURANTE PANORAMA ME"),
+]
+
+
+def test_erros_de_uma_letra():
+    indice = IndiceBusca(EMPRESAS)
+
+    for consulta, esperado in (
+        ("hotl tste", 1),     # letra faltando
+        ("hotel tesre", 1),   # letra trocada
+        ("bufet", 2),
+        ("requinet", 2),      # letras transpostas
+        ("pousda", 3),
+        ("panorana", 4),
+    ):
+        resultados = indice.buscar(consulta)
+        assert resultados and resultados[0][0] == esperado, consulta
+
+
+def test_sem_falsos_positivos_distantes():
+    assert IndiceBusca(EMPRESAS).buscar("farmacia") == []
+
+
+def test_recarga_atualiza_o_indice_sem_reconstruir(criar_store):
+    # Base grande o bastante para a recarga aplicar só a diferença
+    store = criar_store(EMPRESAS + [empresa(i) for i in range(5, 60)])
+    assert store.buscar("pousada")[0][0]["id"] == 3
+    indice = store.busca
+
+    # Outro processo grava no mesmo arquivo
+    externo = EmpresasStore(JSONBackend(store.backend.path))
+
+    async def gravar():
+        await externo.atualizar(3, {"razao_social": "CHALES DA SERRA LTDA"})
+        await externo.adicionar(empresa(0, id=None, cnpj="99888777000166", razao_social="ESTALAGEM MONTANHA"))
+        await externo.fechar()
+    asyncio.run(gravar())
+
+    assert store.buscar("estalagem")[0][0]["razao_social"] == "ESTALAGEM MONTANHA"
+    assert store.buscar("chales")[0][0]["id"] == 3
+    assert store.buscar("pousada") == []
+    assert store.busca is indice
@@ -0,0 +1,40 @@
+"""CNPJ repetido em bases legadas: o índice não perde os demais donos."""
+import asyncio
+
+import httpx
+import pytest
+
+from conftest import empresa
+from services.empresas_store import CNPJDuplicadoError
+
+CNPJ = "11222333000181"
+
+
+def test_excluir_dono_passa_a_chave_para_o_repetido(criar_store, criar_app):
+    store = criar_store([empresa(i, cnpj=CNPJ) for i in (3, 1, 2)] + [empresa(4)])
+    app = criar_app(store)
+
+    async def cenario():
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+            async def dono():
+                resposta = await cliente.get(f"/empresas/cnpj/{CNPJ}")
+                return resposta.json()["id"] if resposta.status_code == 200 else None
+
+            donos = [await dono()]
+            await cliente.delete("/empresas/1")
+            donos.append(await dono())
+            # Atualizar um repetido (mesmo CNPJ) não é conflito nem troca o dono
+            await store.atualizar(3, {"cnpj": CNPJ, "notas": "legado"})
+            donos.append(await dono())
+            # Trocar para um CNPJ já em uso continua sendo conflito
+            with pytest.raises(CNPJDuplicadoError):
+                await store.atualizar(4, {"cnpj": CNPJ})
+            await cliente.delete("/empresas/2")
+            donos.append(await dono())
+            await cliente.delete("/empresas/3")
+            donos.append(await dono())
+        await store.fechar()
+        return donos
+
+    assert asyncio.run(cenario()) == [1, 2, 2, 3, None]
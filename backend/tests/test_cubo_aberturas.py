@@ -0,0 +1,80 @@
+"""Cubo de aberturas (/analytics/aberturas)."""
+import asyncio
+from datetime import date
+
+from conftest import empresa
+from services.cubo_aberturas import CuboAberturas
+
+EMPRESAS = [
+    empresa(1, data_abertura="2024-01-10", setor_hotel="Restaurantes", porte="ME"),
+    empresa(2, data_abertura="2024-02-05", setor_hotel="Restaurantes", porte="EPP"),
+    empresa(3, data_abertura="2024-04-20", setor_hotel="Buffets/Catering", porte="ME"),
+    empresa(4, data_abertura="2025-01-02", setor_hotel="Buffets/Catering", porte="ME", bairro="Ouro Fino"),
+    empresa(5, data_abertura=None),
+]
+
+
+def valores(serie: dict) -> dict:
+    return {s["grupo"]: s["valores"] for s in serie["series"]}
+
+
+def test_roll_up_por_granularidade():
+    cubo = CuboAberturas(EMPRESAS)
+
+    mensal = cubo.serie()
+    assert mensal["periodos"][0] == "2024-01" and mensal["periodos"][-1] == "2025-01"
+    assert len(mensal["periodos"]) == 13
+    assert valores(mensal)["total"][:4] == [1, 1, 0, 1]
+    assert mensal["total"] == 4 and mensal["sem_data_abertura"] == 1
+
+    trimestral = cubo.serie(granularidade="trimestre")
+    assert trimestral["periodos"] == ["2024-T1", "2024-T2", "2024-T3", "2024-T4", "2025-T1"]
+    assert valores(trimestral) == {"total": [2, 1, 0, 0, 1]}
+
+    anual = cubo.serie(granularidade="ano")
+    assert anual["periodos"] == ["2024", "2025"]
+    assert valores(anual) == {"total": [3, 1]}
+
+
+def test_fatias_por_setor_e_porte():
+    cubo = CuboAberturas(EMPRESAS)
+
+    por_setor = cubo.serie(granularidade="ano", agrupar_por="setor")
+    assert valores(por_setor) == {"Restaurantes": [2, 0], "Buffets/Catering": [1, 1]}
+
+    # Um filtro (marginais) e dois filtros (células)
+    assert valores(cubo.serie(granularidade="ano", agrupar_por="porte", setor="Restaurantes")) == {
+        "ME": [1, 0], "EPP": [1, 0]
+    }
+    assert valores(cubo.serie(granularidade="ano", porte="ME", setor="Buffets/Catering")) == {"total": [1, 1]}
+    assert valores(cubo.serie(granularidade="ano", porte="ME", bairro="Ouro Fino")) == {"total": [0, 1]}
+    assert valores(cubo.serie(granularidade="ano", cnae="5620")) == {"total": [3, 1]}
+
+
+def test_intervalo_limitado_aos_meses_com_aberturas():
+    cubo = CuboAberturas(EMPRESAS)
+
+    serie = cubo.serie(inicio=date(1, 1, 1), fim=date(9999, 12, 31))
+    assert serie["periodos"][0] == "2024-01" and serie["periodos"][-1] == "2025-01"
+    assert serie == cubo.serie()
+    assert cubo.serie(inicio=date(2030, 1, 1))["periodos"] == []
+
+
+def test_atualizacao_incremental_apos_escrita(criar_store):
+    store = criar_store(EMPRESAS)
+    store.serie_aberturas()
+
+    async def escrever():
+        await store.atualizar(1, {"data_abertura": "2025-03-01", "setor_hotel": "Hospedagem"})
+        await store.remover(3)
+        await store.adicionar(empresa(0, id=None, cnpj="99888777000166", data_abertura="2023-12-31"))
+        await store.fechar()
+    asyncio.run(escrever())
+
+    for parametros in (
+        {},
+        {"granularidade": "trimestre", "agrupar_por": "setor"},
+        {"granularidade": "ano", "agrupar_por": "porte", "setor": "Hospedagem"},
+    ):
+        assert store.serie_aberturas(**parametros) == CuboAberturas(store.listar()).serie(**parametros)
+    assert store.serie_aberturas(granularidade="ano")["periodos"] == ["2023", "2024", "2025"]
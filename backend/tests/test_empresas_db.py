@@ -0,0 +1,44 @@
+"""Backend SQLite: assinatura barata e paginação por keyset."""
+import asyncio
+import json
+
+from conftest import empresa
+from services.empresas_db import EmpresasDB
+
+
+def _criar_db(tmp_path, quantidade: int) -> EmpresasDB:
+    json_path = tmp_path / "empresas.json"
+    json_path.write_text(json.dumps({"empresas": [empresa(i) for i in range(1, quantidade + 1)]}))
+    return EmpresasDB(tmp_path / "empresas.db", json_path)
+
+
+def test_assinatura_muda_apenas_com_gravacao(tmp_path):
+    db = _criar_db(tmp_path, 3)
+    inicial = db.assinatura()
+    assert db.assinatura() == inicial
+
+    db.gravar([("update", empresa(2, bairro="Novo"))])
+    depois = db.assinatura()
+    assert depois != inicial
+    assert db.assinatura() == depois
+
+    # Gravação por outra instância (outro processo) também é detectada
+    EmpresasDB(db.path, db.json_path).gravar([("delete", 3)])
+    assert db.assinatura() != depois
+
+
+def test_cursor_sem_pagina_final_vazia(tmp_path):
+    db = _criar_db(tmp_path, 4)
+
+    async def paginas():
+        ids, apos_id = [], None
+        while True:
+            total, pagina, tem_mais = await db.listar(limit=2, apos_id=apos_id)
+            assert pagina, "página vazia emitida por um cursor"
+            ids.extend(e["id"] for e in pagina)
+            if not tem_mais:
+                return total, ids
+            apos_id = pagina[-1]["id"]
+
+    total, ids = asyncio.run(paginas())
+    assert (total, ids) == (4, [1, 2, 3, 4])
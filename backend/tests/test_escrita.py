@@ -0,0 +1,116 @@
+"""Escritor único (group commit): coalescência, falhas e compactação."""
+import asyncio
+import time
+
+import httpx
+
+from conftest import empresa
+from services.empresas_store import EmpresasStore, JSONBackend
+
+
+class BackendContado(JSONBackend):
+    """JSONBackend que conta as gravações e pode falhar sob demanda."""
+
+    def __init__(self, *args, falhar_gravacoes=(), falhar_compactacao=False, atraso_compactacao=0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gravacoes = []
+        self.falhar_gravacoes = set(falhar_gravacoes)
+        self.falhar_compactacao = falhar_compactacao
+        self.atraso_compactacao = atraso_compactacao
+
+    def gravar(self, mutacoes):
+        numero = len(self.gravacoes)
+        self.gravacoes.append(len(mutacoes))
+        if numero in self.falhar_gravacoes:
+            time.sleep(0.05)
+            raise OSError("disco cheio")
+        super().gravar(mutacoes)
+
+    def compactar(self, dados):
+        time.sleep(self.atraso_compactacao)
+        if self.falhar_compactacao:
+            raise OSError("sem espaço para o snapshot")
+        super().compactar(dados)
+
+
+def _store(criar_store, **kwargs) -> EmpresasStore:
+    base = criar_store([empresa(i) for i in range(1, 41)])
+    return EmpresasStore(BackendContado(base.backend.path, **kwargs))
+
+
+def test_puts_concorrentes_coalescem_sem_perder_atualizacoes(criar_store, criar_app):
+    store = _store(criar_store)
+    app = criar_app(store)
+
+    async def cenario():
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+            respostas = await asyncio.gather(*(
+                cliente.put(f"/empresas/{i}/status", params={"status": "contatado", "notas": f"nota {i}"})
+                for i in range(1, 41)
+            ))
+        await store.fechar()
+        return respostas
+
+    respostas = asyncio.run(cenario())
+
+    assert all(r.status_code == 200 for r in respostas)
+    assert sum(store.backend.gravacoes) == 40
+    assert len(store.backend.gravacoes) < 40
+
+    relido = EmpresasStore(JSONBackend(store.backend.path))
+    for i in range(1, 41):
+        emp = relido.obter(i)
+        assert (emp["status_parceria"], emp["notas"]) == ("contatado", f"nota {i}")
+
+
+def test_falha_de_lote_recarrega_mesmo_com_lote_seguinte_gravado(criar_store):
+    store = _store(criar_store, falhar_gravacoes={0})
+
+    async def cenario():
+        primeira = asyncio.ensure_future(store.atualizar(1, {"notas": "perdida"}))
+        await asyncio.sleep(0.02)
+        segunda = asyncio.ensure_future(store.atualizar(2, {"notas": "gravada"}))
+        resultados = await asyncio.gather(primeira, segunda, return_exceptions=True)
+        await store.fechar()
+        return resultados
+
+    primeira, segunda = asyncio.run(cenario())
+
+    assert isinstance(primeira, OSError)
+    assert not isinstance(segunda, Exception)
+    assert len(store.backend.gravacoes) == 2
+    # A memória volta a refletir o disco: a mutação que falhou é descartada
+    assert store.obter(1)["notas"] is None
+    assert store.obter(2)["notas"] == "gravada"
+
+
+def test_falha_na_compactacao_nao_falha_o_commit(criar_store):
+    store = _store(criar_store, compactar_apos=1, falhar_compactacao=True)
+
+    async def cenario():
+        await store.atualizar(3, {"notas": "durável"})
+        await store.fechar()
+
+    asyncio.run(cenario())
+
+    assert store.backend.journal_path.stat().st_size > 0
+    assert EmpresasStore(JSONBackend(store.backend.path)).obter(3)["notas"] == "durável"
+
+
+def test_compactacao_nao_bloqueia_o_event_loop(criar_store):
+    store = _store(criar_store, compactar_apos=1, atraso_compactacao=0.3)
+
+    async def cenario():
+        await store.atualizar(4, {"notas": "x"})
+        # O escritor compacta em seguida; o loop deve continuar respondendo
+        inicio = asyncio.get_running_loop().time()
+        batidas = 0
+        while asyncio.get_running_loop().time() - inicio < 0.2:
+            await asyncio.sleep(0.01)
+            batidas += 1
+        await store.fechar()
+        return batidas
+
+    assert asyncio.run(cenario()) >= 10
+    assert store.backend.journal_path.stat().st_size == 0
@@ -0,0 +1,38 @@
+"""ETag e GET condicional do middleware em main.py."""
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+class Amanha(date):
+    @classmethod
+    def today(cls):
+        return date.today() + timedelta(days=1)
+
+
+def test_rotas_diarias_mudam_de_etag_com_a_data(monkeypatch):
+    cliente = TestClient(main.app)
+    hoje = cliente.get("/analytics/kpis").headers["ETag"]
+    empresas_hoje = cliente.get("/empresas", params={"limite": 1}).headers["ETag"]
+    assert cliente.get("/analytics/kpis", headers={"If-None-Match": hoje}).status_code == 304
+
+    monkeypatch.setattr(main, "date", Amanha)
+
+    resposta = cliente.get("/analytics/kpis", headers={"If-None-Match": hoje})
+    assert resposta.status_code == 200
+    assert resposta.headers["ETag"] != hoje
+    # Rotas que não dependem da data mantêm o ETag
+    assert cliente.get("/empresas", params={"limite": 1}).headers["ETag"] == empresas_hoje
+
+
+def test_if_none_match_asterisco_nao_esconde_404():
+    cliente = TestClient(main.app)
+
+    resposta = cliente.get("/empresas/999999999", headers={"If-None-Match": "*"})
+    assert resposta.status_code == 404
+
+    etag = cliente.get("/analytics/kpis").headers["ETag"]
+    assert cliente.get("/analytics/kpis", headers={"If-None-Match": "*"}).status_code == 200
+    assert cliente.get("/analytics/kpis", headers={"If-None-Match": f'"x", {etag}'}).status_code == 304
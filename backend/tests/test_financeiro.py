@@ -0,0 +1,58 @@
+"""Fluxo de caixa do investidor: VPL, TIR e payback (services/financeiro.py)."""
+import numpy as np
+import pytest
+
+from services.financeiro import arredondar, payback, tir, vpl
+
+FLUXOS = np.array([
+    [-1000.0, 500.0, 500.0, 500.0],
+    [-100.0, 60.0, 60.0, 0.0],
+    [-100.0, 110.0, 0.0, 0.0],
+])
+
+
+def test_vpl_a_taxa_conhecida():
+    esperado = -1000 + 500 / 1.1 + 500 / 1.1 ** 2 + 500 / 1.1 ** 3
+    assert vpl(FLUXOS[:1], 0.10)[0] == pytest.approx(esperado)
+    assert esperado == pytest.approx(243.4260, abs=1e-4)
+    # Taxa por linha; taxa zero é a soma simples
+    np.testing.assert_allclose(vpl(FLUXOS, np.array([0.0, 0.0, 0.10])), [500.0, 20.0, 0.0], atol=1e-9)
+
+
+def test_tir_contra_raiz_conhecida():
+    # 60x^2 + 60x - 100 = 0 com x = 1 / (1 + r)
+    x = (-60 + np.sqrt(60 ** 2 + 4 * 60 * 100)) / (2 * 60)
+    taxas = tir(FLUXOS)
+
+    assert taxas[0] == pytest.approx(0.23375, abs=1e-5)
+    assert taxas[1] == pytest.approx(1 / x - 1, abs=1e-9)
+    assert taxas[2] == pytest.approx(0.10, abs=1e-9)
+    np.testing.assert_allclose(vpl(FLUXOS, taxas), 0, atol=1e-6)
+
+
+def test_tir_sem_mudanca_de_sinal():
+    taxas = tir(np.array([[-100.0, -10.0, -5.0], [100.0, 10.0, 5.0]]))
+    assert np.isnan(taxas).all()
+    assert arredondar(taxas[0], 4) is None
+
+
+def test_payback_simples_e_descontado():
+    fluxos = np.array([
+        [-1000.0, 400.0, 400.0, 400.0, 400.0],
+        [-1000.0, 400.0, 400.0, 400.0, 0.0],
+        [0.0, 100.0, 100.0, 100.0, 100.0],
+    ])
+
+    # Acumulado -600, -200, +200: paga no meio do terceiro ano
+    simples = payback(fluxos)
+    assert simples[0] == pytest.approx(2.5)
+    assert simples[1] == pytest.approx(2.5)
+    assert simples[2] == 0.0
+
+    descontados = 400 / 1.1 ** np.arange(1, 5)
+    acumulado_3 = -1000 + descontados[:3].sum()
+    descontado = payback(fluxos, 0.10)
+    assert descontado[0] == pytest.approx(3 + -acumulado_3 / descontados[3])
+    # Sem o quarto ano o acumulado descontado não chega a zero no horizonte
+    assert np.isnan(descontado[1])
+    assert arredondar(descontado[1], 1) is None
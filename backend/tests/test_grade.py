@@ -0,0 +1,67 @@
+"""Grade de cenários (/analytics/grid)."""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.grade import MAX_CELULAS_GRADE, MAX_VALORES_EIXO
+
+
+@pytest.fixture
+def cliente():
+    return TestClient(main.app)
+
+
+def test_grade_2x2x1_confere_com_conta_manual(cliente):
+    resposta = cliente.post("/analytics/grid", json={
+        "quartos": {"valores": [50, 60]},
+        "diaria": {"valores": [200, 300]},
+        "ocupacao": {"valores": [0.6]},
+        "participacao_fb": {"valores": [0.4]},
+    })
+    assert resposta.status_code == 200
+    grade = json.loads(resposta.content)
+
+    assert grade["celulas"] == 4
+    metricas = grade["metricas"]
+    assert metricas["revpar"]["valores"] == [120.0, 180.0]
+    # 50 e 60 quartos x 365 dias x RevPAR 120 e 180
+    assert metricas["receita_quartos"]["valores"] == [2_190_000, 3_285_000, 2_628_000, 3_942_000]
+    assert metricas["receita_fb"]["valores"] == [876_000, 1_314_000, 1_051_200, 1_576_800]
+    assert metricas["receita_total"]["valores"] == [3_066_000, 4_599_000, 3_679_200, 5_518_800]
+
+
+def test_json_em_partes_tem_a_forma_declarada(cliente):
+    resposta = cliente.post("/analytics/grid", json={
+        "quartos": {"inicio": 40, "fim": 70, "passo": 10},
+        "diaria": {"inicio": 200, "fim": 300, "passo": 50},
+        "ocupacao": {"valores": [0.5, 0.7]},
+        "participacao_fb": {"valores": [0.3, 0.4, 0.5]},
+    })
+    grade = json.loads(resposta.content)
+
+    tamanhos = {nome: len(valores) for nome, valores in grade["eixos"].items()}
+    assert tamanhos == {"quartos": 4, "diaria": 3, "ocupacao": 2, "participacao_fb": 3}
+    assert grade["celulas"] == 4 * 3 * 2 * 3
+    for nome, metrica in grade["metricas"].items():
+        assert metrica["forma"] == [tamanhos[eixo] for eixo in metrica["eixos"]], nome
+        produto = 1
+        for tamanho in metrica["forma"]:
+            produto *= tamanho
+        assert len(metrica["valores"]) == produto, nome
+
+
+def test_limites_de_eixo_e_de_grade(cliente):
+    eixo_grande = {"valores": list(range(MAX_VALORES_EIXO + 1))}
+    assert cliente.post("/analytics/grid", json={"quartos": eixo_grande}).status_code == 400
+
+    faixa_grande = {"inicio": 0, "fim": MAX_VALORES_EIXO * 2, "passo": 1}
+    assert cliente.post("/analytics/grid", json={"diaria": faixa_grande}).status_code == 400
+
+    # Cada eixo dentro do limite, mas o produto passa de MAX_CELULAS_GRADE
+    lado = int(MAX_CELULAS_GRADE ** 0.25) + 1
+    eixos = {nome: {"valores": list(range(1, lado + 1))} for nome in ("quartos", "diaria", "ocupacao", "participacao_fb")}
+    resposta = cliente.post("/analytics/grid", json=eixos)
+    assert resposta.status_code == 400
+    assert str(MAX_CELULAS_GRADE) in resposta.json()["detail"]
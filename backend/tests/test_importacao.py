@@ -0,0 +1,95 @@
+"""Importação em lote: upsert por CNPJ sem apagar campos não enviados."""
+import asyncio
+import io
+
+from conftest import empresa
+from services import importacao
+
+
+def test_upsert_preserva_campos_nao_enviados(criar_store, monkeypatch):
+    store = criar_store([empresa(2)])
+    monkeypatch.setattr(importacao, "empresas_store", store)
+
+    parcial = {
+        campo: empresa(2)[campo]
+        for campo in ("cnpj", "razao_social", "cnae_principal", "cnae_descricao",
+                      "data_abertura", "municipio", "porte", "setor_hotel")
+    }
+    parcial["razao_social"] = "NOVA RAZAO LTDA"
+
+    resultado = asyncio.run(importacao.gravar_lote([parcial]))
+
+    assert (resultado["inseridas"], resultado["atualizadas"]) == (0, 1)
+    atual = store.obter(2)
+    assert atual["razao_social"] == "NOVA RAZAO LTDA"
+    assert atual["telefone"] == "(11) 4828-0000"
+    assert atual["bairro"] == "Centro"
+    assert atual["email"] == "contato2@exemplo.com.br"
+
+
+def test_upsert_aplica_null_explicito_e_completa_novas(criar_store, monkeypatch):
+    store = criar_store([empresa(2)])
+    monkeypatch.setattr(importacao, "empresas_store", store)
+
+    existente = {**empresa(2), "telefone": None}
+    del existente["id"]
+    nova = {**empresa(3)}
+    del nova["id"], nova["email"], nova["status_parceria"]
+
+    resultado = asyncio.run(importacao.gravar_lote([existente, nova]))
+
+    assert (resultado["inseridas"], resultado["atualizadas"]) == (1, 1)
+    assert store.obter(2)["telefone"] is None
+    inserida = store.obter_por_cnpj(nova["cnpj"])
+    assert inserida["email"] is None
+    assert inserida["status_parceria"] == "nao_contatado"
+
+
+def _importar(store, monkeypatch, conteudo: bytes) -> dict:
+    monkeypatch.setattr(importacao, "empresas_store", store)
+    chamadas = []
+    classificar = importacao.classificar_empresas
+    monkeypatch.setattr(
+        importacao, "classificar_empresas",
+        lambda cnaes: chamadas.append(list(cnaes)) or classificar(cnaes)
+    )
+
+    async def executar():
+        gerenciador = importacao.GerenciadorImportacoes()
+        arquivo = io.BytesIO(conteudo)
+        job = gerenciador.iniciar(arquivo, "csv", "empresas.csv")
+        await gerenciador._tarefas[job["job_id"]]
+        assert arquivo.closed
+        return job
+
+    job = asyncio.run(executar())
+    job["classificacoes"] = chamadas
+    return job
+
+
+def test_planilha_sem_colunas_de_contato_nao_apaga_contatos(criar_store, monkeypatch):
+    store = criar_store([empresa(2)])
+    csv = (
+        "CNPJ;Razão Social;CNAE;Data de Abertura\n"
+        f"{empresa(2)['cnpj']};NOVA RAZAO LTDA;5620102;15/01/2020\n"
+        "99888777000166;EMPRESA NOVA LTDA;5611201;01/02/2024\n"
+    ).encode("utf-8")
+
+    job = _importar(store, monkeypatch, csv)
+
+    assert job["status"] == "concluido", job["mensagem"]
+    assert (job["inseridas"], job["atualizadas"], job["rejeitadas"]) == (1, 1, 0)
+    # Cada lote classifica os CNAEs uma única vez
+    assert len(job["classificacoes"]) == 1
+
+    atual = store.obter(2)
+    assert atual["razao_social"] == "NOVA RAZAO LTDA"
+    assert (atual["telefone"], atual["email"], atual["endereco"]) == (
+        "(11) 4828-0000", "contato2@exemplo.com.br", "Rua A, 1"
+    )
+    assert (atual["porte"], atual["municipio"]) == ("ME", "Ribeirão Pires")
+
+    nova = store.obter_por_cnpj("99888777000166")
+    assert nova["municipio"] == "Ribeirão Pires"
+    assert nova["porte"] == "OUTROS"
+    assert nova["telefone"] is None
@@ -0,0 +1,83 @@
+"""Journal de mutações do JSONBackend: replay após queda e compactação."""
+import asyncio
+import json
+
+from conftest import empresa
+from services.empresas_store import EmpresasStore, JSONBackend
+
+
+def _mutar(store: EmpresasStore):
+    async def cenario():
+        await store.atualizar(1, {"bairro": "Novo"})
+        await store.adicionar(empresa(0, cnpj="99888777000166", id=None))
+        await store.remover(2)
+        await store.fechar()
+    asyncio.run(cenario())
+
+
+def test_replay_do_journal_apos_queda(criar_store):
+    store = criar_store([empresa(1), empresa(2)])
+    _mutar(store)
+
+    # O snapshot não foi regravado: só o journal tem as mutações
+    snapshot = json.loads(store.backend.path.read_text(encoding="utf-8"))
+    assert [e["id"] for e in snapshot["empresas"]] == [1, 2]
+
+    # Queda no meio da próxima gravação: linha incompleta no fim do journal
+    with open(store.backend.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"op":"update","empresa":{"id":1,"bai')
+
+    relido = EmpresasStore(JSONBackend(store.backend.path))
+    assert relido.obter(1)["bairro"] == "Novo"
+    assert relido.obter(2) is None
+    assert relido.obter_por_cnpj("99888777000166")["id"] == 3
+
+    # A linha incompleta foi descartada do journal
+    linhas = store.backend.journal_path.read_text(encoding="utf-8").splitlines()
+    assert len(linhas) == 3
+    assert all(json.loads(linha) for linha in linhas)
+
+
+def test_journal_zerado_apos_compactacao(criar_store):
+    store = criar_store([empresa(1), empresa(2)], compactar_apos=3)
+    _mutar(store)
+
+    assert store.backend.journal_path.stat().st_size == 0
+    snapshot = json.loads(store.backend.path.read_text(encoding="utf-8"))
+    por_id = {e["id"]: e for e in snapshot["empresas"]}
+    assert sorted(por_id) == [1, 3]
+    assert por_id[1]["bairro"] == "Novo"
+
+    relido = EmpresasStore(JSONBackend(store.backend.path))
+    assert relido.estatisticas()["total_empresas"] == 2
+
+
+def test_releitura_nao_trunca_gravacao_em_andamento(criar_store):
+    store = criar_store([empresa(1)])
+    assert store.obter(1)["bairro"] == "Centro"
+
+    # Outro processo está no meio de acrescentar uma linha ao journal
+    linha = json.dumps({"op": "update", "empresa": empresa(1, bairro="Outro")}) + "\n"
+    with open(store.backend.journal_path, "a", encoding="utf-8") as f:
+        f.write(linha[:20])
+
+    assert store.obter(1)["bairro"] == "Centro"
+    assert store.backend.journal_path.read_text(encoding="utf-8") == linha[:20]
+
+    with open(store.backend.journal_path, "a", encoding="utf-8") as f:
+        f.write(linha[20:])
+    assert store.obter(1)["bairro"] == "Outro"
+
+
+def test_registro_sem_op_e_tratado_como_corrompido(criar_store):
+    store = criar_store([empresa(1), empresa(2)])
+    valida = json.dumps({"op": "update", "empresa": empresa(1, bairro="Novo")})
+    store.backend.journal_path.write_text(
+        f'{valida}\n{{"id": 2}}\n{{"op": "delete", "id": 2}}\n', encoding="utf-8"
+    )
+
+    relido = EmpresasStore(JSONBackend(store.backend.path))
+    assert relido.obter(1)["bairro"] == "Novo"
+    assert relido.obter(2) is not None
+    # Na carga inicial o journal é truncado no registro inválido
+    assert relido.backend.journal_path.read_text(encoding="utf-8") == valida + "\n"
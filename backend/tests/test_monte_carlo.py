@@ -0,0 +1,60 @@
+"""Simulação de Monte Carlo de ocupação e receita (/analytics/monte-carlo)."""
+from models.schemas import ParametrosMonteCarlo
+from services.monte_carlo import MonteCarloService
+
+DIARIA = {"tipo": "triangular", "minimo": 250, "moda": 280, "maximo": 350}
+OCUPACAO = {"tipo": "triangular", "minimo": 0.45, "moda": 0.60, "maximo": 0.75}
+
+
+def parametros(**campos) -> dict:
+    return ParametrosMonteCarlo(simulacoes=2000, diaria=DIARIA, **campos).model_dump(mode="json")
+
+
+def sem_tempo(resultado: dict) -> dict:
+    return {chave: valor for chave, valor in resultado.items() if chave != "tempo_ms"}
+
+
+def test_mesma_semente_mesmo_resultado():
+    a = MonteCarloService().simular(parametros(semente=7))
+    b = MonteCarloService().simular(parametros(semente=7))
+    c = MonteCarloService().simular(parametros(semente=8))
+
+    assert sem_tempo(a) == sem_tempo(b)
+    assert a["revpar"] != c["revpar"]
+
+
+def test_faixas_ordenadas():
+    resultado = MonteCarloService().simular(parametros())
+
+    for nome in ("ocupacao_media_anual", "diaria_media", "revpar", "receita_quartos", "receita_fb", "receita_total"):
+        faixa = resultado[nome]
+        assert faixa["p10"] <= faixa["p50"] <= faixa["p90"], nome
+    for nome, faixa in resultado["mensal"].items():
+        for p10, p50, p90 in zip(faixa["p10"], faixa["p50"], faixa["p90"]):
+            assert p10 <= p50 <= p90, nome
+
+
+def test_faixas_dentro_dos_limites_triangulares():
+    # Sem sazonalidade nem ruído a ocupação anual é a sorteada
+    resultado = MonteCarloService().simular(parametros(
+        ocupacao=OCUPACAO,
+        elasticidade_sazonal={"tipo": "fixa", "media": 0},
+        ruido_mensal=0
+    ))
+
+    ocupacao = resultado["ocupacao_media_anual"]
+    assert 45 <= ocupacao["p10"] and ocupacao["p90"] <= 75
+    diaria = resultado["diaria_media"]
+    assert 250 <= diaria["p10"] and diaria["p90"] <= 350
+    revpar = resultado["revpar"]
+    assert 0.45 * 250 <= revpar["p10"] and revpar["p90"] <= 0.75 * 350
+
+
+def test_cache_por_hash_dos_parametros():
+    servico = MonteCarloService()
+    primeiro = servico.simular(parametros(semente=11))
+
+    # Mesmos parâmetros em outra ordem de chaves: mesmo hash, mesmo objeto
+    reordenados = dict(reversed(list(parametros(semente=11).items())))
+    assert servico.simular(reordenados) is primeiro
+    assert servico.simular(parametros(semente=12)) is not primeiro
@@ -0,0 +1,85 @@
+"""Paginação por cursor (keyset) de GET /empresas/ com alterações entre páginas."""
+import asyncio
+from datetime import date
+
+import httpx
+
+from conftest import empresa
+
+
+def test_cursor_cobre_cada_id_uma_vez_com_insercoes_e_exclusoes(criar_store, criar_app):
+    store = criar_store([empresa(i) for i in range(1, 21)])
+    app = criar_app(store)
+
+    async def cenario():
+        vistos, cursor, paginas = [], None, 0
+        removidos_antes, inseridos = set(), set()
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+            while True:
+                params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+                resposta = (await cliente.get("/empresas/", params=params)).json()
+                vistos.extend(e["id"] for e in resposta["empresas"])
+                paginas += 1
+
+                if paginas <= 3:
+                    # Uma exclusão à frente do cursor, uma atrás e uma inclusão
+                    ultimo = vistos[-1]
+                    await cliente.delete(f"/empresas/{ultimo + 2}")
+                    removidos_antes.add(ultimo + 2)
+                    await cliente.delete(f"/empresas/{vistos[0]}")
+                    nova = {k: v for k, v in empresa(0, cnpj=f"9988877700{paginas:04d}").items()
+                            if k not in ("id", "status_parceria", "notas")}
+                    criada = (await cliente.post("/empresas/", json=nova)).json()["empresa"]
+                    inseridos.add(criada["id"])
+
+                cursor = resposta["next_cursor"]
+                if cursor is None:
+                    break
+        await store.fechar()
+        return vistos, removidos_antes, inseridos
+
+    vistos, removidos_antes, inseridos = asyncio.run(cenario())
+
+    assert len(vistos) == len(set(vistos)), "ID repetido entre páginas"
+    assert vistos == sorted(vistos)
+    # Presentes do início ao fim: todos vistos; removidos à frente: nenhum
+    sempre_presentes = set(range(1, 21)) - removidos_antes
+    assert sempre_presentes <= set(vistos)
+    assert not removidos_antes & set(vistos)
+    # Inclusões (IDs maiores que o cursor) aparecem nas páginas seguintes
+    assert inseridos <= set(vistos)
+
+
+def test_cursor_filtrado_igual_ao_filtro_completo(criar_store):
+    setores = ("Restaurantes", "Bares", "Buffets/Catering", "Hospedagem")
+    store = criar_store([
+        empresa(
+            i,
+            setor_hotel=setores[i % 4] if i % 50 else "Fotografia",
+            porte="EPP" if i % 3 == 0 else "ME",
+            cnae_principal="5611-2/01" if i % 2 else "5620-1/02",
+            data_abertura=f"20{10 + i % 12}-0{1 + i % 9}-15"
+        )
+        for i in range(1, 401)
+    ])
+
+    for filtros in (
+        {},
+        {"setor": "Fotografia"},                      # candidato pequeno: IDs ordenados
+        {"setor": "Restaurantes", "porte": "EPP"},    # candidato grande: percorre a base
+        {"cnae": "5611", "porte": "ME"},
+        {"data_inicio": date(2015, 1, 1), "data_fim": date(2016, 12, 31), "porte": "EPP"},
+        {"setor": "Inexistente"},
+    ):
+        esperado = [e["id"] for e in store.filtrar(**filtros)]
+        for limite in (1, 7, 100):
+            vistos, cursor = [], 0
+            while True:
+                total, pagina, tem_mais = store.pagina_filtrada(cursor, limite, **filtros)
+                assert total == len(esperado), filtros
+                vistos.extend(e["id"] for e in pagina)
+                if not tem_mais:
+                    break
+                cursor = pagina[-1]["id"]
+            assert vistos == esperado, (filtros, limite)
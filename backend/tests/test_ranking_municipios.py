@@ -0,0 +1,86 @@
+"""Ranking de municípios (/analytics/municipios/ranking)."""
+import asyncio
+import json
+import threading
+
+from services import ranking_municipios as modulo
+from services.municipios import MUNICIPIO_PADRAO, registro_municipios
+
+
+def test_municipio_do_store_avaliado_no_loop_e_demais_sem_dados(monkeypatch):
+    threads = []
+    avaliar = modulo.avaliar_municipio
+
+    def avaliar_registrando(codigo_ibge):
+        threads.append(threading.current_thread())
+        return avaliar(codigo_ibge)
+
+    monkeypatch.setattr(modulo, "avaliar_municipio", avaliar_registrando)
+    bundles = [registro_municipios.obter(m["codigo_ibge"]) for m in registro_municipios.listar()]
+
+    resultado = asyncio.run(modulo.RankingMunicipios().ranquear(bundles))
+
+    assert threads == [threading.main_thread()]
+    assert [(r["codigo_ibge"], r["status"]) for r in resultado["ranking"]] == [(MUNICIPIO_PADRAO, "avaliado")]
+    assert resultado["sem_dados"]
+    assert {m["status"] for m in resultado["sem_dados"]} == {"sem_dados"}
+    assert all(m["motivo"] for m in resultado["sem_dados"])
+
+
+def test_bundle_com_arquivos_avaliado_no_pool(tmp_path, monkeypatch):
+    from conftest import empresa
+    from services import municipios
+    from services.datasets import DATA_PATH
+
+    # Mauá com os eventos pela metade e as empresas de um snapshot próprio
+    codigo = "3529401"
+    pasta = tmp_path / codigo
+    pasta.mkdir()
+    eventos = json.loads((DATA_PATH / "eventos.json").read_text(encoding="utf-8"))
+    eventos["eventos"] = eventos["eventos"][::2]
+    (pasta / "eventos.json").write_text(json.dumps(eventos), encoding="utf-8")
+    (pasta / "concorrencia.json").write_text((DATA_PATH / "concorrencia.json").read_text(encoding="utf-8"), encoding="utf-8")
+    (pasta / "empresas.json").write_text(
+        json.dumps({"empresas": [empresa(i, municipio="Maua") for i in range(1, 41)]}), encoding="utf-8"
+    )
+
+    # O registro deste processo e o dos processos do pool (spawn herda o ambiente)
+    monkeypatch.setenv("MUNICIPIOS_PATH", str(tmp_path))
+    monkeypatch.setattr(municipios, "MUNICIPIOS_PATH", tmp_path)
+    registro = municipios.RegistroMunicipios()
+    monkeypatch.setattr(modulo, "registro_municipios", registro)
+    monkeypatch.setattr(modulo, "_servicos", {})
+    bundles = [registro.obter(MUNICIPIO_PADRAO), registro.obter(codigo)]
+    assert bundles[1].disponivel and not bundles[1].usa_store
+
+    ranking = modulo.RankingMunicipios()
+    try:
+        resultado = asyncio.run(ranking.ranquear(bundles))
+    finally:
+        ranking.encerrar()
+
+    assert resultado["avaliados"] == 2 and resultado["sem_dados"] == []
+    linhas = resultado["ranking"]
+    assert {r["codigo_ibge"] for r in linhas} == {MUNICIPIO_PADRAO, codigo}
+    assert all(r["status"] == "avaliado" for r in linhas)
+    assert [r["posicao"] for r in linhas] == [1, 2]
+    chaves = [(r["score_viabilidade"], r["kpis"]["gap_mercado_estimado"]) for r in linhas]
+    assert chaves == sorted(chaves, reverse=True)
+
+    # O pool calcula o mesmo que a avaliação no próprio processo
+    do_pool = next(r for r in linhas if r["codigo_ibge"] == codigo)
+    local = modulo.avaliar_municipio(codigo)
+    assert do_pool["nome"] == "Maua"
+    assert {k: v for k, v in do_pool.items() if k != "posicao"} == local
+
+
+def test_codigo_ibge_desconhecido_retorna_404():
+    from fastapi.testclient import TestClient
+    import main
+
+    resposta = TestClient(main.app).post(
+        "/analytics/municipios/ranking", json={"codigos_ibge": [MUNICIPIO_PADRAO, "9999999"]}
+    )
+
+    assert resposta.status_code == 404
+    assert "9999999" in resposta.json()["detail"]
@@ -0,0 +1,29 @@
+"""Sensibilidade do score (/analytics/score-viabilidade/sensibilidade)."""
+from fastapi.testclient import TestClient
+
+import main
+from services.analytics import analytics_service
+
+
+def test_score_base_e_tornado_ordenado():
+    cliente = TestClient(main.app)
+    sensibilidade = cliente.get(
+        "/analytics/score-viabilidade/sensibilidade", params={"pontos": 5, "amostras": 20}
+    ).json()
+    kpis = cliente.get("/analytics/kpis").json()
+
+    assert sensibilidade["score_base"] == kpis["score_viabilidade"]
+    amplitudes = [item["amplitude"] for item in sensibilidade["tornado"]]
+    assert amplitudes == sorted(amplitudes, reverse=True)
+    assert amplitudes[0] > 0
+    for item in sensibilidade["tornado"]:
+        assert item["amplitude"] == round(abs(item["score_alto"] - item["score_baixo"]), 1)
+
+
+def test_sem_variacao_amplitude_zero():
+    sensibilidade = analytics_service.sensibilidade_score(variacao=0, pontos=3, amostras=5)
+
+    assert {item["amplitude"] for item in sensibilidade["tornado"]} == {0}
+    for curva in sensibilidade["dependencia_parcial"].values():
+        # score_base vem com 1 casa; a dependência parcial, com 2
+        assert all(abs(score - sensibilidade["score_base"]) <= 0.05 for score in curva["score"])
@@ -0,0 +1,45 @@
+"""Simulação diária de ocupação (/analytics/simulacao-diaria)."""
+import numpy as np
+
+from models.schemas import ParametrosSimulacaoDiaria
+from services.simulador_diario import ANTECEDENCIAS, corte_antecedencia, simulador_diario
+
+
+def test_corte_de_uma_curva_e_analitico():
+    base = np.array([56.0, 110.0, 5500.0, 5.5e6])
+    eventos = np.zeros(4)
+
+    corte = corte_antecedencia(base, eventos, 55, 14, 45)
+
+    np.testing.assert_allclose(corte, 14 * np.log(base / 55), rtol=1e-9)
+
+
+def test_corte_converge_com_demanda_muito_acima_da_capacidade():
+    base = np.array([60.0, 3000.0, 2e5, 1e7])
+    eventos = np.array([40.0, 9000.0, 1e6, 5e7])
+
+    corte = corte_antecedencia(base, eventos, 55, 14, 45)
+
+    reservas = base * np.exp(-corte / 14) + eventos * np.exp(-corte / 45)
+    np.testing.assert_allclose(reservas, 55, rtol=1e-9)
+
+
+def simular(**parametros) -> dict:
+    return simulador_diario.simular(
+        ParametrosSimulacaoDiaria(replicacoes=200, semente=7, **parametros).model_dump(mode="json")
+    )
+
+
+def test_pickup_crescente_e_capacidade_respeitada():
+    for parametros in ({}, {"ocupacao_base": 1.5}, {"ocupacao_base": 2, "taxa_pernoite": 0.2, "antecedencia_media_eventos": 5}):
+        resultado = simular(**parametros)
+
+        pickup = [p["percentual_reservado"] for p in resultado["pickup"]]
+        assert [p["antecedencia_dias"] for p in resultado["pickup"]] == list(ANTECEDENCIAS)
+        assert pickup == sorted(pickup) and pickup[-1] == 100.0, parametros
+
+        anual = resultado["anual"]
+        assert max(resultado["diario"]["ocupacao"]["p90"]) <= 100
+        assert anual["ocupacao"]["p90"] <= 100
+        assert anual["diarias_eventos"]["p90"] <= anual["diarias_vendidas"]["p90"]
+        assert anual["dias_lotados"]["p90"] <= resultado["dias"]
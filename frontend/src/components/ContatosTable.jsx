@@ -12,15 +12,38 @@ function ContatosTable() {
   const [filtroSetor, setFiltroSetor] = useState('todos');
   const [filtroStatus, setFiltroStatus] = useState('todos');
   const [busca, setBusca] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalBase, setTotalBase] = useState(null);
+  const [carregandoMais, setCarregandoMais] = useState(false);
+  const [resultadosBusca, setResultadosBusca] = useState(null);
 
   useEffect(() => {
     loadEmpresas();
   }, []);
 
+  // Busca no servidor (indice textual) para achar empresas fora das paginas carregadas
+  useEffect(() => {
+    if (busca.trim().length < 3) {
+      setResultadosBusca(null);
+      return;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        const result = await empresasApi.buscar(busca, 200);
+        setResultadosBusca((result.resultados || []).map(r => r.empresa));
+      } catch (err) {
+        setResultadosBusca(null);
+      }
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [busca]);
+
   const loadEmpresas = async () => {
     try {
-      const result = await empresasApi.listar({ limit: 100 });
+      const result = await empresasApi.listar({ limit: 500 });
       setEmpresas(result.empresas || []);
+      setNextCursor(result.next_cursor || null);
+      setTotalBase(result.total ?? null);
     } catch (err) {
       const expandidos = [
         ...EMPRESAS_EXEMPLO,
@@ -36,16 +59,31 @@ function ContatosTable() {
     }
   };
 
+  // Paginacao por cursor: cada pagina custa o mesmo, mesmo no fim da base
+  const carregarMais = async () => {
+    if (!nextCursor || carregandoMais) return;
+    setCarregandoMais(true);
+    try {
+      const result = await empresasApi.listar({ limit: 500, cursor: nextCursor });
+      setEmpresas(prev => [...prev, ...(result.empresas || [])]);
+      setNextCursor(result.next_cursor || null);
+    } catch (err) {
+      setNextCursor(null);
+    } finally {
+      setCarregandoMais(false);
+    }
+  };
+
   const setores = [...new Set(empresas.map(e => e.setor || e.setor_hotel))].filter(Boolean);
 
-  const empresasFiltradas = empresas.filter(emp => {
+  const empresasFiltradas = (resultadosBusca || empresas).filter(emp => {
     const setor = emp.setor || emp.setor_hotel;
     const status = emp.status || emp.status_parceria;
     const nome = emp.nome || emp.razao_social || emp.nome_fantasia;
 
     if (filtroSetor !== 'todos' && setor !== filtroSetor) return false;
     if (filtroStatus !== 'todos' && status !== filtroStatus) return false;
-    if (busca && !nome?.toLowerCase().includes(busca.toLowerCase())) return false;
+    if (!resultadosBusca && busca && !nome?.toLowerCase().includes(busca.toLowerCase())) return false;
     return true;
   });
 
@@ -72,9 +110,11 @@ function ContatosTable() {
     try {
       await empresasApi.atualizarStatus(empresaId, novoStatus);
     } catch (err) {}
-    setEmpresas(prev => prev.map(emp =>
+    const aplicar = lista => lista.map(emp =>
       emp.id === empresaId ? { ...emp, status: novoStatus, status_parceria: novoStatus } : emp
-    ));
+    );
+    setEmpresas(aplicar);
+    setResultadosBusca(prev => prev && aplicar(prev));
   };
 
   const contadores = {
@@ -277,6 +317,16 @@ function ContatosTable() {
               Nenhuma empresa encontrada com os filtros selecionados.
             </div>
           )}
+          {nextCursor && (
+            <div className="flex items-center justify-center gap-3 py-4 border-t">
+              <span className="text-xs text-muted-foreground">
+                {empresas.length} de {totalBase} empresas carregadas
+              </span>
+              <Button variant="outline" size="sm" onClick={carregarMais} disabled={carregandoMais}>
+                {carregandoMais ? 'Carregando...' : 'Carregar mais'}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
 
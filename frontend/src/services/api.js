@@ -28,11 +28,40 @@ async function fetchApi(endpoint, options = {}) {
 export const analyticsApi = {
   getKpis: () => fetchApi('/analytics/kpis'),
   getTendencias: () => fetchApi('/analytics/tendencias'),
+  getSerieAberturas: (params = {}) => {
+    const query = new URLSearchParams(params).toString();
+    return fetchApi(`/analytics/aberturas${query ? '?' + query : ''}`);
+  },
   getProjecoes: () => fetchApi('/analytics/projecoes'),
   getSazonalidade: () => fetchApi('/analytics/sazonalidade'),
   getCompleto: () => fetchApi('/analytics/completo'),
   getScoreViabilidade: () => fetchApi('/analytics/score-viabilidade'),
-  getDemandaEstimada: () => fetchApi('/analytics/demanda-estimada')
+  getSensibilidadeScore: (params = {}) => {
+    const query = new URLSearchParams(params).toString();
+    return fetchApi(`/analytics/score-viabilidade/sensibilidade${query ? '?' + query : ''}`);
+  },
+  getDemandaEstimada: () => fetchApi('/analytics/demanda-estimada'),
+  listarMunicipios: () => fetchApi('/analytics/municipios'),
+  ranquearMunicipios: (codigosIbge = null) => fetchApi('/analytics/municipios/ranking', {
+    method: 'POST',
+    body: JSON.stringify({ codigos_ibge: codigosIbge })
+  }),
+  simularMonteCarlo: (parametros = {}) => fetchApi('/analytics/monte-carlo', {
+    method: 'POST',
+    body: JSON.stringify(parametros)
+  }),
+  calcularViabilidadeFinanceira: (parametros = {}) => fetchApi('/analytics/viabilidade-financeira', {
+    method: 'POST',
+    body: JSON.stringify(parametros)
+  }),
+  simularOcupacaoDiaria: (parametros = {}) => fetchApi('/analytics/simulacao-diaria', {
+    method: 'POST',
+    body: JSON.stringify(parametros)
+  }),
+  calcularGrade: (parametros = {}) => fetchApi('/analytics/grid', {
+    method: 'POST',
+    body: JSON.stringify(parametros)
+  })
 };
 
 // API de Empresas
@@ -41,6 +70,11 @@ export const empresasApi = {
     const query = new URLSearchParams(params).toString();
     return fetchApi(`/empresas/${query ? '?' + query : ''}`);
   },
+  listarComFacetas: (params = {}) => {
+    const query = new URLSearchParams(params).toString();
+    return fetchApi(`/empresas/facetas${query ? '?' + query : ''}`);
+  },
+  buscar: (q, limit = 50) => fetchApi(`/empresas/busca?${new URLSearchParams({ q, limit })}`),
   getEstatisticas: () => fetchApi('/empresas/estatisticas'),
   getSetores: () => fetchApi('/empresas/setores'),
   getCnaes: () => fetchApi('/empresas/cnaes'),
@@ -49,6 +83,10 @@ export const empresasApi = {
     method: 'POST',
     body: JSON.stringify(empresa)
   }),
+  importarLote: (empresas) => fetchApi('/empresas/lote', {
+    method: 'POST',
+    body: JSON.stringify(empresas)
+  }),
   atualizarStatus: (id, status, notas = null) => fetchApi(`/empresas/${id}/status?status=${status}${notas ? '&notas=' + notas : ''}`, {
     method: 'PUT'
   }),
@@ -95,6 +133,19 @@ export const cnpjApi = {
   getStatus: () => fetchApi('/cnpj/status')
 };
 
+// Stream de alteracoes (SSE): handlers por evento (snapshot, empresas, kpis, reset)
+export const streamApi = {
+  conectar: (handlers = {}) => {
+    const fonte = new EventSource(`${API_BASE}/eventos-stream`);
+    ['snapshot', 'empresas', 'kpis', 'reset'].forEach((tipo) => {
+      if (handlers[tipo]) {
+        fonte.addEventListener(tipo, (evento) => handlers[tipo](JSON.parse(evento.data)));
+      }
+    });
+    return () => fonte.close();
+  }
+};
+
 // API Geral
 export const api = {
   getResumo: () => fetchApi('/resumo'),